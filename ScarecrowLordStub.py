@@ -1,44 +1,40 @@
 import pygame as pg
 import random
 import math
-
-class DashParticle:
-    """Small fading particle for the dash effect."""
-    def __init__(self, pos, color=(255, 180, 50)):
-        self.pos = pg.Vector2(pos)
-        self.color = color
-        self.radius = random.randint(3, 6)
-        self.lifetime = 0.3
-        self.age = 0
-        self.velocity = pg.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)) * 40
-
-    def update(self, dt):
-        self.age += dt
-        self.pos += self.velocity * dt
-
-    def draw(self, canvas):
-        if self.age < self.lifetime:
-            alpha = max(0, 255 * (1 - self.age / self.lifetime))
-            surf = pg.Surface((self.radius * 2, self.radius * 2), pg.SRCALPHA)
-            pg.draw.circle(surf, (*self.color, int(alpha)), (self.radius, self.radius), self.radius)
-            canvas.blit(surf, (self.pos.x - self.radius, self.pos.y - self.radius))
-
-    @property
-    def alive(self):
-        return self.age < self.lifetime
-
+import assets
+import particles
+import render
+from pool import Pool
 
 class MiniScarecrow:
-    def __init__(self, pos):
-        self.image = pg.image.load("Art/boss3M.png").convert_alpha()
-        self.image = pg.transform.scale(self.image, (60, 80))
-        self.pos = pg.Vector2(pos)
-        self.rect = self.image.get_rect(center=pos)
+    # summoned by the dozen and short-lived: no __dict__, and recycled
+    # through minion_pool
+    __slots__ = ("image", "pos", "rect", "health", "alive", "direction", "speed",
+                 "lifetime", "age", "damage", "prev_pos", "rng")
+
+    def __init__(self, pos, rng):
+        self.reset(pos, rng)
+
+    def reset(self, pos, rng):
+        """Spawn at pos. A recycled minion keeps its Vector2s and Rect.
+
+        rng is its lord's random.Random, so minions replay with the fight.
+        """
+        if not hasattr(self, "pos"):
+            self.image = assets.image("Art/boss3M.png", (60, 80))
+            self.pos = pg.Vector2()
+            self.rect = self.image.get_rect()
+            self.direction = pg.Vector2()
+        self.pos.update(pos)
+        self.rect.center = self.pos
+        self.prev_pos = (self.pos.x, self.pos.y)
         self.health = 20
         self.alive = True
-        self.direction = pg.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
-        self.speed = random.uniform(60, 100)
-        self.lifetime = random.uniform(3, 5)  # seconds before disappearing
+        self.rng = rng
+        self.direction.update(rng.uniform(-1, 1), rng.uniform(-1, 1))
+        self.direction.normalize_ip()
+        self.speed = rng.uniform(60, 100)
+        self.lifetime = rng.uniform(3, 5)  # seconds before disappearing
         self.age = 0
         self.damage = 10
 
@@ -51,9 +47,9 @@ class MiniScarecrow:
         self.rect.center = self.pos
 
         # Slight random steering
-        if random.random() < 0.02:
-            angle = random.uniform(-0.5, 0.5)
-            self.direction = self.direction.rotate(math.degrees(angle))
+        if self.rng.random() < 1.2 * dt:  # about once a second
+            angle = self.rng.uniform(-0.5, 0.5)
+            self.direction.rotate_ip(math.degrees(angle))
 
         # Lifetime decay
         self.age += dt
@@ -64,17 +60,23 @@ class MiniScarecrow:
         if self.rect.colliderect(player.rect):
             player.take_damage(self.damage)
 
-    def draw(self, surface):
+    def draw(self, queue):
         if self.alive:
-            surface.blit(self.image, self.rect.topleft)
+            queue.push(self.image, queue.lerp(self, self.rect.topleft), render.ENTITIES)
+
+
+minion_pool = Pool(MiniScarecrow)
 
 
 class ScarecrowLord:
-    def __init__(self, pos=(400, 300)):
+    hud_label = "Scarecrow Lord"  # name over the boss health bar (hud.BossBar)
+
+    def __init__(self, pos=(400, 300), rng=None):
         self.name = "Scarecrow Lord"
+        self.rng = rng or random.Random()  # reseeded by Fight.restart()
+        self.spawn_pos = pg.Vector2(pos)  # where every attempt starts
         self.pos = pg.Vector2(pos)
-        self.image = pg.image.load("Art/boss3.png").convert_alpha()
-        self.image = pg.transform.scale(self.image, (220, 220))
+        self.image = assets.image("Art/boss3.png", (220, 220))
         self.rect = self.image.get_rect(center=self.pos)
         self.max_health = 1500
         self.health = self.max_health
@@ -85,10 +87,9 @@ class ScarecrowLord:
         self.speed = 120
         self.dash_speed = 400
         self.dash_timer = 0
-        self.dash_cooldown = random.uniform(1.5, 2.5)
+        self.dash_cooldown = self.rng.uniform(1.5, 2.5)
         self.is_dashing = False
         self.dash_target = pg.Vector2(self.pos)
-        self.dash_particles = []
 
         # Minion management
         self.minions = []
@@ -107,38 +108,39 @@ class ScarecrowLord:
             direction = (self.dash_target - self.pos).normalize()
             self.velocity = direction * self.dash_speed
             self.dash_timer = 0
-            self.dash_cooldown = random.uniform(1.0, 2.0)
+            self.dash_cooldown = self.rng.uniform(1.0, 2.0)
         elif self.is_dashing:
             # Move and create dash particles
             self.pos += self.velocity * dt
             self.rect.center = self.pos
-            self.dash_particles.append([pg.Vector2(self.pos), 0.4])
+            particles.ground.emit(self.pos, lifetime=0.4, radius=15, color=(255, 180, 50))
 
             # Stop dashing if close to target
             if self.pos.distance_to(self.dash_target) < 30:
                 self.is_dashing = False
                 self.velocity *= 0
 
-        # === Dash Particles ===
-        for particle in self.dash_particles[:]:
-            particle[1] -= dt
-            if particle[1] <= 0:
-                self.dash_particles.remove(particle)
-
         # === Summon Minions ===
         self.summon_timer += dt
         if self.summon_timer >= self.summon_cooldown:
             self.summon_timer = 0
-            self.summon_cooldown = random.uniform(4, 6)
-            for _ in range(random.randint(2, 4)):
-                offset = pg.Vector2(random.randint(-80, 80), random.randint(-80, 80))
-                self.minions.append(MiniScarecrow(self.pos + offset))
+            self.summon_cooldown = self.rng.uniform(4, 6)
+            for _ in range(self.rng.randint(2, 4)):
+                offset = pg.Vector2(self.rng.randint(-80, 80), self.rng.randint(-80, 80))
+                self.minions.append(minion_pool.acquire(self.pos + offset, self.rng))
 
         # === Update Minions ===
-        for m in self.minions[:]:
+        # survivors are packed to the front in place; the rest go back to the pool
+        minions = self.minions
+        live = 0
+        for m in minions:
             m.update(dt, player)
             if not m.alive or m.health <= 0:
-                self.minions.remove(m)
+                minion_pool.release(m)
+            else:
+                minions[live] = m
+                live += 1
+        del minions[live:]
 
         # === Damage Player on contact ===
         if self.rect.colliderect(player.rect):
@@ -150,37 +152,33 @@ class ScarecrowLord:
         self.health -= amount
         if self.health <= 0:
             self.alive = False
+            minion_pool.release_all(self.minions)  # they go down with him
+
+    def reset(self):
+        """Reset between fights."""
+        self.health = self.max_health
+        self.alive = True
+        minion_pool.release_all(self.minions)
+        self.pos.update(self.spawn_pos)
+        self.rect.center = self.pos
+        self.velocity = pg.Vector2(0, 0)
+        self.dash_timer = 0
+        self.dash_cooldown = self.rng.uniform(1.5, 2.5)
+        self.is_dashing = False
+        self.dash_target = pg.Vector2(self.pos)
+        self.summon_timer = 0
+        self.summon_cooldown = 3
 
-    def draw(self, surface):
-        # Draw dash particles
-        for pos, life in self.dash_particles:
-            alpha = int(255 * (life / 0.4))
-            surf = pg.Surface((30, 30), pg.SRCALPHA)
-            pg.draw.circle(surf, (255, 180, 50, alpha), (15, 15), 15)
-            surface.blit(surf, (pos.x - 15, pos.y - 15))
+    def __setstate__(self, state):
+        # unpickled from a replay keyframe (replay.py): its minions weren't
+        # handed out by the pool but will be released to it
+        self.__dict__.update(state)
+        minion_pool.adopt(self.minions)
 
+    def draw(self, queue):
         # Draw boss
-        surface.blit(self.image, self.rect.topleft)
+        queue.push(self.image, queue.lerp(self, self.rect.topleft), render.ENTITIES)
 
         # Draw minions
         for m in self.minions:
-            m.draw(surface)
-
-        # --- Health bar (like original Pumpking style) ---
-        bar_width = 600
-        bar_height = 20
-        x, y = 100, 750
-
-        # Background
-        pg.draw.rect(surface, (50, 0, 0), (x, y, bar_width, bar_height))
-        # Health fill
-        pg.draw.rect(surface, (255, 80, 80),
-                     (x, y, bar_width * (self.health / self.max_health), bar_height))
-        # Outline
-        pg.draw.rect(surface, (0, 0, 0), (x, y, bar_width, bar_height), 2)
-
-        # Boss name text
-        font = pg.font.Font(None, 48)
-        text = font.render("Scarecrow Lord", True, (255, 200, 0))
-        text_rect = text.get_rect(center=(x + bar_width // 2, y - 25))
-        surface.blit(text, text_rect)
+            m.draw(queue)
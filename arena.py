@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import assets
+
+
+class ArenaPrefetcher:
+    """Builds the highlighted boss's arena while the player is still browsing.
+
+    Each frame of boss select calls want() with the highlighted boss and
+    poll() to make progress. Image files are decoded on a worker thread;
+    once they are in, the boss factory runs on the main thread (it needs the
+    display to convert surfaces) and the finished (boss, background) pair
+    waits for take(). Moving the highlight cancels or drops anything built
+    for another boss.
+    """
+
+    def __init__(self, factories, arena_assets):
+        self.factories = factories
+        self.arena_assets = arena_assets  # boss name -> [(path, alpha)]
+        self.wanted = None
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._pending = {}  # boss name -> Future of decoded images
+        self._ready = {}  # boss name -> (boss, background)
+
+    def want(self, name):
+        """Start preparing name's arena (None stops all prefetching)."""
+        if name == self.wanted:
+            return
+        self.wanted = name
+
+        # Drop work for anything that's no longer highlighted
+        for other in list(self._pending):
+            if other != name:
+                self._pending.pop(other).cancel()
+        for other in list(self._ready):
+            if other != name:
+                del self._ready[other]
+
+        if name is None or name in self._ready or name in self._pending:
+            return
+        jobs = assets.registry.plan(self.arena_assets.get(name, []))
+        self._pending[name] = self._pool.submit(lambda: [assets.decode(job) for job in jobs])
+
+    def poll(self):
+        """Finish at most one decoded arena. Call once per frame."""
+        for name, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[name]
+            if future.cancelled():
+                continue
+            for job, surface, _ in future.result():
+                assets.registry.adopt(job, surface)
+            self._ready[name] = self.factories[name]()
+            return
+
+    def take(self, name):
+        """Prepared (boss, background) for name, or None if it isn't ready."""
+        if name == self.wanted:
+            self.wanted = None  # so the next visit to boss select builds a fresh one
+        return self._ready.pop(name, None)
+
+    def close(self):
+        self.want(None)
+        self._pool.shutdown(wait=False)
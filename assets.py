@@ -0,0 +1,410 @@
+import json
+import os
+import time
+import pygame as pg
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Rough cap on how much image data the registry keeps alive (bytes)
+DEFAULT_BUDGET = 96 * 1024 * 1024
+
+# Cap for derived sprites (flips, fades, tints, flashes), separate from the above
+VARIANT_BUDGET = 16 * 1024 * 1024
+# Alpha and flash strength are rounded to this many steps so variants get reused
+VARIANT_LEVELS = 32
+
+# Written by bake.py; used instead of the loose PNGs when present
+ATLAS_DIR = "Art/atlas"
+ATLAS_INDEX = "index.json"
+
+
+def surface_bytes(surface):
+    """Approximate memory used by a surface's pixel data."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class AssetRegistry:
+    """Loads each image from disk once and hands out shared surfaces.
+
+    Entries are keyed by (path, size) (plus the alpha/smooth flags) and kept
+    in least-recently-used order. When the total size goes over the budget
+    the oldest entries, e.g. backgrounds of arenas we left, are dropped.
+    Anything still holding a dropped surface keeps working; it's just no
+    longer shared.
+
+    Untrimmed atlas sprites are subsurfaces of their page: they cost
+    nothing on their own, and using one keeps its page just ahead of it in
+    the LRU order, so the page (charged once) outlives every sprite cut
+    from it.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._pages = {}  # key of an atlas subsurface -> key of its page
+        self._regions = {}
+        self._atlas_dir = None
+
+    def load_atlas(self, directory=ATLAS_DIR):
+        """Use a baked atlas (see bake.py) if one exists. Returns True if loaded."""
+        index_path = os.path.join(directory, ATLAS_INDEX)
+        if not os.path.exists(index_path):
+            return False
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+
+        self._atlas_dir = directory
+        self._regions = {}
+        for region in index["regions"]:
+            size = tuple(region["size"]) if region["size"] else None
+            key = (region["path"], size, region["alpha"], region["smooth"])
+            self._regions[key] = region
+        return True
+
+    def get(self, path, size=None, alpha=True, smooth=False):
+        size = tuple(size) if size is not None else None
+        key = (path, size, alpha, smooth if size else False)
+
+        surface = self._entries.get(key)
+        if surface is not None:
+            self._touch(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        region = self._regions.get(key)
+        if region is not None and self._is_fresh(region):
+            surface = self._from_atlas(region)
+            if surface.get_parent() is not None:
+                self._pages[key] = (os.path.join(self._atlas_dir, region["page"]), None, region["alpha"], False)
+        elif size is None:
+            surface = self._convert(pg.image.load(path), alpha)
+            self.loads += 1
+        else:
+            source = self.get(path, None, alpha)
+            scale = pg.transform.smoothscale if smooth else pg.transform.scale
+            surface = scale(source, size)
+
+        self._store(key, surface)
+        return surface
+
+    def plan(self, sources):
+        """Which files still need decoding for these (path, alpha) pairs.
+
+        Files covered by a baked atlas are swapped for their atlas page and
+        anything already cached is skipped.
+        """
+        jobs = []
+        for path, alpha in sources:
+            job = self._atlas_page_for(path, alpha) or (path, alpha)
+            if job not in jobs and (job[0], None, job[1], False) not in self._entries:
+                jobs.append(job)
+        return jobs
+
+    def adopt(self, job, surface):
+        """Convert a surface decoded off-thread and cache it. Main thread only."""
+        path, alpha = job
+        surface = self._convert(surface, alpha)
+        self.loads += 1
+        self._store((path, None, alpha, False), surface)
+        return surface
+
+    def preload(self, sources, workers=None):
+        """Decode many images at once on a thread pool.
+
+        sources is a list of (path, alpha) pairs. PNG decoding runs on the
+        workers; converting to the display format happens here on the
+        calling (main) thread since it needs the display. Returns a
+        LoadReport.
+        """
+        report = LoadReport()
+        start = time.perf_counter()
+        jobs = self.plan(sources)
+
+        workers = workers or min(len(jobs), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for job, surface, decode_time in pool.map(decode, jobs):
+                t0 = time.perf_counter()
+                self.adopt(job, surface)
+                report.add(job[0], decode_time, time.perf_counter() - t0)
+
+        report.workers = workers
+        report.total = time.perf_counter() - start
+        return report
+
+    def _atlas_page_for(self, path, alpha):
+        for key, region in self._regions.items():
+            if key[0] == path and key[2] == alpha and self._is_fresh(region):
+                return os.path.join(self._atlas_dir, region["page"]), region["alpha"]
+        return None
+
+    def _is_fresh(self, region):
+        # a PNG edited after the last bake wins over its atlas copy
+        path = region["path"]
+        return not os.path.exists(path) or os.path.getmtime(path) <= region["mtime"]
+
+    def _from_atlas(self, region):
+        page_path = os.path.join(self._atlas_dir, region["page"])
+        page = self.get(page_path, None, region["alpha"])
+        rect = pg.Rect(region["rect"])
+        full_size = tuple(region["full_size"])
+        if tuple(region["offset"]) == (0, 0) and rect.size == full_size:
+            return page.subsurface(rect)
+
+        # Trimmed sprite: put the transparent margin back so rects and
+        # collision boxes keep the in-game size
+        surface = self._convert(pg.Surface(full_size, pg.SRCALPHA), True)
+        surface.fill((0, 0, 0, 0))
+        surface.blit(page, region["offset"], rect, special_flags=pg.BLEND_RGBA_MAX)
+        return surface
+
+    def _convert(self, surface, alpha):
+        # convert() needs a display mode; before that we keep the raw surface
+        if pg.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def _touch(self, key):
+        self._entries.move_to_end(key)
+        page = self._pages.get(key)
+        if page in self._entries:
+            self._entries.move_to_end(page)
+
+    def _store(self, key, surface):
+        # a subsurface shares its page's pixels, which are charged already
+        nbytes = 0 if key in self._pages else surface_bytes(surface)
+        self._entries[key] = surface
+        self._sizes[key] = nbytes
+        self.used += nbytes
+        self._touch(key)
+        self._evict(keep=key)
+
+    def _evict(self, keep=None):
+        while self.used > self.budget and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            del self._entries[key]
+            self.used -= self._sizes.pop(key)
+            self._pages.pop(key, None)
+            self.evictions += 1
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self._evict()
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self._pages.clear()
+        self.used = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.used,
+            "budget": self.budget,
+            "loads": self.loads,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class VariantCache:
+    """Memoized transformed copies of sprites.
+
+    variant(surface, ...) derives a version of a base sprite that's flipped,
+    faded, tinted, flashed white and/or rescaled, and keeps it in least-recently-used
+    order under its own byte budget. Draw code just asks for the variant it
+    needs every frame instead of copying the sprite. Variants are keyed by
+    the base surface itself, so they must not be drawn on.
+    """
+
+    def __init__(self, budget=VARIANT_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+
+    def get(self, surface, flip=False, alpha=255, tint=None, flash=0, scale=1):
+        alpha = _level(alpha)
+        flash = _level(flash)
+        tint = tuple(tint) if tint is not None else None
+        if not flip and alpha == VARIANT_LEVELS and tint is None and flash == 0 and scale == 1:
+            return surface
+
+        key = (surface, flip, alpha, tint, flash, scale)
+        variant = self._entries.get(key)
+        if variant is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return variant
+
+        self.misses += 1
+        variant = self._derive(surface, flip, alpha, tint, flash, scale)
+        nbytes = surface_bytes(variant)
+        self._entries[key] = variant
+        self._sizes[key] = nbytes
+        self.used += nbytes
+        while self.used > self.budget and len(self._entries) > 1:
+            old = next(iter(self._entries))
+            del self._entries[old]
+            self.used -= self._sizes.pop(old)
+            self.evictions += 1
+        return variant
+
+    def _derive(self, surface, flip, alpha, tint, flash, scale):
+        # flip() and the scalers make new surfaces; the fills below need a copy
+        variant = pg.transform.flip(surface, True, False) if flip else surface
+        if variant is surface and (tint is not None or flash or alpha < VARIANT_LEVELS):
+            variant = surface.copy()
+        if tint is not None:
+            mode = pg.BLEND_RGBA_MULT if len(tint) == 4 else pg.BLEND_RGB_MULT
+            variant.fill(tint, special_flags=mode)
+        if flash:
+            # brightens toward white; the alpha channel (outline) stays as is
+            value = flash * 255 // VARIANT_LEVELS
+            variant.fill((value, value, value), special_flags=pg.BLEND_RGB_ADD)
+        if alpha < VARIANT_LEVELS:
+            value = alpha * 255 // VARIANT_LEVELS
+            if variant.get_flags() & pg.SRCALPHA:
+                # baked into the pixels rather than set_alpha(), so blits stay plain
+                variant.fill((255, 255, 255, value), special_flags=pg.BLEND_RGBA_MULT)
+            else:
+                # opaque (convert()ed) surfaces have no alpha channel to bake into
+                variant.set_alpha(value)
+        w, h = variant.get_size()
+        if scale != 1 and w and h:
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            smooth = variant.get_bytesize() >= 3  # smoothscale needs 24/32-bit
+            surface_alpha = variant.get_alpha()  # the scalers drop set_alpha()
+            variant = (pg.transform.smoothscale if smooth else pg.transform.scale)(variant, size)
+            if surface_alpha is not None:
+                variant.set_alpha(surface_alpha)
+        return variant
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.used = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.used,
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def _level(value):
+    """0-255 -> 0..VARIANT_LEVELS, rounding up so anything visible stays visible."""
+    value = max(0, min(255, value))
+    return -(-int(value) * VARIANT_LEVELS // 255)
+
+
+def decode(job):
+    """Decode one (path, alpha) job. Safe to call from worker threads."""
+    t0 = time.perf_counter()
+    surface = pg.image.load(job[0])
+    return job, surface, time.perf_counter() - t0
+
+
+class LoadReport:
+    """Timings from AssetRegistry.preload (seconds)."""
+
+    def __init__(self):
+        self.assets = []  # (path, decode, convert)
+        self.workers = 0
+        self.total = 0.0
+
+    def add(self, path, decode, convert):
+        self.assets.append((path, decode, convert))
+
+    def print(self):
+        for path, decode, convert in sorted(self.assets, key=lambda a: -a[1]):
+            print(f"  {path:<40} decode {decode * 1000:6.1f} ms  convert {convert * 1000:5.1f} ms")
+        decode_sum = sum(a[1] for a in self.assets)
+        print(f"  {len(self.assets)} images on {self.workers} threads: "
+              f"{self.total * 1000:.1f} ms total ({decode_sum * 1000:.1f} ms of decoding)")
+
+
+registry = AssetRegistry()
+registry.load_atlas()
+variants = VariantCache()
+
+
+def image(path, size=None, alpha=True, smooth=False):
+    """Shared surface for an Art/ file, optionally scaled to size.
+
+    Use alpha=False for opaque images like backgrounds.
+    """
+    return registry.get(path, size, alpha, smooth)
+
+
+def variant(surface, flip=False, alpha=255, tint=None, flash=0, scale=1):
+    """Cached copy of surface mirrored left-right, faded to alpha, multiplied
+    by tint (RGB, or RGBA to scale alpha too), flashed white (0-255) and/or
+    resized by scale.
+
+    Returns surface itself when nothing changes.
+    """
+    return variants.get(surface, flip, alpha, tint, flash, scale)
+
+
+def surface_keys():
+    """surface -> key for everything cached here, for saving state that holds
+    sprites (replay keyframes). from_key(key) gets the surface back, in this
+    run or a later one."""
+    keys = {surface: ("image",) + key for key, surface in registry._entries.items()}
+    pending = list(variants._entries.items())
+    while pending:  # a variant's base can itself be a variant
+        left = []
+        for (base, flip, alpha, tint, flash, scale), surface in pending:
+            base_key = keys.get(base)
+            if base_key is None:
+                left.append(((base, flip, alpha, tint, flash, scale), surface))
+                continue
+            # levels back to 0-255 values that round to the same level
+            keys[surface] = ("variant", base_key, flip, alpha * 255 // VARIANT_LEVELS, tint,
+                             flash * 255 // VARIANT_LEVELS, scale)
+        if len(left) == len(pending):
+            break  # bases that are no longer cached
+        pending = left
+    return keys
+
+
+def from_key(key):
+    """The surface surface_keys() named key."""
+    if key[0] == "image":
+        return image(*key[1:])
+    _, base, flip, alpha, tint, flash, scale = key
+    return variant(from_key(base), flip, alpha, tint, flash, scale)
+
+
+def preload(sources, workers=None):
+    return registry.preload(sources, workers)
+
+
+def set_budget(budget):
+    registry.set_budget(budget)
+
+
+def stats():
+    return registry.stats()
+
+
+def variant_stats():
+    return variants.stats()
@@ -0,0 +1,242 @@
+"""Offline asset bake: packs every in-game sprite into a few atlas pages.
+
+Run from the repo root:
+
+    python bake.py
+
+The sizes come straight from the game code: every assets.image(...) call in
+the modules below is read (without importing them) and its path/size
+recorded. Each sprite is scaled to that size, trimmed to its alpha bounds
+and packed into Art/atlas/. The asset registry picks the atlas up on the
+next start and falls back to the loose PNGs for anything missing or stale.
+"""
+import ast
+import json
+import os
+import sys
+
+import pygame as pg
+
+import assets
+
+SOURCES = ["main.py", "player.py", "pumking.py", "bride.py", "ScarecrowLordStub.py"]
+PAGE_SIZE = 2048
+PADDING = 2
+
+
+# -------------------------------------------------------------------
+# === Finding the sizes used in game ===
+# -------------------------------------------------------------------
+
+def _module_constants(tree):
+    """Top-level NAME = <value> assignments whose value _resolve can work out
+    (incl. WIDTH, HEIGHT = 800, 800 and WIDTH = display.WIDTH)."""
+    consts = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
+            continue
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                pairs = [(target, node.value)]
+            elif isinstance(target, ast.Tuple) and isinstance(node.value, ast.Tuple):
+                pairs = zip(target.elts, node.value.elts)
+            else:
+                continue
+            for name, value in pairs:
+                if not isinstance(name, ast.Name):
+                    continue
+                try:
+                    consts[name.id] = _resolve(value, consts)
+                except (KeyError, ValueError):
+                    pass
+    return consts
+
+
+_imported = {}  # module name -> its constants, for display.WIDTH and friends
+
+
+def _imported_constants(module):
+    if module not in _imported:
+        _imported[module] = {}  # guards against import cycles
+        try:
+            with open(f"{module}.py", encoding="utf-8") as f:
+                _imported[module] = _module_constants(ast.parse(f.read(), f"{module}.py"))
+        except OSError:
+            pass
+    return _imported[module]
+
+
+def _resolve(node, consts):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return consts[node.id]
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        return _imported_constants(node.value.id)[node.attr]
+    if isinstance(node, (ast.Tuple, ast.List)):
+        return tuple(_resolve(elt, consts) for elt in node.elts)
+    raise ValueError(ast.dump(node))
+
+
+def find_asset_uses(sources=SOURCES):
+    """Every (path, size, alpha, smooth) requested through assets.image.
+
+    Raises ValueError naming every call whose arguments can't be worked out
+    from the source: a sprite missing from the atlas should stop the bake,
+    not slip past it.
+    """
+    uses = set()
+    unresolved = []
+    for source in sources:
+        with open(source, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), source)
+        consts = _module_constants(tree)
+
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+                continue
+            func = node.func
+            if not (func.attr == "image" and isinstance(func.value, ast.Name) and func.value.id == "assets"):
+                continue
+
+            args = {"size": None, "alpha": True, "smooth": False}
+            try:
+                names = ["path", "size", "alpha", "smooth"]
+                for name, arg in zip(names, node.args):
+                    args[name] = _resolve(arg, consts)
+                for kw in node.keywords:
+                    args[kw.arg] = _resolve(kw.value, consts)
+            except (KeyError, ValueError):
+                unresolved.append(f"{source}:{node.lineno}")
+                continue
+            if "path" not in args:
+                continue
+
+            size = tuple(args["size"]) if args["size"] else None
+            uses.add((args["path"], size, bool(args["alpha"]), bool(args["smooth"]) if size else False))
+    if unresolved:
+        raise ValueError(f"can't resolve the assets.image arguments at {', '.join(unresolved)}")
+    return sorted(uses, key=lambda u: (u[0], u[1] or (0, 0), u[2], u[3]))
+
+
+# -------------------------------------------------------------------
+# === Packing ===
+# -------------------------------------------------------------------
+
+def _render(path, size, smooth):
+    # same steps as AssetRegistry.get so baked pixels match the loose PNGs
+    surface = pg.image.load(path).convert_alpha()
+    if size:
+        scale = pg.transform.smoothscale if smooth else pg.transform.scale
+        surface = scale(surface, size)
+    return surface
+
+
+def _pack(items):
+    """Shelf-pack (key, surface) pairs into pages of (key, surface, pos)."""
+    items = sorted(items, key=lambda item: item[1].get_height(), reverse=True)
+    pages = [[]]
+    x = y = shelf_h = 0
+    for key, surface in items:
+        w, h = surface.get_size()
+        if w + PADDING > PAGE_SIZE or h + PADDING > PAGE_SIZE:
+            raise ValueError(f"{key[0]} at {w}x{h} does not fit a {PAGE_SIZE} page")
+        if x + w + PADDING > PAGE_SIZE:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        if y + h + PADDING > PAGE_SIZE:
+            pages.append([])
+            x = y = shelf_h = 0
+        pages[-1].append((key, surface, (x, y)))
+        x += w + PADDING
+        shelf_h = max(shelf_h, h + PADDING)
+    return pages
+
+
+def _page_surface(placements, alpha):
+    width = max(pos[0] + s.get_width() for _, s, pos in placements)
+    height = max(pos[1] + s.get_height() for _, s, pos in placements)
+    if alpha:
+        page = pg.Surface((width, height), pg.SRCALPHA)
+        page.fill((0, 0, 0, 0))
+    else:
+        page = pg.Surface((width, height), 0, 32)
+    for _, surface, pos in placements:
+        page.blit(surface, pos)
+    return page
+
+
+def bake(out_dir=assets.ATLAS_DIR, sources=SOURCES):
+    uses = find_asset_uses(sources)
+    groups = {True: [], False: []}
+    regions = []
+
+    for path, size, alpha, smooth in uses:
+        if not os.path.exists(path):
+            print(f"  missing {path}, skipped")
+            continue
+        surface = _render(path, size, smooth)
+        full_w, full_h = surface.get_size()
+        offset = (0, 0)
+        if alpha:
+            bounds = surface.get_bounding_rect(min_alpha=1)
+            if bounds.width == 0 or bounds.height == 0:
+                bounds = pg.Rect(0, 0, 1, 1)
+            offset = bounds.topleft
+            surface = surface.subsurface(bounds).copy()
+        key = (path, size, alpha, smooth)
+        groups[alpha].append((key, surface))
+        regions.append({
+            "key": key,
+            "full_size": (full_w, full_h),
+            "offset": offset,
+            "mtime": os.path.getmtime(path),
+        })
+
+    os.makedirs(out_dir, exist_ok=True)
+    placed = {}
+    pages = []
+    for alpha, items in groups.items():
+        if not items:
+            continue
+        prefix = "sprites" if alpha else "opaque"
+        for i, placements in enumerate(_pack(items)):
+            name = f"{prefix}_{i}.png"
+            pg.image.save(_page_surface(placements, alpha), os.path.join(out_dir, name))
+            pages.append({"file": name, "alpha": alpha})
+            for key, surface, pos in placements:
+                placed[key] = (name, (*pos, *surface.get_size()))
+
+    index = {"version": 1, "pages": pages, "regions": []}
+    source_px = trimmed_px = 0
+    for region in regions:
+        path, size, alpha, smooth = region["key"]
+        page, rect = placed[region["key"]]
+        index["regions"].append({
+            "path": path,
+            "size": list(size) if size else None,
+            "alpha": alpha,
+            "smooth": smooth,
+            "page": page,
+            "rect": list(rect),
+            "offset": list(region["offset"]),
+            "full_size": list(region["full_size"]),
+            "mtime": region["mtime"],
+        })
+        source_px += region["full_size"][0] * region["full_size"][1]
+        trimmed_px += rect[2] * rect[3]
+
+    with open(os.path.join(out_dir, assets.ATLAS_INDEX), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+
+    print(f"baked {len(regions)} sprites into {len(pages)} pages in {out_dir}/")
+    if source_px:
+        print(f"  pixels after trimming: {trimmed_px}/{source_px} ({100 * trimmed_px / source_px:.0f}%)")
+    return index
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pg.display.init()
+    pg.display.set_mode((1, 1))
+    bake(*sys.argv[1:2])
+    pg.quit()
@@ -0,0 +1,18 @@
+"""Scenario benchmarks: the real game classes driven through named, seeded
+workloads, with frame times split into update and draw.
+
+From the repo root:
+
+    python -m bench                                  # every scenario, printed
+    python -m bench run bride-wisps --frames=1200    # some of them, longer
+    python -m bench run --save=bench/baselines/main.json
+    python -m bench compare bench/baselines/main.json --tolerance=0.15
+    python -m bench list
+
+run prints mean / p95 / p99 milliseconds of update, draw and the whole
+frame per scenario, and --save keeps them as a JSON baseline. compare runs
+the baseline's scenarios again with its settings (or reads a second result
+file) and lists everything that got slower by more than the tolerance,
+exiting with status 1 if anything did. Baselines are only comparable on
+the machine (and backend) they were taken on.
+"""
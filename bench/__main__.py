@@ -0,0 +1,69 @@
+import sys
+
+from bench import runner
+from bench.scenarios import SCENARIOS
+
+
+def main(argv):
+    args = [a for a in argv if not a.startswith("--")]
+    command = args.pop(0) if args and args[0] in ("run", "compare", "list") else "run"
+    frames, seed, projectiles, backend, tolerance, save = 600, 1, None, "surface", 0.10, None
+    for arg in argv:
+        if arg.startswith("--frames="):
+            frames = int(arg.split("=", 1)[1])
+        elif arg.startswith("--seed="):
+            seed = int(arg.split("=", 1)[1])
+        elif arg.startswith("--projectiles="):
+            projectiles = int(arg.split("=", 1)[1])  # for the projectiles scenario
+        elif arg.startswith("--backend="):
+            backend = arg.split("=", 1)[1]
+        elif arg.startswith("--tolerance="):
+            tolerance = float(arg.split("=", 1)[1])  # 0.10 = 10% slower
+        elif arg.startswith("--save="):
+            save = arg.split("=", 1)[1]
+
+    if command == "list":
+        for name, cls in SCENARIOS.items():
+            print(f"{name:<18} {cls().description}")
+        return 0
+
+    if command == "run":
+        unknown = [name for name in args if name not in SCENARIOS]
+        if unknown:
+            raise SystemExit(f"unknown scenario(s) {', '.join(unknown)}; see python -m bench list")
+        print(f"{'ms':<18} mean / p95 / p99")
+        results = runner.run(args, frames, seed, projectiles, backend)
+        if save:
+            runner.save(results, save)
+            print(f"saved {save}")
+        return 0
+
+    # compare BASELINE [RESULT]
+    if not args:
+        raise SystemExit("usage: python -m bench compare BASELINE.json [RESULT.json] [--tolerance=0.10]")
+    baseline = runner.load(args[0])
+    if len(args) > 1:
+        current = runner.load(args[1])
+    else:
+        meta = baseline["meta"]
+        current = runner.run(list(baseline["scenarios"]), meta["frames"], meta["seed"],
+                             meta["projectiles"], meta["backend"], report=None)
+        if save:
+            runner.save(current, save)
+    for line in runner.format_comparison(baseline, current):
+        print(line)
+    regressions = runner.compare(baseline, current, tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s) past {tolerance:.0%}:")
+        for line in regressions:
+            print("  " + line)
+        return 1
+    print(f"no regressions past {tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    code = main(sys.argv[1:])
+    import pygame as pg
+    pg.quit()
+    sys.exit(code)
@@ -0,0 +1,396 @@
+"""Microbenchmarks: one hot function at a time, on the dummy video driver.
+
+Each bench builds its inputs once and returns an op, a function that makes
+one call (plus whatever cheap reset keeps the state steady, e.g. putting
+shots back where they started). The harness picks an iteration count that
+runs for about --time seconds, times --repeat runs of it with the garbage
+collector off and keeps the best, then runs the op again under tracemalloc.
+tracemalloc only sees memory that is live when asked, so it can't count
+the allocations an op makes and frees; the memory columns say what it can.
+
+From the repo root:
+
+    python -m bench.micro                       # all of them
+    python -m bench.micro projectiles ui.draw_start_screen
+    python -m bench.micro list
+
+A name selects every bench it is a prefix of ("projectiles" runs
+projectiles.update and projectiles.draw). Columns:
+
+    ns/op           best time per op
+    peak live B     most bytes live at once during one op, above what was
+                    live before it: the op's short-lived allocations
+    blocks kept/op  memory blocks still allocated after an op, averaged
+                    over the calls: growth per call
+
+The harness itself only needs the standard library and pygame (the game
+modules the benches import bring in the game's own dependencies).
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import pygame as pg
+
+BENCHES = {}  # name -> setup function returning the op
+
+
+def bench(name):
+    """Register setup() under name."""
+    def register(setup):
+        BENCHES[name] = setup
+        return setup
+    return register
+
+
+# -------------------------------------------------------------------
+# === Harness ===
+# -------------------------------------------------------------------
+
+def calibrate(op, target=0.2):
+    """Iterations (1, 2, 5, 10, 20, ...) that take at least target seconds."""
+    clock = time.perf_counter
+    number = 1
+    while True:
+        for step in (1, 2, 5):
+            n = number * step
+            start = clock()
+            for _ in range(n):
+                op()
+            if clock() - start >= target:
+                return n
+        number *= 10
+
+
+def measure(op, target=0.2, repeat=5):
+    """{"ns": best ns/op, "ops": iterations per run, "peak": bytes, "kept": blocks}."""
+    op()  # first call fills caches
+    number = calibrate(op, target)
+    clock = time.perf_counter_ns
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = None
+        for _ in range(repeat):
+            start = clock()
+            for _ in range(number):
+                op()
+            elapsed = clock() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        if enabled:
+            gc.enable()
+
+    # allocations: a few more calls under tracemalloc (slow, so not timed)
+    calls = max(1, min(number, 50))
+    tracemalloc.start()
+    try:
+        peak = 0
+        before = _blocks()
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            op()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        kept = (_blocks() - before) / calls
+    finally:
+        tracemalloc.stop()
+    return {"ns": best / number, "ops": number, "peak": peak, "kept": kept}
+
+
+def _blocks():
+    return sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+
+
+def run(names=(), target=0.2, repeat=5, report=print):
+    """Run the benches matching names (prefixes; all if empty). Returns
+    {name: measure() result}."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pg.display.init()
+    pg.font.init()
+    if pg.display.get_surface() is None:
+        import display
+        display.open_window(1.0)
+    selected = [name for name in BENCHES if not names or any(name.startswith(n) for n in names)]
+    if names and not selected:
+        raise SystemExit(f"no bench matches {', '.join(names)}; see python -m bench.micro list")
+    results = {}
+    if report:
+        report(f"{'bench':<28} {'ns/op':>12} {'ops':>8} {'peak live B':>12} {'blocks kept/op':>15}")
+    for name in selected:
+        result = results[name] = measure(BENCHES[name](), target, repeat)
+        if report:
+            report(f"{name:<28} {result['ns']:12,.0f} {result['ops']:8} {result['peak']:12,} {result['kept']:15.2f}")
+    return results
+
+
+# -------------------------------------------------------------------
+# === Benches ===
+# -------------------------------------------------------------------
+# Game modules are imported inside the setups: they need the window open
+
+def _canvas_queue():
+    import display
+    import render
+    return display.canvas, render.RenderQueue(render.Camera((display.WIDTH, display.HEIGHT)))
+
+
+def _shots(kind, count, seed=1):
+    """A ProjectileWorld of count projectiles spread over the arena."""
+    import random
+    import assets
+    from projectile import ProjectileWorld, SHOT, WISP
+    rng = random.Random(seed)
+    world = ProjectileWorld(seed=seed)
+    image = assets.image("Art/whisp.png" if kind != SHOT else "Art/attack.png", (32, 32))
+    for _ in range(count):
+        pos = (rng.uniform(100, 700), rng.uniform(100, 700))
+        direction = pg.Vector2(1, 0).rotate(rng.uniform(0, 360))
+        if kind == SHOT:
+            world.shot(pos, direction, image)
+        elif kind == WISP:
+            world.wisp(pos, direction, image, life=1e9)
+        else:
+            world.homing(pos, image)
+    return world
+
+
+def _steady(world, op):
+    """op, then everything put back: positions, rows and trail particles."""
+    import particles
+    count = world.count
+    pos = world.pos[:count].copy()
+    vel = world.vel[:count].copy()
+
+    def steady():
+        op()
+        world.count = count
+        world.alive[:count] = True
+        world.pos[:count] = pos
+        world.vel[:count] = vel
+        world.trail_count = min(world.trail_count, 256)
+        particles.clear()
+    return steady
+
+
+@bench("projectiles.update")
+def _projectiles_update():
+    from fight import TICK
+    world = _shots(0, 200)
+    return _steady(world, lambda: world.update(TICK))
+
+
+@bench("projectiles.draw")
+def _projectiles_draw():
+    canvas, queue = _canvas_queue()
+    world = _shots(0, 200)
+
+    def op():
+        world.draw(queue)
+        queue.flush(canvas)
+    return op
+
+
+@bench("wisps.update")
+def _wisps_update():
+    from fight import TICK
+    world = _shots(1, 50)
+    return _steady(world, lambda: world.update(TICK))
+
+
+@bench("wisps.draw")
+def _wisps_draw():
+    from fight import TICK
+    canvas, queue = _canvas_queue()
+    world = _shots(1, 50)
+    for _ in range(72):  # TRAIL_LIFE worth of trail points
+        world.update(TICK)
+
+    def op():
+        world.draw(queue)
+        queue.flush(canvas)
+    return op
+
+
+@bench("homing.update")
+def _homing_update():
+    from fight import TICK
+    from spatial import SpatialGrid
+    world = _shots(2, 50)
+    targets = SpatialGrid()
+    targets.build(_minions(100))
+    return _steady(world, lambda: world.update(TICK, targets))
+
+
+@bench("particles.draw")
+def _particles_draw():
+    import random
+    from particles import ParticleSystem
+    canvas, queue = _canvas_queue()
+    system = ParticleSystem(capacity=2048, seed=1)
+    rng = random.Random(1)
+    for _ in range(100):
+        system.burst((rng.uniform(0, 800), rng.uniform(0, 800)), 20, colors=((255, 120, 0), (90, 120, 255)))
+    system.update(0.1)  # spread out and partly faded
+
+    def op():
+        system.draw(queue)
+        queue.flush(canvas)
+    return op
+
+
+class _Minion:
+    """Stands in for a hostile: a pos, a rect and plenty of health."""
+
+    def __init__(self, pos):
+        self.pos = pg.Vector2(pos)
+        self.prev_pos = pos
+        self.rect = pg.Rect(0, 0, 60, 80)
+        self.rect.center = pos
+        self.alive = True
+        self.health = 10 ** 9
+
+
+def _minions(count, seed=1):
+    """count stand-in hostiles spread over the arena."""
+    import random
+    rng = random.Random(seed)
+    return [_Minion((rng.uniform(0, 800), rng.uniform(0, 800))) for _ in range(count)]
+
+
+def _fight(shots=100, minions=100):
+    """A Fight against the Scarecrow Lord with shots flying and minions
+    around, none of them touching (the common case)."""
+    import assets
+    import headless
+    from fight import Fight
+    player = headless.new_player()
+    boss = headless.new_boss("Scarecrow Lord", 1)
+    fight = Fight(player, boss)
+    fight.restart(1)
+    boss.pos.update(700, 100)
+    boss.rect.center = boss.pos
+    boss.minions = [m for m in _minions(minions * 3) if not m.rect.colliderect(boss.rect)][:minions]
+    world = player.projectiles
+    rects = [m.rect for m in boss.minions] + [boss.rect]
+    image = assets.image("Art/attack.png", (32, 32))
+    y = 0
+    while len(world) < shots:
+        y = (y + 37) % 800
+        for x in range(0, 800, 40):
+            box = pg.Rect(x, y, 32, 32)
+            if len(world) < shots and box.collidelist(rects) < 0:
+                world.shot(box.center, True, image)
+    return fight
+
+
+@bench("player.update_attacks")
+def _player_update_attacks():
+    from fight import TICK
+    fight = _fight()
+    fight.hostiles.build(fight.live_hostiles())
+    player = fight.player
+    return _steady(player.projectiles, lambda: player.update_attacks(TICK, fight.boss, fight.hostiles))
+
+
+@bench("fight.player_hits")
+def _fight_player_hits():
+    fight = _fight()
+    return fight.player_hits
+
+
+@bench("fog.update")
+def _fog_update():
+    import ui
+
+    def op():
+        for fog in ui.fog_particles:
+            fog.update(1 / 60)
+    return op
+
+
+@bench("fog.draw")
+def _fog_draw():
+    import display
+    import ui
+
+    def op():
+        for fog in ui.fog_particles:
+            fog.draw(display.canvas)
+    return op
+
+
+@bench("fog.field_draw")
+def _fog_field_draw():
+    import display
+    import ui
+    field = ui.FogField((5, 5, 5), 150, 2, seed=1)
+    t = [0.0]
+
+    def op():
+        t[0] += 1 / 60
+        field.draw(display.canvas, t[0])
+    return op
+
+
+def _mask_images():
+    import assets
+    return {name: assets.image(path, (80, 80), smooth=True) for name, path in (
+        ("Pumpking", "Art/mask_pumpking.png"),
+        ("Specter Bride", "Art/mask_specter.png"),
+        ("Scarecrow Lord", "Art/mask_scarecrow.png"),
+    )}
+
+
+@bench("ui.draw_start_screen")
+def _start_screen():
+    import display
+    import ui
+    return lambda: ui.draw_start_screen(display.canvas, 1 / 60)
+
+
+@bench("ui.draw_intro_screen")
+def _intro_screen():
+    import display
+    import ui
+    return lambda: ui.draw_intro_screen(display.canvas, 1 / 60)
+
+
+@bench("ui.draw_boss_select_screen")
+def _boss_select_screen():
+    import display
+    import ui
+    masks = _mask_images()
+    return lambda: ui.draw_boss_select_screen(display.canvas, 1 / 60, 1, list(masks), {"Pumpking"}, masks)
+
+
+@bench("ui.draw_boss_cleared_screen")
+def _boss_cleared_screen():
+    import display
+    import ui
+    return lambda: ui.draw_boss_cleared_screen(display.canvas, "Pumpking", 1 / 60)
+
+
+@bench("ui.you_died_screen")
+def _you_died_screen():
+    import display
+    import ui
+    return lambda: ui.you_died_screen(display.canvas, 200)
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    target, repeat = 0.2, 5
+    for arg in sys.argv[1:]:
+        if arg.startswith("--time="):
+            target = float(arg.split("=", 1)[1])  # seconds per timed run
+        elif arg.startswith("--repeat="):
+            repeat = int(arg.split("=", 1)[1])
+    if args == ["list"]:
+        for name in BENCHES:
+            print(name)
+    else:
+        run(args, target, repeat)
+    pg.quit()
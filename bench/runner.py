@@ -0,0 +1,131 @@
+"""Runs scenarios, summarizes their frame times and compares result files."""
+import contextlib
+import io
+import json
+import os
+import platform
+import time
+
+import numpy as np
+import pygame as pg
+
+import display
+from bench.scenarios import SCENARIOS
+
+# Frames run before timing starts: asset loads, caches filling up
+WARMUP_FRAMES = 60
+# Slower than the baseline by less than this (ms) is never a regression,
+# whatever the tolerance: sub-tenth-of-a-millisecond changes are noise
+NOISE_FLOOR_MS = 0.05
+PARTS = ("update", "draw", "frame")
+STATS = ("mean", "p95", "p99")
+
+
+def open_window(backend="surface"):
+    """The game's window, on SDL's dummy driver unless another is set."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pg.display.init()
+    pg.font.init()
+    if pg.display.get_surface() is None:
+        display.open_window(1.0, use_backend=backend)
+
+
+def summarize(times):
+    """mean / p95 / p99 of a list of seconds, in milliseconds."""
+    ms = np.asarray(times) * 1000
+    return {"mean": float(ms.mean()), "p95": float(np.percentile(ms, 95)), "p99": float(np.percentile(ms, 99))}
+
+
+def run_scenario(name, frames=600, seed=1, projectiles=None):
+    """Run one scenario; returns {"update"|"draw"|"frame": summary, ...}."""
+    scenario = SCENARIOS[name]()
+    if projectiles is not None and hasattr(scenario, "count"):
+        scenario.count = projectiles
+    scenario.setup(seed)
+    clock = time.perf_counter
+    update_times, draw_times = [], []
+    # the game prints its hit messages; a terminal write per hit would be timed too
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            for frame in range(WARMUP_FRAMES + frames):
+                t0 = clock()
+                scenario.update()
+                t1 = clock()
+                scenario.draw()
+                t2 = clock()
+                if frame >= WARMUP_FRAMES:
+                    update_times.append(t1 - t0)
+                    draw_times.append(t2 - t1)
+        finally:
+            scenario.teardown()
+    frame_times = [u + d for u, d in zip(update_times, draw_times)]
+    return {"description": scenario.description, "update": summarize(update_times),
+            "draw": summarize(draw_times), "frame": summarize(frame_times)}
+
+
+def run(names=None, frames=600, seed=1, projectiles=None, backend="surface", report=print):
+    """Run scenarios (all by default) and return the results document that
+    save() writes."""
+    open_window(backend)
+    names = names or list(SCENARIOS)
+    results = {"meta": {"frames": frames, "seed": seed, "projectiles": projectiles, "backend": backend,
+                        "python": platform.python_version(), "pygame": pg.version.ver,
+                        "machine": platform.machine(), "platform": platform.platform(),
+                        "date": time.strftime("%Y-%m-%d %H:%M:%S")},
+               "scenarios": {}}
+    for name in names:
+        result = run_scenario(name, frames, seed, projectiles)
+        results["scenarios"][name] = result
+        if report:
+            report(format_result(name, result))
+    return results
+
+
+def format_result(name, result):
+    cells = "  ".join(f"{part} {result[part]['mean']:6.2f} /{result[part]['p95']:6.2f} /{result[part]['p99']:6.2f}"
+                      for part in PARTS)
+    return f"{name:<18} {cells}"
+
+
+def save(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline, current, tolerance=0.10):
+    """Every (scenario, part, stat) of current that's more than tolerance
+    (a fraction) slower than baseline, as lines of text. Scenarios missing
+    from either side are skipped."""
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        now = current["scenarios"].get(name)
+        if now is None:
+            continue
+        for part in PARTS:
+            for stat in STATS:
+                old, new = base[part][stat], now[part][stat]
+                if new > old * (1 + tolerance) and new - old > NOISE_FLOOR_MS:
+                    regressions.append(f"{name:<18} {part:<6} {stat:<4} {old:7.2f} -> {new:7.2f} ms "
+                                       f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+
+def format_comparison(baseline, current):
+    """Side-by-side means and p99s of every scenario in both."""
+    lines = []
+    for name, base in baseline["scenarios"].items():
+        now = current["scenarios"].get(name)
+        if now is None:
+            continue
+        cells = "  ".join(f"{part} {base[part]['mean']:6.2f} -> {now[part]['mean']:6.2f} "
+                          f"(p99 {base[part]['p99']:6.2f} -> {now[part]['p99']:6.2f})" for part in PARTS)
+        lines.append(f"{name:<18} {cells}")
+    return lines
@@ -0,0 +1,209 @@
+"""The benchmark scenarios: named, seeded workloads built from the real game
+classes. Each one is set up once and then run frame by frame, with update()
+(simulation) and draw() (everything up to and including present) timed
+apart by the runner."""
+import random
+
+import numpy as np
+import pygame as pg
+
+import assets
+import display
+import headless
+import particles
+import render
+import ui
+from fight import Fight
+from hud import HUD
+from projectile import ProjectileWorld
+
+# Every scenario frame stands for this much game time, as at the default frame cap
+FRAME_TIME = 1 / 60
+
+# Arena backgrounds, as main.py's boss factories pick them
+ARENAS = {
+    "Pumpking": "Art/background.png",
+    "Specter Bride": "Art/background2.png",
+    "Scarecrow Lord": "Art/background3.png",
+}
+
+
+class Scenario:
+    """One workload. setup(seed) builds it; update() and draw() run one frame."""
+
+    name = ""
+    description = ""
+
+    def setup(self, seed):
+        pass
+
+    def update(self):
+        pass
+
+    def draw(self):
+        raise NotImplementedError
+
+    def teardown(self):
+        particles.clear()
+
+
+# -------------------------------------------------------------------
+# === Menus ===
+# -------------------------------------------------------------------
+
+class Menus(Scenario):
+    """Cycles through the menu screens, a second on each. The ui draw_*
+    functions move the fog as they draw, so it all counts as draw."""
+
+    name = "menus"
+    description = "start, intro, boss select and boss cleared screens with their fog"
+
+    def setup(self, seed):
+        random.seed(seed)  # menu fog is render-only and uses the random module
+        self.frame = 0
+        self.mask_images = {name: assets.image(path, (80, 80), smooth=True) for name, path in (
+            ("Pumpking", "Art/mask_pumpking.png"),
+            ("Specter Bride", "Art/mask_specter.png"),
+            ("Scarecrow Lord", "Art/mask_scarecrow.png"),
+        )}
+
+    def draw(self):
+        canvas = display.canvas
+        screen = (self.frame // 60) % 4
+        self.frame += 1
+        if screen == 0:
+            ui.draw_start_screen(canvas, FRAME_TIME)
+        elif screen == 1:
+            ui.draw_intro_screen(canvas, FRAME_TIME)
+        elif screen == 2:
+            ui.draw_boss_select_screen(canvas, FRAME_TIME, 1, list(ARENAS), {"Pumpking"}, self.mask_images)
+        else:
+            ui.draw_boss_cleared_screen(canvas, "Pumpking", FRAME_TIME)
+
+
+# -------------------------------------------------------------------
+# === Fights ===
+# -------------------------------------------------------------------
+
+class FightScenario(Scenario):
+    """A fight as main.py plays it, with headless.Chaser at the keys.
+
+    The boss can't be beaten and the player's health is topped up every
+    frame, so the fight runs the whole scenario. Subclasses turn the boss
+    up in tweak(), called before every frame.
+    """
+
+    boss_name = ""
+
+    def setup(self, seed):
+        self.player = headless.new_player()
+        self.boss = headless.new_boss(self.boss_name, seed)
+        self.boss.max_health = self.boss.health = 10 ** 9
+        self.fight = Fight(self.player, self.boss, can_use_mask=True, unlocked_masks={"pumpkin", "specter"})
+        self.fight.restart(seed)
+        self.policy = headless.Chaser()
+        self.camera = render.Camera((display.WIDTH, display.HEIGHT))
+        self.queue = render.RenderQueue(self.camera)
+        self.hud = HUD()
+        self.background = assets.image(ARENAS[self.boss_name], (display.WIDTH, display.HEIGHT), alpha=False)
+
+    def tweak(self, boss):
+        pass
+
+    def teardown(self):
+        if hasattr(self.boss, "minions"):
+            self.boss.reset()  # minions go back to their pool
+        super().teardown()
+
+    def update(self):
+        self.player.current_health = self.player.max_health
+        self.tweak(self.boss)
+        held, pressed = self.policy.act(self.fight)
+        for key in pressed:
+            self.fight.handle_event(pg.event.Event(pg.KEYDOWN, key=key))
+        self.fight.advance(FRAME_TIME, headless.Keys(held))
+        if getattr(self.boss, "just_attacked", False):
+            self.camera.shake(0.4, 6)
+            self.boss.just_attacked = False
+
+    def draw(self):
+        self.camera.update(FRAME_TIME)
+        display.begin("playing")
+        self.queue.push(self.background, (0, 0), render.BACKGROUND)
+        self.fight.draw(self.queue)
+        self.hud.draw(self.queue, self.player, self.boss)
+        display.draw_queue(self.queue)
+        display.present()
+
+
+class PumpkingStorm(FightScenario):
+    name = "pumpking-storm"
+    description = "Pumpking firing a radial volley every 0.05 s"
+    boss_name = "Pumpking"
+
+    def tweak(self, boss):
+        boss.attack_cooldown = 0.05
+        boss.shoot_ghosts = lambda player_pos: boss.radial_attack()
+
+
+class BrideWisps(FightScenario):
+    name = "bride-wisps"
+    description = "Specter Bride launching a wisp every 0.05 s, ~60 wisps and their trails alive"
+    boss_name = "Specter Bride"
+
+    def tweak(self, boss):
+        boss.attack_cooldown = 0.05
+
+
+class ScarecrowMinions(FightScenario):
+    name = "scarecrow-minions"
+    description = "Scarecrow Lord summoning every 0.1 s, ~100 minions alive"
+    boss_name = "Scarecrow Lord"
+
+    def tweak(self, boss):
+        boss.summon_cooldown = min(boss.summon_cooldown, 0.1)
+
+
+# -------------------------------------------------------------------
+# === Synthetic ===
+# -------------------------------------------------------------------
+
+class Projectiles(Scenario):
+    """count shots flying across the arena, topped up every frame so the
+    count stays put. Nothing else is drawn but the background."""
+
+    name = "projectiles"
+    count = 500
+
+    @property
+    def description(self):
+        return f"{self.count} player shots in one ProjectileWorld"
+
+    def setup(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.shots = ProjectileWorld(seed=seed)
+        self.image = assets.image("Art/attack.png", (32, 32))
+        self.queue = render.RenderQueue(render.Camera((display.WIDTH, display.HEIGHT)))
+        self.background = assets.image("Art/background.png", (display.WIDTH, display.HEIGHT), alpha=False)
+
+    def update(self):
+        missing = self.count - len(self.shots)
+        if missing > 0:
+            pos = self.rng.uniform(0, (display.WIDTH, display.HEIGHT), (missing, 2))
+            angle = self.rng.uniform(0, 2 * np.pi, missing)
+            for p, a in zip(pos.tolist(), angle.tolist()):
+                self.shots.shot(p, (np.cos(a), np.sin(a)), self.image)
+        self.shots.snapshot()
+        self.shots.update(FRAME_TIME)
+        particles.update(FRAME_TIME)  # their trails
+
+    def draw(self):
+        display.begin("playing")
+        self.queue.push(self.background, (0, 0), render.BACKGROUND)
+        self.shots.draw(self.queue)
+        particles.draw(self.queue)
+        display.draw_queue(self.queue)
+        display.present()
+
+
+SCENARIOS = {cls.name: cls for cls in (Menus, PumpkingStorm, BrideWisps, ScarecrowMinions, Projectiles)}
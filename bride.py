@@ -1,36 +1,48 @@
 import pygame as pg
 import math
 import random
+import assets
+import render
+import display
+from projectile import ProjectileWorld
 
 
 class SpecterBride:
-    def __init__(self, pos=(400, 300)):
+    hud_label = "Specter Bride"  # name over the boss health bar (hud.BossBar)
+
+    def __init__(self, pos=(400, 300), rng=None):
         # === Basic stats ===
         self.name = "Specter Bride"
+        self.spawn_pos = pg.Vector2(pos)  # where every attempt starts
         self.pos = pg.Vector2(pos)
         self.max_health = 1200
         self.health = self.max_health
         self.alive = True
-        self.projectiles = []
+        self.projectiles = ProjectileWorld()
         self.just_attacked = False
+        self.rng = rng or random.Random()  # reseeded by Fight.restart()
         
         # === Screen boundaries ===
-        self.screen_width = 800
-        self.screen_height = 800
+        self.screen_width = display.WIDTH
+        self.screen_height = display.HEIGHT
 
         # === Load image ===
-        self.image = pg.image.load("Art/Specter_Bride.png").convert_alpha()
-        self.image = pg.transform.scale(self.image, (200, 200))
+        self.image = assets.image("Art/Specter_Bride.png", (200, 200))
         self.rect = self.image.get_rect(center=self.pos)
 
+        # Soft glow behind the sprite, drawn once
+        glow_radius = 90
+        self.glow = pg.Surface((glow_radius * 2, glow_radius * 2), pg.SRCALPHA)
+        pg.draw.circle(self.glow, (200, 200, 255, 40), (glow_radius, glow_radius), glow_radius)
+
         # === Movement + attack timers ===
         self.float_timer = 0
         self.attack_cooldown = 0.5
-        self.attack_timer = random.uniform(0.25, 0.25)
+        self.attack_timer = self.rng.uniform(0.25, 0.25)
 
         # === Dash variables ===
         self.dashing = False
-        self.dash_cooldown = random.uniform(1.5, 3)
+        self.dash_cooldown = self.rng.uniform(1.5, 3)
         self.dash_timer = self.dash_cooldown
         self.dash_speed = 700
         self.dash_duration = 0.4
@@ -52,8 +64,10 @@ class SpecterBride:
 
         # === Floating motion ===
         self.float_timer += dt
-        self.pos.x += math.sin(pg.time.get_ticks() * 0.001) * 40 * dt
-        self.pos.y += math.cos(pg.time.get_ticks() * 0.0015) * 20 * dt
+        # float_timer instead of pg.time.get_ticks(), which stays at 0
+        # without a full pg.init()
+        self.pos.x += math.sin(self.float_timer * 1.0) * 40 * dt
+        self.pos.y += math.cos(self.float_timer * 1.5) * 20 * dt
         
         # === Keep within screen boundaries ===
         self.keep_in_bounds()
@@ -70,13 +84,10 @@ class SpecterBride:
         self.handle_dash(dt, player)
 
         # === Update projectiles ===
-        for proj in self.projectiles[:]:
-            proj.update(dt)
-            if not proj.alive:
-                self.projectiles.remove(proj)
+        self.projectiles.update(dt)
 
     def keep_in_bounds(self):
-        """Keep the Specter Bride within the 800x800 screen boundaries"""
+        """Keep the Specter Bride within the arena boundaries"""
         margin = 80  # Keep boss away from edges (half of image width/height)
         
         # X boundary check
@@ -96,7 +107,7 @@ class SpecterBride:
         if not self.dashing and self.dash_timer <= 0:
             # Start dash toward or away from player
             direction = (pg.Vector2(player.pos) - self.pos).normalize()
-            if random.random() < 0.5:  # 50% chance to dash away
+            if self.rng.random() < 0.5:  # 50% chance to dash away
                 direction = -direction
             self.vel = direction * self.dash_speed
             self.dashing = True
@@ -115,52 +126,29 @@ class SpecterBride:
                 self.dashing = False
                 self.vel = pg.Vector2(0, 0)
                 self.alpha = 255
-                self.dash_timer = random.uniform(1.5, 3.0)
+                self.dash_timer = self.rng.uniform(1.5, 3.0)
 
     def attack(self, player):
         """Launch a slow homing wisp toward the player."""
         direction = (pg.Vector2(player.pos) - self.pos).normalize()
-        self.projectiles.append(WispProjectile(self.pos, direction, self.screen_width, self.screen_height))
+        # Shared sprite, loaded and scaled once by the asset registry
+        self.projectiles.wisp(self.pos, direction, assets.image("Art/whisp.png", (48, 48)))
         self.just_attacked = True
 
-    def draw(self, canvas):
+    def draw(self, queue):
         if not self.alive:
             return
 
         # --- Glow effect ---
-        glow_radius = 90
-        glow_surf = pg.Surface((glow_radius * 2, glow_radius * 2), pg.SRCALPHA)
-        pg.draw.circle(glow_surf, (200, 200, 255, 40),
-                       (glow_radius, glow_radius), glow_radius)
-        canvas.blit(glow_surf, (self.pos.x - glow_radius, self.pos.y - glow_radius))
-
-        # --- Boss sprite ---
-        image = self.image.copy()
-        image.set_alpha(self.alpha)
-        canvas.blit(image, self.rect)
-
-        # --- Projectiles ---
-        for proj in self.projectiles:
-            proj.draw(canvas)
-
-        # --- Health bar (same style as Pump-King) ---
-        bar_width = 600
-        bar_height = 20
-        x, y = 100, 750
-
-        # Background (empty)
-        pg.draw.rect(canvas, (50, 0, 0), (x, y, bar_width, bar_height))
-        # Filled portion
-        pg.draw.rect(canvas, (255, 80, 80),
-                     (x, y, bar_width * (self.health / self.max_health), bar_height))
-        # Border
-        pg.draw.rect(canvas, (0, 0, 0), (x, y, bar_width, bar_height), 2)
-
-        # Boss name text
-        font = pg.font.Font(None, 48)
-        text = font.render("Specter Bride", True, (255, 200, 0))
-        text_rect = text.get_rect(center=(x + bar_width // 2, y - 25))
-        canvas.blit(text, text_rect)
+        glow_radius = self.glow.get_width() // 2
+        pos = queue.lerp(self, self.pos)
+        queue.push(self.glow, (pos[0] - glow_radius, pos[1] - glow_radius), render.ENTITIES)
+
+        # --- Boss sprite (faded by the queue: variant or texture alpha) ---
+        queue.push(self.image, queue.lerp(self, self.rect), render.ENTITIES, alpha=self.alpha)
+
+        # --- Projectiles: every trail, then the wisps on top ---
+        self.projectiles.draw(queue)
 
     def take_damage(self, amount):
         if not self.alive:
@@ -174,77 +162,13 @@ class SpecterBride:
         self.health = self.max_health
         self.alive = True
         self.projectiles.clear()
-        self.attack_timer = random.uniform(1.0, 2.0)
+        self.attack_timer = self.rng.uniform(1.0, 2.0)
         self.just_attacked = False
         self.dashing = False
-        self.dash_timer = random.uniform(3.0, 6.0)
+        self.dash_timer = self.rng.uniform(3.0, 6.0)
+        self.dash_time_left = 0
         self.alpha = 0
-
-
-# === Simple projectile class for Specter Bride attacks ===
-class WispProjectile:
-    # --- Load once, globally ---
-    wisp_image = None
-
-    def __init__(self, pos, direction, screen_width=800, screen_height=800):
-        self.pos = pg.Vector2(pos)
-        self.vel = direction * 150
-        self.alive = True
-        self.lifetime = 3.0
-        self.radius = 12
-        
-        # Screen boundaries for projectiles
-        self.screen_width = screen_width
-        self.screen_height = screen_height
-
-        # Load wisp image once
-        if WispProjectile.wisp_image is None:
-            img = pg.image.load("Art/whisp.png").convert_alpha()
-            WispProjectile.wisp_image = pg.transform.scale(img, (48, 48))
-
-        self.image = WispProjectile.wisp_image
-        self.rect = self.image.get_rect(center=(int(self.pos.x), int(self.pos.y)))
-
-        # --- Trail system ---
-        self.trail = []  # list of (pos, life)
-        self.trail_timer = 0.0
-        self.trail_interval = 0.05  # seconds between new trail points
-
-    def update(self, dt):
-        self.pos += self.vel * dt
-        
-        # Keep projectiles in bounds (optional - remove if you want them to leave screen)
-        margin = 24  # Half of projectile size
-        if self.pos.x < -margin or self.pos.x > self.screen_width + margin or \
-           self.pos.y < -margin or self.pos.y > self.screen_height + margin:
-            self.alive = False
-            
-        self.lifetime -= dt
-        self.rect.center = (int(self.pos.x), int(self.pos.y))
-        if self.lifetime <= 0:
-            self.alive = False
-
-        # --- Trail logic ---
-        self.trail_timer += dt
-        if self.trail_timer >= self.trail_interval:
-            self.trail.append([self.pos.copy(), 0.6])  # (position, lifetime)
-            self.trail_timer = 0.0
-
-        # Fade old trail particles
-        for t in self.trail:
-            t[1] -= dt
-        self.trail = [t for t in self.trail if t[1] > 0]
-
-    def draw(self, surface):
-        # --- Draw trail ---
-        for pos, life in self.trail:
-            alpha = int(180 * (life / 0.6))
-            scale = 0.6 + 0.4 * (life / 0.6)
-            w, h = self.image.get_size()
-            trail_img = pg.transform.smoothscale(self.image, (int(w * scale), int(h * scale)))
-            trail_img.set_alpha(alpha)
-            rect = trail_img.get_rect(center=(int(pos.x), int(pos.y)))
-            surface.blit(trail_img, rect)
-
-        # --- Draw main wisp ---
-        surface.blit(self.image, self.rect)
\ No newline at end of file
+        # the float path follows float_timer from wherever the boss is
+        self.float_timer = 0
+        self.pos.update(self.spawn_pos)
+        self.rect.center = self.pos
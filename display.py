@@ -0,0 +1,229 @@
+import time
+import pygame as pg
+import assets
+
+# Logical resolution: world units and UI layout are always in these
+WIDTH, HEIGHT = 800, 800
+
+# Past this fraction of the screen a full flip is cheaper than update(rects)
+FULL_FLIP_THRESHOLD = 0.5
+
+# Dirty-rect mode: draw code calls mark() for regions whose pixels changed
+# and present() pushes only those to the window. Off = always flip.
+dirty_mode = False
+
+# The game draws onto canvas, which is the logical size times render_scale
+# (e.g. 0.5 to cut fill cost on slow machines). present() scales it once to
+# fit the window, which can be resized or fullscreen. At scale 1 in an
+# 800x800 window the canvas is the window itself and nothing is scaled.
+render_scale = 1.0
+canvas = None
+window = None
+_window_size = None
+
+# "surface" blits onto the window surface as above. "texture" draws through
+# SDL's Renderer (textures.py): the arena's render queue becomes textured
+# quads and the canvas is only used for menus and overlays, uploaded where
+# it changed. The renderer scales to the window itself, so render_scale is
+# always 1 there.
+backend = "surface"
+texture_renderer = None
+_canvas_drawn = False  # canvas touched this frame (texture backend)
+_queued = False        # a render queue was drawn this frame
+
+_rects = []
+_full = True
+_screen = None
+_present_times = []  # seconds, since the mode last changed
+_counts = {"flip": 0, "update": 0, "skip": 0}
+
+
+def open_window(scale=1.0, fullscreen=False, caption="Maskquerade", use_backend="surface"):
+    """Create the window and canvas. Returns the canvas.
+
+    use_backend is "surface", "texture" or "texture-software" (the texture
+    backend on SDL's software renderer, for machines without a GPU).
+    """
+    global backend, texture_renderer, canvas, render_scale
+    if use_backend.startswith("texture"):
+        import textures  # needs pygame._sdl2
+        backend = "texture"
+        # a hidden display mode so convert()/convert_alpha() keep working
+        pg.display.set_mode((1, 1), pg.HIDDEN)
+        texture_renderer = textures.TextureRenderer((WIDTH, HEIGHT), caption, fullscreen,
+                                                    software=use_backend == "texture-software")
+        render_scale = 1.0
+        canvas = pg.Surface((WIDTH, HEIGHT), pg.SRCALPHA).convert_alpha()
+        mark_all()
+        return canvas
+
+    if fullscreen:
+        pg.display.set_mode((0, 0), pg.FULLSCREEN)
+    else:
+        pg.display.set_mode((WIDTH, HEIGHT), pg.RESIZABLE)
+    pg.display.set_caption(caption)
+    set_render_scale(scale)
+    return canvas
+
+
+def set_render_scale(scale):
+    global render_scale
+    if backend == "texture":
+        return  # the renderer does the scaling
+    render_scale = scale
+    _layout()
+
+
+def _layout():
+    """Pick the canvas for the current window size and render scale."""
+    global canvas, window, _window_size
+    window = pg.display.get_surface()
+    _window_size = window.get_size()
+    size = (round(WIDTH * render_scale), round(HEIGHT * render_scale))
+    if size == window.get_size():
+        canvas = window
+    elif canvas is None or canvas is window or canvas.get_size() != size:
+        canvas = pg.Surface(size).convert()
+    if canvas is not window:
+        window.fill((0, 0, 0))  # letterbox bars
+    mark_all()
+
+
+def _view_rect():
+    """Largest square-aspect rect centred in the window."""
+    ww, wh = window.get_size()
+    scale = min(ww / WIDTH, wh / HEIGHT)
+    rect = pg.Rect(0, 0, round(WIDTH * scale), round(HEIGHT * scale))
+    rect.center = (ww // 2, wh // 2)
+    return rect
+
+
+def scaled(surface):
+    """surface at render scale (shared, cached). Draw code works in logical units."""
+    if render_scale == 1:
+        return surface
+    return assets.variant(surface, scale=render_scale)
+
+
+def to_screen(pos):
+    """Logical position -> canvas pixels."""
+    if render_scale == 1:
+        return pos
+    return (int(pos[0] * render_scale), int(pos[1] * render_scale))
+
+
+def begin(screen):
+    """Start a frame of screen; switching screens repaints everything."""
+    global _screen
+    if screen != _screen:
+        _screen = screen
+        mark_all()
+
+
+def draw_queue(queue):
+    """Draw a frame's RenderQueue with the current backend."""
+    global _queued, _canvas_drawn
+    if backend == "texture":
+        canvas.fill((0, 0, 0, 0))  # the canvas only holds overlays now
+        _canvas_drawn = False
+        queue.flush(texture_renderer)
+        _queued = True
+    else:
+        queue.flush(canvas)
+        mark_all()  # the arena redraws everything each frame
+
+
+def mark(rect):
+    """Register a region touched this frame (anything pg.Rect accepts)."""
+    global _canvas_drawn
+    _canvas_drawn = True
+    if (dirty_mode or backend == "texture") and not _full:
+        _rects.append(pg.Rect(rect))
+
+
+def mark_all():
+    global _full, _canvas_drawn
+    _full = True
+    _canvas_drawn = True
+
+
+def present():
+    """Show the frame: a flip, an update of the dirty rects, or nothing."""
+    global _full, _queued, _canvas_drawn
+    start = time.perf_counter()
+    if backend == "texture":
+        # menus: the canvas is the whole frame; arena: only if an overlay was drawn
+        if _canvas_drawn or not _queued:
+            texture_renderer.draw_canvas(canvas, None if _full else _rects)
+        texture_renderer.present()
+        _counts["flip"] += 1
+        _queued = _canvas_drawn = False
+        _finish_present(start)
+        return
+
+    screen = pg.display.get_surface()
+    if screen is not window or screen.get_size() != _window_size:
+        _layout()  # window was resized
+
+    if canvas is not window:
+        # scale the whole canvas into the window, letterboxed
+        view = _view_rect()
+        if view.size == canvas.get_size():
+            window.blit(canvas, view)
+        else:
+            pg.transform.scale(canvas, view.size, window.subsurface(view))
+        pg.display.flip()
+        _counts["flip"] += 1
+    elif not dirty_mode or _full:
+        pg.display.flip()
+        _counts["flip"] += 1
+    else:
+        bounds = screen.get_rect()
+        rects = [r.clip(bounds) for r in _rects]
+        rects = [r for r in rects if r.width and r.height]
+        area = sum(r.width * r.height for r in rects)
+        if area > FULL_FLIP_THRESHOLD * bounds.width * bounds.height:
+            pg.display.flip()
+            _counts["flip"] += 1
+        elif rects:
+            pg.display.update(rects)
+            _counts["update"] += 1
+        else:
+            _counts["skip"] += 1
+    _finish_present(start)
+
+
+def _finish_present(start):
+    global _full
+    _rects.clear()
+    _full = False
+    _present_times.append(time.perf_counter() - start)
+    if len(_present_times) > 600:
+        del _present_times[:300]
+
+
+def set_dirty_mode(enabled):
+    global dirty_mode
+    dirty_mode = enabled
+    _present_times.clear()
+    for key in _counts:
+        _counts[key] = 0
+    mark_all()
+
+
+def toggle_dirty_mode():
+    """Switch modes at runtime (F8), printing how the old one did."""
+    print(f"present: {'dirty rects' if dirty_mode else 'flip'} -> {stats_line()}")
+    set_dirty_mode(not dirty_mode)
+    print(f"present: now using {'dirty rects' if dirty_mode else 'full flips'}")
+
+
+def stats():
+    avg = sum(_present_times) / len(_present_times) if _present_times else 0.0
+    return dict(_counts, dirty_mode=dirty_mode, present_ms=avg * 1000)
+
+
+def stats_line():
+    s = stats()
+    return (f"avg present {s['present_ms']:.2f} ms "
+            f"({s['flip']} flips, {s['update']} rect updates, {s['skip']} skipped)")
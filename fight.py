@@ -0,0 +1,257 @@
+import random
+import numpy as np
+import pygame as pg
+import particles
+import pool
+from spatial import SpatialGrid
+
+# Simulation rate, independent of how fast frames are drawn
+TICK_RATE = 120
+TICK = 1 / TICK_RATE
+# Longest frame the simulation catches up on; anything slower plays in slow
+# motion rather than running hundreds of ticks in one go
+MAX_FRAME_TIME = 0.25
+# Keys the player acts on when hit, in the order a tick applies them
+ACTION_KEYS = (pg.K_1, pg.K_2, pg.K_m, pg.K_SPACE, pg.K_f, pg.K_h)
+
+
+class Fight:
+    """The player against one boss, simulated in fixed TICK steps.
+
+    advance() runs as many ticks as the frame's real time covers and carries
+    the remainder over to the next frame, so gameplay runs at the same speed
+    whatever the frame rate. Before every tick each moving thing's position
+    is kept as prev_pos; draw() then places sprites between the last two
+    ticks by the fraction of a tick left over (see RenderQueue.lerp).
+
+    hostiles is a SpatialGrid of the boss and its live minions, rebuilt
+    each tick, for player shots to find what they hit and homing wisps
+    their nearest target.
+
+    A fight is deterministic: everything random draws from generators
+    restart() seeds, and key presses wait for the next tick, which applies
+    them in ACTION_KEYS order. The same start, seed and per-tick input
+    always play out the same, which is what replay.py records.
+    """
+
+    def __init__(self, player, boss, can_use_mask=False, unlocked_masks=None):
+        self.player = player
+        self.boss = boss
+        self.can_use_mask = can_use_mask
+        self.unlocked_masks = unlocked_masks if unlocked_masks is not None else set()
+        self.accumulator = 0.0
+        self.interp = 1.0  # how far draw() is between the last two ticks
+        self.ticks = 0
+        self.hostiles = SpatialGrid()
+        self.seed = None
+        self.pressed = set()  # ACTION_KEYS hit since the last tick
+        self.recorder = None  # a replay.Recorder, called after every tick
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["recorder"] = None
+        return state
+
+    @property
+    def won(self):
+        return not getattr(self.boss, "alive", False)
+
+    def handle_event(self, event):
+        """One-shot input: masks, dash, attack, heal. Applied by the next
+        tick; hitting a key twice before then counts once."""
+        if event.type == pg.KEYDOWN and event.key in ACTION_KEYS:
+            self.pressed.add(event.key)
+
+    def apply_presses(self):
+        """Hand the keys hit since the last tick to the player."""
+        player = self.player
+        for key in ACTION_KEYS:
+            if key in self.pressed:
+                event = pg.event.Event(pg.KEYDOWN, key=key)
+                player.player_mask_check(event, self.can_use_mask, self.unlocked_masks)
+                player.player_dash(event)
+                player.player_attack(event, self.boss)
+                player.player_heal(event)
+
+    def advance(self, frame_time, keys):
+        """Run the ticks frame_time covers; returns how many ran.
+
+        keys is anything indexable by key constant (pg.key.get_pressed()).
+        """
+        self.accumulator += min(frame_time, MAX_FRAME_TIME)
+        ticks = 0
+        while self.accumulator >= TICK and not self.won:
+            self.tick(keys)
+            self.accumulator -= TICK
+            ticks += 1
+        self.interp = min(1.0, self.accumulator / TICK)
+        return ticks
+
+    def tick(self, keys):
+        """One TICK of simulation."""
+        self.apply_presses()
+        self.snapshot()
+        player, boss = self.player, self.boss
+
+        player.update_dash(TICK)
+        player.player_move(TICK, keys)
+        player.update(TICK, getattr(boss, "projectiles", None))
+        self.hostiles.build(self.live_hostiles())
+        player.update_attacks(TICK, boss, self.hostiles)
+        self.player_hits()
+        player.update_heal(TICK)
+        particles.update(TICK)
+        player.update_dash_indicator(TICK)
+
+        if boss.alive:
+            boss.update(TICK, player)
+        self.ticks += 1
+        # cleared before recording: a keyframe taken now mustn't apply them again
+        pressed, self.pressed = self.pressed, set()
+        if self.recorder is not None:
+            self.recorder.record(self, keys, pressed)
+
+    def live_hostiles(self):
+        """Live minions, then the boss if it's still up."""
+        boss = self.boss
+        for m in getattr(boss, "minions", ()):
+            if getattr(m, "alive", True):
+                yield m
+        if getattr(boss, "alive", False) and hasattr(boss, "rect"):
+            yield boss
+
+    def player_hits(self):
+        """Player projectiles against minions and the boss.
+
+        Shots that update_attacks just spent on the boss still count here,
+        as they always have.
+        """
+        player, boss = self.player, self.boss
+        shots = player.projectiles
+        if not len(shots):
+            return
+        minions = [m for m in self.live_hostiles() if m is not boss]
+
+        # each shot hits the first minion it touches
+        if minions:
+            first = shots.first_overlap([m.rect for m in minions], live_only=False)
+            for row in (first >= 0).nonzero()[0].tolist():
+                m = minions[first[row]]
+                dmg = int(shots.damage[row])
+                if hasattr(m, "health"):
+                    m.health -= dmg
+                else:
+                    m.alive = False
+                shots.alive[row] = False
+
+        # and the boss itself (if still alive)
+        if getattr(boss, "alive", False) and hasattr(boss, "rect"):
+            for row in shots.overlapping(boss.rect, live_only=False).tolist():
+                if not boss.alive:
+                    break
+                dmg = int(shots.damage[row])
+                # call take_damage if available, otherwise decrement health
+                if hasattr(boss, "take_damage"):
+                    boss.take_damage(dmg)
+                elif hasattr(boss, "health"):
+                    boss.health -= dmg
+                shots.alive[row] = False
+
+        shots.compact()
+
+    def movers(self):
+        """Everything with a pos that moves between ticks (projectiles keep
+        their own, see ProjectileWorld.snapshot)."""
+        boss = self.boss
+        yield self.player
+        yield boss
+        yield from getattr(boss, "minions", ())
+
+    def snapshot(self):
+        """Keep where everything is before a tick, for draw interpolation."""
+        for obj in self.movers():
+            obj.prev_pos = (obj.pos[0], obj.pos[1])
+        self.player.projectiles.snapshot()
+        if hasattr(self.boss, "projectiles"):
+            self.boss.projectiles.snapshot()
+
+    def draw(self, queue):
+        queue.interp = self.interp
+        self.player.draw(queue)
+        if self.boss.alive:
+            self.boss.draw(queue)
+        particles.draw(queue)
+
+    def pool_stats(self):
+        """Live, free and high-water counts of everything recycled in a fight:
+        the object pools, particle rows and projectile rows."""
+        stats = dict(pool.stats())
+        stats.update({f"particles.{name}": s for name, s in particles.stats().items()})
+        stats["player shots"] = self.player.projectiles.stats()
+        if hasattr(self.boss, "projectiles"):
+            stats["boss shots"] = self.boss.projectiles.stats()
+        return stats
+
+    def reseed(self, seed=None):
+        """Seed every random source the simulation draws from (a fresh
+        random seed if None) and keep the seed as self.seed."""
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        boss = self.boss
+        if hasattr(boss, "rng"):
+            boss.rng.seed(seed)
+        streams = np.random.SeedSequence(seed).spawn(4)
+        self.player.projectiles.seed(streams[0])
+        if hasattr(boss, "projectiles"):
+            boss.projectiles.seed(streams[1])
+        particles.ground.seed(streams[2])
+        particles.effects.seed(streams[3])
+
+    def restart(self, seed=None):
+        """Put the player and boss back to the start of the fight, with
+        everything random reseeded from seed (see reseed()). Every attempt
+        with the same seed and input plays out the same."""
+        self.reseed(seed)
+        player, boss = self.player, self.boss
+        player.pos = [400, 400]
+        player.rect.topleft = player.pos
+        player.current_health = player.max_health
+        player.display_health = player.max_health
+        player.current_flasks = player.max_flasks
+        player.dead = False
+        player.death_timer = 0
+        player.death_fade_alpha = 0
+        player.projectiles.clear()
+        particles.clear()
+        player.invuln_timer = 0
+        player.healing = False
+        player.heal_timer = 0
+        player.dashing = False
+        player.dash_timer = 0
+        player.cooldown_timer = 0
+        player.dash_was_ready = True
+        player.dash_flash_alpha = 0
+        player.dash_fade_alpha = 255
+        player.dash_inactive_timer = 0
+        player.attack_timer = 0
+        player.attack_direction = "right"
+        player.foot_timer = 0
+        player.hit_flash_alpha = 0
+        # Safe reset for boss
+        if hasattr(boss, "max_health"):
+            boss.health = boss.max_health
+        if hasattr(boss, "reset"):
+            boss.reset()
+        else:
+            boss.alive = True
+            if hasattr(boss, "projectiles"):
+                boss.projectiles.clear()
+            if hasattr(boss, "minions"):
+                boss.minions.clear()
+
+        self.accumulator = 0.0
+        self.interp = 1.0
+        self.ticks = 0
+        self.pressed.clear()
+        self.snapshot()
@@ -0,0 +1,57 @@
+import pygame as pg
+from collections import OrderedDict
+
+# How many Font objects / rendered strings to keep around
+MAX_FONTS = 16
+MAX_RENDERS = 256
+
+_fonts = OrderedDict()
+_renders = OrderedDict()
+_stats = {"font_hits": 0, "font_misses": 0, "render_hits": 0, "render_misses": 0}
+
+
+def get(size, name=None):
+    """Shared pg.font.Font for (name, size); name None is pygame's default font."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is not None:
+        _fonts.move_to_end(key)
+        _stats["font_hits"] += 1
+        return font
+
+    _stats["font_misses"] += 1
+    font = pg.font.Font(name, size)
+    _fonts[key] = font
+    if len(_fonts) > MAX_FONTS:
+        _fonts.popitem(last=False)
+    return font
+
+
+def render(text, size, color, antialias=True, name=None):
+    """Rendered text surface, cached by (text, size, color, antialias).
+
+    The surface is shared, so don't draw on it. If you change its alpha,
+    put it back afterwards.
+    """
+    key = (text, size, tuple(color), antialias, name)
+    surface = _renders.get(key)
+    if surface is not None:
+        _renders.move_to_end(key)
+        _stats["render_hits"] += 1
+        return surface
+
+    _stats["render_misses"] += 1
+    surface = get(size, name).render(text, antialias, color)
+    _renders[key] = surface
+    if len(_renders) > MAX_RENDERS:
+        _renders.popitem(last=False)
+    return surface
+
+
+def clear():
+    _fonts.clear()
+    _renders.clear()
+
+
+def stats():
+    return dict(_stats, fonts=len(_fonts), renders=len(_renders))
@@ -0,0 +1,300 @@
+"""Headless fights: the real simulation with no window, no drawing and no
+frame cap, as fast as the CPU allows.
+
+For measuring simulation cost apart from rendering and for running balance
+and regression checks in bulk. Input comes from a policy object instead of
+the keyboard. From the repo root:
+
+    python headless.py Pumpking --seconds=60 --policy=chaser --runs=5 --seed=1
+
+or from code:
+
+    import headless
+    result = headless.run_fight("Specter Bride", seconds=30, policy=headless.Chaser())
+    print(result.outcome, result.ticks_per_second)
+"""
+import contextlib
+import importlib
+import io
+import os
+import random
+import sys
+import time
+
+import pygame as pg
+
+import assets
+import particles
+from fight import Fight, TICK
+
+# boss name -> (module, class); imported the first time they're needed
+BOSSES = {
+    "Pumpking": ("pumking", "Pumpking"),
+    "Specter Bride": ("bride", "SpecterBride"),
+    "Scarecrow Lord": ("ScarecrowLordStub", "ScarecrowLord"),
+}
+
+
+# -------------------------------------------------------------------
+# === Input ===
+# -------------------------------------------------------------------
+
+class Keys:
+    """Stands in for pg.key.get_pressed(): keys[k] is True while k is held."""
+
+    def __init__(self, held=()):
+        self.held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class Policy:
+    """Plays the player. act() is called once per tick and returns
+    (held, pressed): the keys held down this tick and the keys hit this
+    tick (delivered as KEYDOWN events, so dash/attack/heal/masks work as
+    they do from the keyboard)."""
+
+    def reset(self):
+        pass
+
+    def act(self, fight):
+        raise NotImplementedError
+
+
+class Idle(Policy):
+    """Stands still and does nothing: how long the boss takes to win."""
+
+    def act(self, fight):
+        return (), ()
+
+
+class Script(Policy):
+    """Replays a keyboard timeline of (seconds, key, down) entries.
+
+    A key is held from its down entry until its up entry; each down entry
+    is also a key press.
+    """
+
+    def __init__(self, timeline):
+        self.timeline = sorted(timeline, key=lambda entry: entry[0])
+        self.reset()
+
+    def reset(self):
+        self._next = 0
+        self._held = set()
+
+    def act(self, fight):
+        now = fight.ticks * TICK
+        pressed = []
+        while self._next < len(self.timeline) and self.timeline[self._next][0] <= now:
+            _, key, down = self.timeline[self._next]
+            if down:
+                self._held.add(key)
+                pressed.append(key)
+            else:
+                self._held.discard(key)
+            self._next += 1
+        return self._held, pressed
+
+
+class Chaser(Policy):
+    """A simple bot: lines up with the boss, closes in, shoots whenever it
+    can, dashes when a shot is about to land and drinks a flask when low."""
+
+    def __init__(self, distance=250, dodge_distance=90, heal_below=40):
+        self.distance = distance  # how close it gets sideways
+        self.dodge_distance = dodge_distance
+        self.heal_below = heal_below
+
+    def act(self, fight):
+        player, boss = fight.player, fight.boss
+        center = pg.Vector2(player.rect.center)
+        target = pg.Vector2(boss.rect.center)
+        held = set()
+        pressed = []
+
+        dx, dy = target.x - center.x, target.y - center.y
+        if abs(dy) > 20:
+            held.add(pg.K_s if dy > 0 else pg.K_w)
+        # moving sideways also turns the player to face the boss
+        if abs(dx) > self.distance or (dx > 0) != player.direction:
+            held.add(pg.K_d if dx > 0 else pg.K_a)
+
+        if player.attack_timer <= 0:
+            pressed.append(pg.K_f)
+        if player.cooldown_timer <= 0 and not player.dashing:
+            shots = getattr(boss, "projectiles", None)
+            if shots is not None and shots.within(center, self.dodge_distance):
+                pressed.append(pg.K_SPACE)
+        if (player.current_health < self.heal_below and player.current_flasks > 0
+                and not player.healing):
+            pressed.append(pg.K_h)
+        return held, pressed
+
+
+POLICIES = {"idle": Idle, "chaser": Chaser}
+
+
+# -------------------------------------------------------------------
+# === Running fights ===
+# -------------------------------------------------------------------
+
+class FightResult:
+    """Outcome and counters of one headless fight."""
+
+    def __init__(self, boss_name, seed):
+        self.boss = boss_name
+        self.seed = seed
+        self.outcome = "timeout"  # "won", "lost" or "timeout"
+        self.ticks = 0
+        self.wall_time = 0.0  # seconds spent simulating
+        self.max_tick_time = 0.0
+        self.player_health = 0
+        self.flasks_used = 0
+        self.boss_health = 0
+        self.boss_max_health = 0
+        self.peak_projectiles = 0  # boss + player projectiles alive at once
+        self.peak_minions = 0
+        self.pools = {}  # Fight.pool_stats() at the end
+        self.replay = None  # replay.Replay, if recorded
+
+    @property
+    def sim_time(self):
+        return self.ticks * TICK
+
+    @property
+    def ticks_per_second(self):
+        return self.ticks / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def mean_tick_time(self):
+        return self.wall_time / self.ticks if self.ticks else 0.0
+
+    def summary(self):
+        return (f"{self.boss:<15} {self.outcome:<8} {self.sim_time:6.1f} s sim  "
+                f"boss {self.boss_health:>5}/{self.boss_max_health:<5} player {self.player_health:>3} "
+                f"flasks {self.flasks_used}  peak shots {self.peak_projectiles:>3} minions {self.peak_minions:>3}  "
+                f"{self.mean_tick_time * 1e6:7.1f} us/tick (max {self.max_tick_time * 1e3:.2f} ms) "
+                f"{self.sim_time / self.wall_time if self.wall_time else 0:7.0f}x realtime")
+
+
+def setup():
+    """Open a 1x1 window on SDL's dummy driver if nothing is open yet.
+
+    Surfaces still need a display to convert against; nothing is drawn.
+    """
+    if pg.display.get_surface() is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pg.display.init()
+        pg.display.set_mode((1, 1))
+
+
+def new_player():
+    import player as p
+    right = assets.image("Art/player.png", (128, 128))
+    masked_right = assets.image("Art/player_masked.png", (128, 128))
+    return p.player([400, 400], False, False, assets.variant(right, flip=True), right, 300,
+                    assets.variant(masked_right, flip=True), masked_right)
+
+
+def new_boss(name, seed=None):
+    module, cls = BOSSES[name]
+    boss = getattr(importlib.import_module(module), cls)((400, 300), random.Random(seed))
+    boss.name = name
+    return boss
+
+
+def run_fight(boss_name, seconds=60.0, policy=None, seed=None, masks=(), quiet=True, record=False):
+    """Fight boss_name for up to seconds of game time; returns a FightResult.
+
+    policy defaults to Idle(). seed seeds the fight (a random one if None;
+    result.seed has it either way). masks lists the unlocked masks
+    ("pumpkin", "specter"). quiet drops the game's prints (hit messages)
+    instead of writing them out. record=True keeps a replay.Replay of the
+    fight as result.replay.
+    """
+    setup()
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    policy = policy or Idle()
+    policy.reset()
+
+    player = new_player()
+    boss = new_boss(boss_name, seed)
+    fight = Fight(player, boss, can_use_mask=bool(masks), unlocked_masks=set(masks))
+    fight.restart(seed)
+    if record:
+        import replay
+        replay.start(fight, boss_name)
+    flasks = player.current_flasks
+
+    result = FightResult(boss_name, seed)
+    max_ticks = int(round(seconds / TICK))
+    minions = getattr(boss, "minions", [])
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    clock = time.perf_counter
+    with output:
+        start = clock()
+        while fight.ticks < max_ticks:
+            held, pressed = policy.act(fight)
+            for key in pressed:
+                fight.handle_event(pg.event.Event(pg.KEYDOWN, key=key))
+
+            t0 = clock()
+            fight.tick(Keys(held))
+            tick_time = clock() - t0
+            if tick_time > result.max_tick_time:
+                result.max_tick_time = tick_time
+
+            shots = len(player.projectiles) + len(getattr(boss, "projectiles", ()))
+            result.peak_projectiles = max(result.peak_projectiles, shots)
+            result.peak_minions = max(result.peak_minions, len(minions))
+            if fight.won:
+                result.outcome = "won"
+                break
+            if player.dead:
+                result.outcome = "lost"
+                break
+        result.wall_time = clock() - start
+
+    result.ticks = fight.ticks
+    result.player_health = player.current_health
+    result.flasks_used = flasks - player.current_flasks
+    result.boss_health = max(0, boss.health)
+    result.boss_max_health = boss.max_health
+    result.pools = fight.pool_stats()
+    if record:
+        result.replay = fight.recorder.finish(fight)
+        fight.recorder = None
+    if hasattr(boss, "minions"):
+        boss.reset()  # minions still up go back to their pool
+    particles.clear()
+    return result
+
+
+def _boss_name(arg):
+    for name in BOSSES:
+        if arg.replace(" ", "").lower() == name.replace(" ", "").lower():
+            return name
+    raise SystemExit(f"unknown boss {arg!r}, pick one of: {', '.join(BOSSES)}")
+
+
+if __name__ == "__main__":
+    names = [_boss_name(a) for a in sys.argv[1:] if not a.startswith("--")] or list(BOSSES)
+    seconds, runs, seed, policy = 60.0, 1, None, "chaser"
+    for arg in sys.argv[1:]:
+        if arg.startswith("--seconds="):
+            seconds = float(arg.split("=", 1)[1])
+        elif arg.startswith("--runs="):
+            runs = int(arg.split("=", 1)[1])
+        elif arg.startswith("--seed="):
+            seed = int(arg.split("=", 1)[1])
+        elif arg.startswith("--policy="):
+            policy = arg.split("=", 1)[1]  # idle or chaser
+
+    for name in names:
+        for run in range(runs):
+            result = run_fight(name, seconds, POLICIES[policy](), None if seed is None else seed + run)
+            print(result.summary())
+    pg.quit()
@@ -0,0 +1,137 @@
+import pygame as pg
+import fonts
+import render
+
+
+def _surface(size, alpha=False):
+    surface = pg.Surface(size, pg.SRCALPHA) if alpha else pg.Surface(size)
+    if pg.display.get_surface() is not None:
+        surface = surface.convert_alpha() if alpha else surface.convert()
+    return surface
+
+
+class Widget:
+    """A HUD element drawn into cached surfaces.
+
+    key() boils the watched values down to what actually changes pixels
+    (bar widths in whole pixels, alpha levels, flask counts); build() only
+    runs when that key changes. Everything else reuses the last blits.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._blits = []
+        self.redraws = 0
+
+    def blits(self, source):
+        key = self.key(source)
+        if key != self._key:
+            self._key = key
+            self._blits = self.build(*key)
+            self.redraws += 1
+        return self._blits
+
+    def key(self, source):
+        raise NotImplementedError
+
+    def build(self, *key):
+        raise NotImplementedError
+
+
+class PlayerHealthBar(Widget):
+    """Health bar plus a row of flasks, top left."""
+    pos = (20, 20)
+    width, height = 200, 20
+
+    def key(self, player):
+        ratio = max(0, player.display_health / player.max_health)
+        return int(self.width * ratio), player.current_flasks, player.max_flasks
+
+    def build(self, fill, flasks, max_flasks):
+        x, y = self.pos
+        surface = _surface((max(self.width + 4, 2 + max_flasks * 25), self.height + 34), alpha=True)
+        surface.fill((0, 0, 0, 0))
+
+        # Surface starts at the 2px border, so the bar itself sits at (2, 2)
+        pg.draw.rect(surface, (40, 0, 0), (0, 0, self.width + 4, self.height + 4))
+        pg.draw.rect(surface, (100, 0, 0), (2, 2, self.width, self.height))
+        pg.draw.rect(surface, (180, 30, 30), (2, 2, fill, self.height))
+
+        for i in range(max_flasks):
+            color = (200, 180, 80) if i < flasks else (80, 80, 40)
+            pg.draw.rect(surface, color, (2 + i * 25, 2 + 30, 20, 20))
+        return [(surface, (x - 2, y - 2))]
+
+
+class DashBar(Widget):
+    """Dash cooldown bar that flashes when ready and fades out when idle."""
+    pos = (20, 80)
+    width, height = 200, 20
+    color = (79, 121, 66)
+
+    def key(self, player):
+        ratio = 1 - (player.cooldown_timer / player.dash_cooldown)
+        ratio = max(0, min(1, ratio))
+        return int(self.width * ratio), int(player.dash_fade_alpha), max(0, int(player.dash_flash_alpha))
+
+    def build(self, fill, fade, flash):
+        if fade <= 0:
+            return []
+        bar = _surface((self.width, self.height), alpha=True)
+        bar.fill((0, 0, 0, 0))
+        pg.draw.rect(bar, (30, 30, 30, int(fade * 0.5)), (0, 0, self.width, self.height))
+        pg.draw.rect(bar, (*self.color, fade), (0, 0, fill, self.height))
+        blits = [(bar, self.pos)]
+
+        if flash > 0:
+            overlay = _surface((self.width, self.height), alpha=True)
+            overlay.fill((255, 255, 255, flash))
+            blits.append((overlay, self.pos))
+        return blits
+
+
+class BossBar(Widget):
+    """The big health bar along the bottom with the boss's name above it.
+
+    Bosses declare their label with a hud_label class attribute.
+    """
+    pos = (100, 750)
+    width, height = 600, 20
+
+    def key(self, boss):
+        ratio = max(0, boss.health / boss.max_health)
+        label = getattr(boss, "hud_label", getattr(boss, "name", ""))
+        return int(self.width * ratio), label
+
+    def build(self, fill, label):
+        x, y = self.pos
+        bar = _surface((self.width, self.height))
+        bar.fill((50, 0, 0))  # empty bar
+        pg.draw.rect(bar, (255, 80, 80), (0, 0, fill, self.height))  # health
+        pg.draw.rect(bar, (0, 0, 0), (0, 0, self.width, self.height), 2)  # outline
+
+        text = fonts.render(label, 48, (255, 200, 0))  # orange-yellow
+        text_rect = text.get_rect(center=(x + self.width // 2, y - 25))
+        return [(bar, self.pos), (text, text_rect)]
+
+
+class HUD:
+    """Every on-screen bar, queued together on the HUD layer."""
+
+    def __init__(self):
+        self.player_health = PlayerHealthBar()
+        self.dash = DashBar()
+        self.boss = BossBar()
+
+    def draw(self, queue, player, boss=None):
+        blits = self.player_health.blits(player) + self.dash.blits(player)
+        if boss is not None and getattr(boss, "alive", False) and hasattr(boss, "max_health"):
+            blits = blits + self.boss.blits(boss)
+        queue.extend(blits, render.HUD)
+
+    def redraws(self):
+        return {
+            "player_health": self.player_health.redraws,
+            "dash": self.dash.redraws,
+            "boss": self.boss.redraws,
+        }
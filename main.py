@@ -1,55 +1,106 @@
+import sys
+from startup import StartupTrace
+
+trace = StartupTrace(enabled="--startup-trace" in sys.argv)
+
 import pygame as pg
-import random
+trace.mark("import pygame")
+import math
 import player as p
-from pumking import Pumpking
+import assets
 import ui
-import math
-from bride import SpecterBride
-from ScarecrowLordStub import ScarecrowLord
-
-pg.init()
+import display
+import render
+from hud import HUD
+from fight import Fight
+import replay
+from arena import ArenaPrefetcher
+# Boss modules are imported by their factories the first time they're needed
+trace.mark("import game modules")
+
+# Only the subsystems we use; pg.init() would also start mixer, joystick, ...
+pg.display.init()
+pg.font.init()
 clock = pg.time.Clock()
+trace.mark("init display + font")
 
 # === CONSTANTS ===
-WIDTH, HEIGHT = 800, 800
+WIDTH, HEIGHT = display.WIDTH, display.HEIGHT  # logical size; the window can be any size
 GAME_STATE = "start"  # "start", "boss_select", "playing", "boss_cleared"
+FPS = 60  # frame cap; the fight itself always simulates at fight.TICK_RATE
 exit = False
 
 # === SETUP ===
-canvas = pg.display.set_mode((WIDTH, HEIGHT))
-pg.display.set_caption("Maskquerade")
+render_scale = 1.0
+backend = "surface"
+for arg in sys.argv:
+    if arg.startswith("--fog-quality="):
+        ui.set_fog_quality(int(arg.split("=", 1)[1]))  # baked fog bands, 0 = live fog
+    elif arg.startswith("--render-scale="):
+        render_scale = float(arg.split("=", 1)[1])  # e.g. 0.5 on slow machines
+    elif arg.startswith("--backend="):
+        backend = arg.split("=", 1)[1]  # surface, texture or texture-software
+    elif arg.startswith("--fps="):
+        FPS = int(arg.split("=", 1)[1])  # e.g. 144 on fast displays, 0 = uncapped
+# --record saves a replay of every fight attempt into replays/ (see replay.py)
+recording = "--record" in sys.argv
+canvas = display.open_window(render_scale, fullscreen="--fullscreen" in sys.argv, use_backend=backend)
+display.set_dirty_mode("--dirty-rects" in sys.argv)  # F8 toggles it in game
+trace.mark("create window")
+
+# === ASSET PRELOAD ===
+# What the menus and the player need, decoded in parallel. Boss arenas are
+# loaded by the boss select prefetcher instead. (path, alpha) - backgrounds
+# are opaque.
+STARTUP_ASSETS = [
+    ("Art/background.png", False),
+    ("Art/player.png", True),
+    ("Art/player_masked.png", True),
+    ("Art/player_masked2.png", True),
+    ("Art/mask_pumpking.png", True),
+    ("Art/mask_specter.png", True),
+    ("Art/mask_scarecrow.png", True),
+    ("Art/attack.png", True),
+    ("Art/whisp.png", True),
+]
+load_report = assets.preload(STARTUP_ASSETS)
+if "--load-report" in sys.argv:
+    load_report.print()
+trace.mark("load assets")
 
 # === BACKGROUND SETUP ===
-default_background = pg.transform.scale(pg.image.load("Art/background.png").convert(), (WIDTH, HEIGHT))
+default_background = assets.image("Art/background.png", (WIDTH, HEIGHT), alpha=False)
 background = default_background
 
 # === PLAYER ASSETS ===
-player_left = pg.transform.scale(pg.image.load("Art/player_fliped.png"), (128, 128))
-player_right = pg.transform.scale(pg.image.load("Art/player.png"), (128, 128))
-player_left_masked = pg.transform.scale(pg.image.load("Art/player_masked_fliped.png"), (128, 128))
-player_right_masked = pg.transform.scale(pg.image.load("Art/player_masked.png"), (128, 128))
+# left-facing sprites are mirrored from the right-facing ones
+player_right = assets.image("Art/player.png", (128, 128))
+player_left = assets.variant(player_right, flip=True)
+player_right_masked = assets.image("Art/player_masked.png", (128, 128))
+player_left_masked = assets.variant(player_right_masked, flip=True)
 
 # === MASK IMAGES (scaled for menu) ===
 _mask_size = (80, 80)
 
 
 mask_images = {
-    "Pumpking": pg.image.load("Art/mask_pumpking.png").convert_alpha(),
-    "Specter Bride": pg.image.load("Art/mask_specter.png").convert_alpha(),
-    "Scarecrow Lord": pg.image.load("Art/mask_scarecrow.png").convert_alpha()
+    "Pumpking": assets.image("Art/mask_pumpking.png", _mask_size, smooth=True),
+    "Specter Bride": assets.image("Art/mask_specter.png", _mask_size, smooth=True),
+    "Scarecrow Lord": assets.image("Art/mask_scarecrow.png", _mask_size, smooth=True)
 }
 
-for key in mask_images:
-    mask_images[key] = pg.transform.smoothscale(mask_images[key], _mask_size)
-
 # === PLAYER OBJECT ===
-player = p.player([400, 400], False, False, player_left, player_right, 5, player_left_masked, player_right_masked)
+player = p.player([400, 400], False, False, player_left, player_right, 300, player_left_masked, player_right_masked)
 
 boss = None
+fight = None
+hud = HUD()
+trace.mark("build player")
 
-# === CAMERA SHAKE ===
-shake_timer = 0
-shake_intensity = 0
+# === CAMERA ===
+# shake moves the world layers; the HUD stays put
+camera = render.Camera((WIDTH, HEIGHT))
+render_queue = render.RenderQueue(camera)
 
 
 # -------------------------------------------------------------------
@@ -57,19 +108,22 @@ shake_intensity = 0
 # -------------------------------------------------------------------
 
 def create_pumpking():
+    from pumking import Pumpking
     b = Pumpking((400, 300))
     b.name = "Pumpking"
-    bg = pg.transform.scale(pg.image.load("Art/background.png"), (WIDTH, HEIGHT))
+    bg = assets.image("Art/background.png", (WIDTH, HEIGHT), alpha=False)
     return b, bg
 
 def create_specter_bride():
+    from bride import SpecterBride
     b = SpecterBride((400, 300))
-    background = pg.transform.scale(pg.image.load("Art/background2.png"), (WIDTH, HEIGHT))
+    background = assets.image("Art/background2.png", (WIDTH, HEIGHT), alpha=False)
     return b, background
 
 def create_scarecrow_lord():
+    from ScarecrowLordStub import ScarecrowLord
     b = ScarecrowLord((400, 300))
-    bg = pg.transform.scale(pg.image.load("Art/background3.png"), (WIDTH, HEIGHT))
+    bg = assets.image("Art/background3.png", (WIDTH, HEIGHT), alpha=False)
     return b, bg
 
 
@@ -81,35 +135,34 @@ BOSS_FACTORIES = {
     "Scarecrow Lord": create_scarecrow_lord
 }
 
+# Images each arena needs, so boss select can prefetch them
+BOSS_ARENA_ASSETS = {
+    "Pumpking": [("Art/background.png", False), ("Art/boss1.png", True), ("Art/boss_attack.png", True)],
+    "Specter Bride": [("Art/background2.png", False), ("Art/Specter_Bride.png", True), ("Art/whisp.png", True)],
+    "Scarecrow Lord": [("Art/background3.png", False), ("Art/boss3.png", True), ("Art/boss3M.png", True)],
+}
+
+arena_prefetch = ArenaPrefetcher(BOSS_FACTORIES, BOSS_ARENA_ASSETS)
+
 
 
 # === RESTART ===
-def restart_game(player, boss):
-    player.pos = [400, 400]
-    player.rect.topleft = player.pos
-    player.current_health = player.max_health
-    player.display_health = player.max_health
-    player.current_flasks = player.max_flasks
-    player.dead = False
-    player.death_timer = 0
-    player.death_fade_alpha = 0
-    player.projectiles.clear()
-    player.foot_particles.clear()
-    player.invuln_timer = 0
-    player.healing = False
-    player.dashing = False
-    # Safe reset for boss
-    if boss is not None:
-        if hasattr(boss, "max_health"):
-            boss.health = boss.max_health
-        if hasattr(boss, "reset"):
-            boss.reset()
-        else:
-            boss.alive = True
-            if hasattr(boss, "projectiles"):
-                boss.projectiles.clear()
-            if hasattr(boss, "minions"):
-                boss.minions.clear()
+def restart_game():
+    stop_recording()
+    fight.restart()
+    camera.reset()
+    if recording:
+        replay.start(fight, current_boss_name)
+
+def stop_recording():
+    path = replay.stop(fight)
+    if path:
+        print(f"replay saved: {path}")
+
+def drop_fight():
+    # minions go back to their pool before the fight is let go (as replay._discard does)
+    if fight is not None and hasattr(boss, "minions"):
+        boss.reset()
 
 # === GAME VARIABLES ===
 boss_names = ["Pumpking", "Specter Bride", "Scarecrow Lord"]
@@ -121,12 +174,15 @@ current_boss_name = ""
 
 # === MAIN LOOP ===
 while not exit:
-    dt = clock.tick(60) / 1000
+    dt = clock.tick(FPS) / 1000
+    canvas = display.canvas  # changes when the window is resized
 
     if GAME_STATE == "start":
         ui.draw_start_screen(canvas, dt)
+        trace.first_frame(load_report)
         for event in pg.event.get():
             if event.type == pg.QUIT: exit = True
+            elif event.type == pg.KEYDOWN and event.key == pg.K_F8: display.toggle_dirty_mode()
             elif event.type == pg.KEYDOWN:
                 if event.key == pg.K_RETURN:
                     GAME_STATE = "intro"
@@ -138,6 +194,7 @@ while not exit:
         ui.draw_intro_screen(canvas, dt)
         for event in pg.event.get():
             if event.type == pg.QUIT: exit = True
+            elif event.type == pg.KEYDOWN and event.key == pg.K_F8: display.toggle_dirty_mode()
             elif event.type == pg.KEYDOWN:
                 if event.key == pg.K_RETURN:
                     GAME_STATE = "boss_select"
@@ -146,9 +203,15 @@ while not exit:
         continue
 
     if GAME_STATE == "boss_select":
+        # build the highlighted boss's arena in the background
+        highlighted = boss_names[selected_boss]
+        arena_prefetch.want(None if highlighted in defeated_bosses else highlighted)
+        arena_prefetch.poll()
+
         ui.draw_boss_select_screen(canvas, dt, selected_boss, boss_names, defeated_bosses, mask_images)
         for event in pg.event.get():
             if event.type == pg.QUIT: exit = True
+            elif event.type == pg.KEYDOWN and event.key == pg.K_F8: display.toggle_dirty_mode()
             elif event.type == pg.KEYDOWN:
                 if event.key in [pg.K_UP, pg.K_w]:
                     selected_boss = (selected_boss - 1) % len(boss_names)
@@ -159,110 +222,49 @@ while not exit:
                     if chosen_boss in defeated_bosses: continue
                     factory = BOSS_FACTORIES.get(chosen_boss)
                     if factory:
-                        boss, background = factory()
+                        drop_fight()
+                        boss, background = arena_prefetch.take(chosen_boss) or factory()
                         if not hasattr(boss, "name"): boss.name = chosen_boss
                         current_boss_name = chosen_boss  # Store current boss name
-                        restart_game(player, boss)
+                        fight = Fight(player, boss, can_use_mask, unlocked_masks)
+                        restart_game()
                         GAME_STATE = "playing"
                 elif event.key == pg.K_ESCAPE:
                     GAME_STATE = "start"
         continue
 
+    if GAME_STATE == "boss_cleared":
+        ui.draw_boss_cleared_screen(canvas, current_boss_name, dt)
+        for event in pg.event.get():
+            if event.type == pg.QUIT: exit = True
+            elif event.type == pg.KEYDOWN and event.key == pg.K_F8: display.toggle_dirty_mode()
+            elif event.type == pg.KEYDOWN:
+                if event.key == pg.K_RETURN:
+                    GAME_STATE = "boss_select"
+        continue
+
     # === PLAYING ===
-    if boss and getattr(boss, "just_attacked", False):
+    for event in pg.event.get():
+        if event.type == pg.QUIT: exit = True
+        if event.type == pg.KEYDOWN and event.key == pg.K_F8: display.toggle_dirty_mode()
+        if event.type == pg.KEYDOWN and event.key == pg.K_F9:
+            print(f"render: {render_queue.stats()}")
+            print(f"pools: {fight.pool_stats()}")
+        fight.handle_event(event)
+
+    # fixed-step simulation for the time this frame took
+    fight.advance(dt, pg.key.get_pressed())
+
+    if getattr(boss, "just_attacked", False):
         
         if boss_names == "Specter Bride":
-            shake_intensity = 1
-            shake_timer = 0.1
+            camera.shake(0.1, 1)
         else: 
-            shake_timer = 0.4
-            shake_intensity = 6
+            camera.shake(0.4, 6)
         
         boss.just_attacked = False
 
-    if shake_timer > 0:
-        shake_timer -= dt
-        offset_x, offset_y = random.uniform(-shake_intensity, shake_intensity), random.uniform(-shake_intensity, shake_intensity)
-    else:
-        offset_x = offset_y = 0
-
-    canvas.blit(background, (offset_x, offset_y))
-
-    for event in pg.event.get():
-        if event.type == pg.QUIT: exit = True
-        player.player_mask_check(event, can_use_mask, unlocked_masks)  # Pass unlocked_masks here
-        player.player_dash(event)
-        player.player_attack(event, boss)
-        player.player_heal(event)
-
-    player.update_dash(dt)
-    player.player_move()
-
-    # boss_projectiles: safe fallback if boss doesn't have projectiles
-    boss_projectiles = boss.projectiles if boss and hasattr(boss, "projectiles") else []
-    player.update(dt, boss_projectiles)
-
-    # Player attack logic (player.update_attacks may expect boss or None) -- guard the call
-    if boss:
-        player.update_attacks(dt, boss)
-    else:
-        player.update_attacks(dt, None)
-
-    # --- NEW: handle collisions between player's projectiles and boss / minions ---
-    # We'll do this here so minions (boss.minions) are hittable by player.projectiles
-    if boss:
-        # iterate a copy because we may remove projectiles mid-loop
-        for proj in list(player.projectiles):
-            # skip projectiles if they don't have rect/alive
-            if not hasattr(proj, "rect"):
-                continue
-
-            # hit minions first (if the boss type has minions)
-            if hasattr(boss, "minions"):
-                for m in list(boss.minions):
-                    if not getattr(m, "alive", True):
-                        continue
-                    if m.rect.colliderect(proj.rect):
-                        # damage the minion
-                        dmg = getattr(proj, "damage", 1)
-                        if hasattr(m, "health"):
-                            m.health -= dmg
-                        else:
-                            m.alive = False
-                        # destroy the projectile (if it has alive flag)
-                        if hasattr(proj, "alive"):
-                            proj.alive = False
-                        # break so a single projectile doesn't hit multiple minions
-                        break
-
-            # hit the boss itself (if still alive)
-            if getattr(boss, "alive", False) and hasattr(boss, "rect") and boss.rect.colliderect(proj.rect):
-                dmg = getattr(proj, "damage", 1)
-                # call take_damage if available, otherwise decrement health
-                if hasattr(boss, "take_damage"):
-                    boss.take_damage(dmg)
-                else:
-                    if hasattr(boss, "health"):
-                        boss.health -= dmg
-                if hasattr(proj, "alive"):
-                    proj.alive = False
-
-    # Clean up dead projectiles from player's list
-    # Keep projectiles that either don't have 'alive' or are still alive
-    player.projectiles[:] = [proj for proj in player.projectiles if not hasattr(proj, "alive") or proj.alive]
-
-    player.update_footsteps(dt)
-    player.update_heal(dt)
-
-    player.draw_footsteps(canvas)
-    player.draw(canvas)
-    player.draw_dash_indicator(canvas, dt)
-    player.draw_health_bar(canvas)
-
-    if boss and getattr(boss, "alive", False):
-        boss.update(dt, player)
-        boss.draw(canvas)
-    elif boss:
+    if fight.won:
         defeated_bosses.add(getattr(boss, "name", boss.__class__.__name__))
         # Enable masks based on which boss is defeated
         boss_name = getattr(boss, "name", boss.__class__.__name__)
@@ -275,29 +277,34 @@ while not exit:
             # if you want to unlock the scarecrow mask, add here
             unlocked_masks.add("scarecrow")
             can_use_mask = True
+        stop_recording()
+        drop_fight()
         boss = None
+        fight = None
         background = default_background
         GAME_STATE = "boss_cleared"  # Change to boss cleared screen
         continue
 
-    if GAME_STATE == "boss_cleared":
-        ui.draw_boss_cleared_screen(canvas, current_boss_name, dt)
-        for event in pg.event.get():
-            if event.type == pg.QUIT: exit = True
-            elif event.type == pg.KEYDOWN:
-                if event.key == pg.K_RETURN:
-                    GAME_STATE = "boss_select"
-        continue
+    camera.update(dt)
+    display.begin("playing")
+    render_queue.push(background, (0, 0), render.BACKGROUND)
+    fight.draw(render_queue)
+    hud.draw(render_queue, player, boss)
+    display.draw_queue(render_queue)
 
     if player.dead:
         ui.you_died_screen(canvas, player.death_fade_alpha)
         keys = pg.key.get_pressed()
         if keys[pg.K_r]:
-            if boss: restart_game(player, boss)
+            restart_game()
         elif keys[pg.K_ESCAPE]:
+            stop_recording()
+            drop_fight()
             background = default_background
             GAME_STATE = "boss_select"
 
-    pg.display.flip()
+    display.present()
 
+stop_recording()
+arena_prefetch.close()
 pg.quit()
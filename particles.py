@@ -0,0 +1,220 @@
+import numpy as np
+import pygame as pg
+import render
+
+# Alpha is bucketed to this many levels so sprites can be shared
+ALPHA_LEVELS = 16
+# Cached circle sprites before the cache is thrown away and rebuilt
+MAX_SPRITES = 4096
+
+
+class ParticleSystem:
+    """All particles of one draw layer, stored in flat NumPy arrays.
+
+    Every particle is a row in the arrays below; update() moves and ages
+    them all at once and drops dead rows. draw() picks a pre-rendered
+    circle per particle from a cache keyed by (radius, color, alpha level)
+    and queues the whole lot on its render layer in one go, after dropping
+    whatever is off camera.
+    """
+
+    def __init__(self, capacity=512, seed=None, layer=render.EFFECTS):
+        self.count = 0
+        self.high_water = 0  # most particles alive at once
+        self.layer = layer
+        self.rng = np.random.default_rng(seed)
+        self._sprites = {}
+        self._allocate(capacity)
+
+    def seed(self, seed):
+        """Restart the generator bursts are drawn from."""
+        self.rng = np.random.default_rng(seed)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_sprites"] = {}  # circles are redrawn on demand
+        return state
+
+    def _allocate(self, capacity):
+        old = self.count
+        arrays = {
+            "pos": np.zeros((capacity, 2)),
+            "vel": np.zeros((capacity, 2)),
+            "age": np.zeros(capacity),
+            "lifetime": np.ones(capacity),
+            "radius": np.zeros(capacity),
+            "color": np.zeros((capacity, 3), np.int64),
+            "alpha": np.zeros(capacity),       # starting alpha
+            "drag": np.ones(capacity),         # velocity kept per second
+            "fade": np.zeros(capacity, bool),  # alpha falls to 0 over lifetime
+            "shrink": np.zeros(capacity, bool),  # radius falls to 0 over lifetime
+        }
+        for name, array in arrays.items():
+            if old:
+                array[:old] = getattr(self, name)[:old]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def _reserve(self, n):
+        if self.count + n > self.capacity:
+            self._allocate(max(self.capacity * 2, self.count + n))
+        start = self.count
+        self.count += n
+        if self.count > self.high_water:
+            self.high_water = self.count
+        return slice(start, self.count)
+
+    def emit(self, pos, vel=(0, 0), lifetime=0.3, radius=3, color=(255, 255, 255),
+             alpha=255, drag=1.0, fade=True, shrink=False):
+        """Add one particle. vel is in pixels per second."""
+        i = self._reserve(1).start
+        self.pos[i] = pos
+        self.vel[i] = vel
+        self.age[i] = 0
+        self.lifetime[i] = lifetime
+        self.radius[i] = radius
+        self.color[i] = color
+        self.alpha[i] = alpha
+        self.drag[i] = drag
+        self.fade[i] = fade
+        self.shrink[i] = shrink
+
+    def burst(self, pos, count, speed=(80, 160), lifetime=0.4, radius=(3, 5),
+              colors=((255, 255, 255),), alpha=255, drag=1.0, fade=True, shrink=False):
+        """Add count particles flying out from pos in random directions.
+
+        radius is an inclusive (min, max) integer range; colors is a list
+        that each particle picks from at random.
+        """
+        s = self._reserve(count)
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        spd = self.rng.uniform(speed[0], speed[1], count)
+        self.pos[s] = pos
+        self.vel[s, 0] = np.cos(angle) * spd
+        self.vel[s, 1] = np.sin(angle) * spd
+        self.age[s] = 0
+        self.lifetime[s] = lifetime
+        self.radius[s] = self.rng.integers(radius[0], radius[1] + 1, count)
+        colors = np.asarray(colors)
+        self.color[s] = colors[self.rng.integers(0, len(colors), count)]
+        self.alpha[s] = alpha
+        self.drag[s] = drag
+        self.fade[s] = fade
+        self.shrink[s] = shrink
+
+    def emit_many(self, pos, vel, lifetime=0.3, radius=3, color=(255, 255, 255),
+                  alpha=255, drag=1.0, fade=True, shrink=False):
+        """Add one particle per row of pos ((n, 2) array); vel and radius
+        may be arrays with a row each or single values."""
+        s = self._reserve(len(pos))
+        self.pos[s] = pos
+        self.vel[s] = vel
+        self.age[s] = 0
+        self.lifetime[s] = lifetime
+        self.radius[s] = radius
+        self.color[s] = color
+        self.alpha[s] = alpha
+        self.drag[s] = drag
+        self.fade[s] = fade
+        self.shrink[s] = shrink
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        self.age[:n] += dt
+
+        alive = self.age[:n] < self.lifetime[:n]
+        if not alive.all():
+            n = int(alive.sum())
+            for name in ("pos", "vel", "age", "lifetime", "radius", "color",
+                         "alpha", "drag", "fade", "shrink"):
+                array = getattr(self, name)
+                array[:n] = array[:self.count][alive]
+            self.count = n
+
+        self.vel[:n] *= (self.drag[:n] ** dt)[:, None]
+        self.pos[:n] += self.vel[:n] * dt
+
+    def draw(self, queue):
+        n = self.count
+        if n == 0:
+            return
+        left = 1 - self.age[:n] / self.lifetime[:n]
+        radius = np.where(self.shrink[:n], self.radius[:n] * left, self.radius[:n]).astype(np.int64)
+        alpha = np.where(self.fade[:n], self.alpha[:n] * left, self.alpha[:n])
+        level = np.ceil(alpha * (ALPHA_LEVELS / 255)).astype(np.int64)
+
+        # cull against the camera before any sprite lookups
+        view = queue.camera.world_view
+        x, y = self.pos[:n, 0], self.pos[:n, 1]
+        visible = ((radius > 0) & (level > 0)
+                   & (x + radius > view.left) & (x - radius < view.right)
+                   & (y + radius > view.top) & (y - radius < view.bottom))
+        if not visible.any():
+            return
+        # to canvas pixels: camera offset, then render scale
+        scale = queue.camera.scale
+        center = (self.pos[:n][visible] + queue.camera.offset) * scale
+        radius = radius[visible]
+        if scale != 1:
+            radius = np.maximum(1, (radius * scale).astype(np.int64))
+        level = level[visible]
+        color = self.color[:n][visible]
+        topleft = (center - radius[:, None]).astype(np.int64)
+
+        # one int per sprite bucket: radius | alpha level | rgb
+        keys = (radius << 32) | (level << 24) | (color[:, 0] << 16) | (color[:, 1] << 8) | color[:, 2]
+
+        sprites = self._sprites
+        if len(sprites) > MAX_SPRITES:
+            sprites.clear()
+        blits = []
+        for key, xy in zip(keys.tolist(), topleft.tolist()):
+            sprite = sprites.get(key)
+            if sprite is None:
+                sprite = sprites[key] = _circle_sprite(key)
+            blits.append((sprite, xy))
+        queue.extend(blits, self.layer, placed=True)
+
+    def clear(self):
+        self.count = 0
+
+    def stats(self):
+        # rows are reused in place, so capacity is all that's ever allocated
+        return {"live": self.count, "free": self.capacity - self.count, "high_water": self.high_water}
+
+
+def _circle_sprite(key):
+    radius = key >> 32
+    level = (key >> 24) & 0xFF
+    rgb = ((key >> 16) & 0xFF, (key >> 8) & 0xFF, key & 0xFF)
+    alpha = min(255, round(level * 255 / ALPHA_LEVELS))
+    sprite = pg.Surface((radius * 2, radius * 2), pg.SRCALPHA)
+    pg.draw.circle(sprite, (*rgb, alpha), (radius, radius), radius)
+    return sprite
+
+
+# Shared systems: ground effects sit under the characters (footsteps, dash
+# trails), effects go on top (projectile trails, hit sparks).
+ground = ParticleSystem(layer=render.GROUND)
+effects = ParticleSystem(capacity=2048, layer=render.EFFECTS)
+
+
+def update(dt):
+    ground.update(dt)
+    effects.update(dt)
+
+
+def draw(queue):
+    ground.draw(queue)
+    effects.draw(queue)
+
+
+def clear():
+    ground.clear()
+    effects.clear()
+
+
+def stats():
+    return {"ground": ground.stats(), "effects": effects.stats()}
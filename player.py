@@ -1,7 +1,12 @@
 import pygame as pg
 import math
-from projectile import Projectile
-import random 
+from projectile import ProjectileWorld
+import assets
+import particles
+import render
+import display
+
+HIT_SPARK_COLORS = [(255, g, 0) for g in range(0, 101)]
 
 class player():
     def __init__(self, pos, masked, direction, image_left, image_right, speed, masked_left, masked_right):
@@ -16,8 +21,8 @@ class player():
         self.masked_right = masked_right
         
         # Add specter mask images
-        self.specter_left = pg.transform.scale(pg.image.load("Art/player_masked_fliped2.png"), (128, 128))
-        self.specter_right = pg.transform.scale(pg.image.load("Art/player_masked2.png"), (128, 128))
+        self.specter_right = assets.image("Art/player_masked2.png", (128, 128))
+        self.specter_left = assets.variant(self.specter_right, flip=True)
         
         self.current_mask = None  # Track which mask is equipped
         
@@ -27,17 +32,22 @@ class player():
 
         # dash variables
         self.dashing = False
-        self.dash_speed = 20
+        self.dash_speed = 1200  # pixels per second, like speed
         self.dash_time = 0.2  # seconds
         self.dash_timer = 0
         self.dash_cooldown = 1.0  # seconds between dashes
         self.cooldown_timer = 0
+
+        # dash bar flash / fade (see update_dash_indicator)
+        self.dash_flash_alpha = 0
+        self.dash_fade_alpha = 255
+        self.dash_was_ready = True
+        self.dash_inactive_timer = 0
         
-        self.projectiles = []
+        self.projectiles = ProjectileWorld()
         self.attack_cooldown = 0.3  # seconds
         self.attack_timer = 0
         
-        self.foot_particles = []
         self.foot_timer = 0
         self.foot_cooldown = 0.15  # seconds between footsteps
         
@@ -57,15 +67,17 @@ class player():
 
         # --- Hit effect ---
         self.hit_flash_alpha = 0
-        self.hit_particles = []
 
         # Four-directional attack variables
         self.attack_direction = "right"  # default direction
     
-    def player_move(self):
+    def player_move(self, dt, keys):
+        """Move by speed (pixels per second) for dt seconds.
+
+        keys is pg.key.get_pressed() or anything else indexable by key.
+        """
         if self.dead:
             return
-        keys = pg.key.get_pressed()
 
         # Base movement vector
         move_x, move_y = 0, 0
@@ -85,9 +97,11 @@ class player():
             self.attack_direction = "down"
 
         # Keep player inside arena
-        arena_rect = pg.Rect(0, 0, 800, 800)
-        self.rect.clamp_ip(arena_rect)
-        self.pos[0], self.pos[1] = self.rect.topleft
+        # (pos keeps its fractions otherwise; small per-tick steps add up)
+        arena_rect = pg.Rect(0, 0, display.WIDTH, display.HEIGHT)
+        if not arena_rect.contains(self.rect):
+            self.rect.clamp_ip(arena_rect)
+            self.pos[0], self.pos[1] = self.rect.topleft
 
         # normalize diagonal movement
         magnitude = math.hypot(move_x, move_y)
@@ -99,29 +113,25 @@ class player():
         current_speed = self.dash_speed if self.dashing else self.speed
 
         # apply movement
-        self.pos[0] += move_x * current_speed
-        self.pos[1] += move_y * current_speed
+        self.pos[0] += move_x * current_speed * dt
+        self.pos[1] += move_y * current_speed * dt
 
         # Keep collision rect in sync with movement
         self.rect.topleft = self.pos
         
-        moving = any(pg.key.get_pressed()[k] for k in [pg.K_a, pg.K_d, pg.K_w, pg.K_s])
+        moving = any(keys[k] for k in [pg.K_a, pg.K_d, pg.K_w, pg.K_s])
         if moving:
-            self.foot_timer -= 1 / 60  # assuming roughly 60 fps
+            self.foot_timer -= dt
             if self.foot_timer <= 0:
                 self.foot_timer = self.foot_cooldown
-                # spawn a footstep particle at player's feet
-                self.foot_particles.append(FootstepParticle([self.pos[0] + 64, self.pos[1] + 128]))
-
-    def update_footsteps(self, dt):
-        for f in self.foot_particles:
-            f.update(dt)
-        # remove finished particles
-        self.foot_particles = [f for f in self.foot_particles if f.timer > 0]
-
-    def draw_footsteps(self, canvas):
-        for f in self.foot_particles:
-            f.draw(canvas)
+                # spawn a shrinking dust puff at player's feet
+                particles.ground.emit(
+                    (self.pos[0] + 64 - 12, self.pos[1] + 128 - 22),
+                    lifetime=0.4,
+                    radius=8,
+                    color=(120, 61, 34),
+                    shrink=True
+                )
         
     def player_mask_check(self, event, can_use_mask=False, unlocked_masks=None):
         if unlocked_masks is None:
@@ -170,80 +180,54 @@ class player():
             if self.dash_timer <= 0:
                 self.dashing = False
 
-    def draw(self, canvas):
-        # drawing player
+    def sprite(self):
+        """The image for the current mask and facing."""
         if self.masked:
             if self.current_mask == "specter":
-                if self.direction:
-                    canvas.blit(self.specter_right, self.pos)
-                else:
-                    canvas.blit(self.specter_left, self.pos)
-            else:  # Default to pumpkin mask
-                if self.direction:
-                    canvas.blit(self.masked_right, self.pos)
-                else:
-                    canvas.blit(self.masked_left, self.pos)
-        else:        
-            if self.direction:
-                canvas.blit(self.image_right, self.pos)
-            else:
-                canvas.blit(self.image, self.pos)
+                return self.specter_right if self.direction else self.specter_left
+            # Default to pumpkin mask
+            return self.masked_right if self.direction else self.masked_left
+        return self.image_right if self.direction else self.image
+
+    def draw(self, queue):
+        # drawing player
+        queue.push(self.sprite(), queue.lerp(self, self.pos), render.ENTITIES)
         # draw projectiles
-        for proj in self.projectiles:
-            proj.draw(canvas)
+        self.projectiles.draw(queue)
 
         # draw hit effects
-        self.draw_hit_effects(canvas)
+        self.draw_hit_effects(queue)
 
-    def draw_dash_indicator(self, canvas, dt):
-        bar_x, bar_y = 20, 80
-        bar_width, bar_height = 200, 20
-        bar_color = (79, 121, 66)
+    def update_dash_indicator(self, dt):
+        """Flash the dash bar when it's ready again, fade it out when idle.
+
+        The bar itself is drawn by hud.DashBar from these values.
+        """
         fade_delay = 2.0
         fade_speed = 100
 
-        if not hasattr(self, "flash_alpha"):
-            self.flash_alpha = 0
-            self.was_ready = True
-            self.fade_alpha = 255
-            self.inactive_timer = 0
-
-        ratio = 1 - (self.cooldown_timer / self.dash_cooldown)
-        ratio = max(0, min(1, ratio))
-
         is_ready = self.cooldown_timer <= 0
 
         if not is_ready or self.dashing:
-            self.inactive_timer = 0
-            self.fade_alpha = 255
+            self.dash_inactive_timer = 0
+            self.dash_fade_alpha = 255
         else:
-            self.inactive_timer += dt
-
-        if is_ready and not self.was_ready:
-            self.flash_alpha = 255
-            self.fade_alpha = 255
-            self.inactive_timer = 0
+            self.dash_inactive_timer += dt
 
-        self.was_ready = is_ready
+        if is_ready and not self.dash_was_ready:
+            self.dash_flash_alpha = 255
+            self.dash_fade_alpha = 255
+            self.dash_inactive_timer = 0
 
-        if self.flash_alpha > 0:
-            self.flash_alpha -= 10
+        self.dash_was_ready = is_ready
 
-        if self.inactive_timer > fade_delay:
-            self.fade_alpha -= fade_speed * dt
-            self.fade_alpha = max(0, self.fade_alpha)
+        if self.dash_flash_alpha > 0:
+            self.dash_flash_alpha -= 600 * dt
 
-        if self.fade_alpha > 0:
-            surface = pg.Surface((bar_width, bar_height), pg.SRCALPHA)
-            pg.draw.rect(surface, (30, 30, 30, int(self.fade_alpha * 0.5)), (0, 0, bar_width, bar_height))
-            pg.draw.rect(surface, (*bar_color, int(self.fade_alpha)), (0, 0, bar_width * ratio, bar_height))
-            canvas.blit(surface, (bar_x, bar_y))
+        if self.dash_inactive_timer > fade_delay:
+            self.dash_fade_alpha -= fade_speed * dt
+            self.dash_fade_alpha = max(0, self.dash_fade_alpha)
 
-            if self.flash_alpha > 0:
-                flash_surface = pg.Surface((bar_width, bar_height), pg.SRCALPHA)
-                pg.draw.rect(flash_surface, (255, 255, 255, self.flash_alpha), (0, 0, bar_width, bar_height))
-                canvas.blit(flash_surface, (bar_x, bar_y))
-                
     def player_attack(self, event, boss=None):
         if self.dead:
             return
@@ -252,7 +236,7 @@ class player():
                 # Specter mask uses homing wisp attacks
                 if self.masked and self.current_mask == "specter":
                     self.attack_cooldown = .75
-                    wisp_image = pg.image.load('Art/whisp.png').convert_alpha()
+                    wisp_image = assets.image('Art/whisp.png', (32, 32))
                     
                     # Calculate projectile position based on attack direction
                     if self.attack_direction == "right":
@@ -264,12 +248,12 @@ class player():
                     elif self.attack_direction == "down":
                         proj_pos = (self.pos[0] + 64, self.pos[1] + 128)
                     
-                    # Create homing wisp projectile with boss reference
-                    self.projectiles.append(HomingWispProjectile(proj_pos, wisp_image, boss))
+                    # Homing wisp: chases the nearest hostile
+                    self.projectiles.homing(proj_pos, wisp_image)
                     
                 # Pumpkin mask uses normal attacks
                 elif self.masked:
-                    attack_image = pg.image.load('Art/attack.png').convert_alpha()
+                    attack_image = assets.image('Art/attack.png', (32, 32))
                     
                     # Calculate projectile position based on attack direction
                     if self.attack_direction == "right":
@@ -281,33 +265,30 @@ class player():
                     elif self.attack_direction == "down":
                         proj_pos = (self.pos[0] + 64, self.pos[1] + 128)
                     
-                    self.projectiles.append(Projectile(proj_pos, self.attack_direction, attack_image))
+                    self.projectiles.shot(proj_pos, self.attack_direction, attack_image)
                 else:
                     # Original left/right only attack when not masked
-                    attack_image = pg.image.load('Art/attack.png').convert_alpha()
+                    attack_image = assets.image('Art/attack.png', (32, 32))
                     proj_pos = (self.pos[0] + 64, self.pos[1] + 64)
-                    self.projectiles.append(Projectile(proj_pos, self.direction, attack_image))
+                    self.projectiles.shot(proj_pos, self.direction, attack_image)
                         
                 self.attack_timer = self.attack_cooldown
                 
-    def update_attacks(self, dt, boss):
+    def update_attacks(self, dt, boss, targets=None):
+        """Move the player's shots; homing ones chase the nearest thing in
+        targets (a spatial.SpatialGrid of hostiles) or else the boss."""
         if boss is None or not hasattr(boss, "alive") or not boss.alive:
             return
         if self.attack_timer > 0:
             self.attack_timer -= dt
 
-        for proj in self.projectiles:
-            # Pass boss to homing projectiles for targeting
-            if hasattr(proj, 'update_with_boss'):
-                proj.update_with_boss(dt, boss)
-            else:
-                proj.update(dt)
+        self.projectiles.update(dt, targets if targets is not None else boss)
 
-        self.projectiles = [p for p in self.projectiles if p.alive]
-        for proj in self.projectiles:
-            if boss.alive and boss.rect.colliderect(proj.rect):
+        hits = self.projectiles.overlapping(boss.rect)
+        for _ in range(len(hits)):
+            if boss.alive:
                 boss.take_damage(20)
-                proj.alive = False
+        self.projectiles.kill(hits)
         
     def player_heal(self, event):
         if self.dead:
@@ -337,21 +318,6 @@ class player():
                 if self.display_health > self.current_health:
                     self.display_health = self.current_health
 
-    def draw_health_bar(self, canvas):
-        bar_width = 200
-        bar_height = 20
-        x, y = 20, 20
-
-        pg.draw.rect(canvas, (40, 0, 0), (x - 2, y - 2, bar_width + 4, bar_height + 4))
-        pg.draw.rect(canvas, (100, 0, 0), (x, y, bar_width, bar_height))
-        
-        health_ratio = self.display_health / self.max_health
-        pg.draw.rect(canvas, (180, 30, 30), (x, y, bar_width * health_ratio, bar_height))
-
-        for i in range(self.max_flasks):
-            color = (200, 180, 80) if i < self.current_flasks else (80, 80, 40)
-            pg.draw.rect(canvas, color, (x + i * 25, y + 30, 20, 20))
-            
     def take_damage(self, amount):
         if not hasattr(self, "invuln_timer"):
             self.invuln_timer = 0
@@ -360,8 +326,17 @@ class player():
             self.current_health -= amount
             self.display_health = self.current_health
             self.hit_flash_alpha = 255
-            for _ in range(10):
-                self.hit_particles.append(HitParticle((self.pos[0] + 50, self.pos[1] + 50)))
+            # reddish-orange sparks that slow down (velocity * 0.9 per frame at 60 fps)
+            particles.effects.burst(
+                (self.pos[0] + 50, self.pos[1] + 50),
+                10,
+                speed=(80, 160),
+                lifetime=0.4,
+                radius=(3, 5),
+                colors=HIT_SPARK_COLORS,
+                drag=0.9 ** 60,
+                fade=False
+            )
 
             if self.current_health <= 0:
                 self.current_health = 0
@@ -381,18 +356,10 @@ class player():
             self.hit_flash_alpha -= 600 * dt
             self.hit_flash_alpha = max(0, self.hit_flash_alpha)
 
-        for p in self.hit_particles:
-            p.update(dt)
-        self.hit_particles = [p for p in self.hit_particles if p.age < p.lifetime]
-
-    def draw_hit_effects(self, canvas):
+    def draw_hit_effects(self, queue):
         if self.hit_flash_alpha > 0:
-            flash = pg.Surface((128, 128), pg.SRCALPHA)
-            #flash.fill((255, 255, 255, int(self.hit_flash_alpha)))
-            canvas.blit(flash, (self.pos[0], self.pos[1]))
-
-        for p in self.hit_particles:
-            p.draw(canvas)
+            # white flash over the sprite, fading out with hit_flash_alpha
+            queue.push(assets.variant(self.sprite(), flash=self.hit_flash_alpha), queue.lerp(self, self.pos), render.ENTITIES)
 
     def update(self, dt, boss_projectiles):
         if not hasattr(self, "invuln_timer"):
@@ -401,14 +368,12 @@ class player():
         if self.invuln_timer > 0:
             self.invuln_timer -= dt
         
-        if self.invuln_timer <= 0:
-            for proj in boss_projectiles[:]:
-                if self.rect.colliderect(proj.rect):
-                    print("PLAYER HIT!")
-                    self.take_damage(20)
-                    proj.alive = False
-                    boss_projectiles.remove(proj)
-                    break
+        if self.invuln_timer <= 0 and boss_projectiles is not None:
+            hits = boss_projectiles.overlapping(self.rect)
+            if len(hits):
+                print("PLAYER HIT!")
+                self.take_damage(20)
+                boss_projectiles.kill(hits[:1])
         
         if not self.healing and abs(self.display_health - self.current_health) > 5:
             self.display_health = self.current_health
@@ -417,101 +382,3 @@ class player():
             self.death_fade_alpha = min(255, int(self.death_timer * 128))
 
         self.update_hit_effects(dt)
-
-class FootstepParticle:
-    def __init__(self, pos):
-        self.pos = pos[:]  
-        self.life = 0.4  
-        self.timer = self.life
-        self.size = 8
-        self.color = (120, 61, 34)
-        self.alpha = 180  
-
-    def update(self, dt):
-        self.timer -= dt
-        fade_ratio = max(self.timer / self.life, 0)
-        self.alpha = int(255 * fade_ratio)
-        self.size = int(8 * fade_ratio)
-
-    def draw(self, canvas):
-        if self.alpha > 0:
-            surf = pg.Surface((self.size * 2, self.size * 2), pg.SRCALPHA)
-            pg.draw.circle(surf, (*self.color, self.alpha), (self.size, self.size), self.size)
-            canvas.blit(surf, (self.pos[0] + -20, self.pos[1] + -30))
-
-class HitParticle:
-    def __init__(self, pos):
-        self.pos = pg.Vector2(pos)
-        self.lifetime = 0.4
-        self.age = 0
-
-        # random angle and speed for circular spread
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(80, 160)
-        self.vel = pg.Vector2(math.cos(angle) * speed, math.sin(angle) * speed)
-
-        self.radius = random.randint(3, 5)
-        self.color = (255, random.randint(0, 100), 0)  # reddish-orange sparks
-
-    def update(self, dt):
-        self.age += dt
-        # slow down gradually (air resistance)
-        self.vel *= 0.9
-        self.pos += self.vel * dt
-
-    def draw(self, surface):
-        if self.age < self.lifetime:
-            pg.draw.circle(surface, self.color, (int(self.pos.x), int(self.pos.y)), self.radius)
-
-class HomingWispProjectile:
-    def __init__(self, pos, image, boss, speed=120):
-        self.pos = pg.Vector2(pos)
-        self.image = pg.transform.scale(image, (32, 32))
-        self.rect = self.image.get_rect(center=pos)
-        self.alive = True
-        self.speed = speed
-        self.boss = boss
-        self.velocity = pg.Vector2(0, 0)
-        self.homing_strength = 0.1  # How strongly it homes in on target
-
-    def update_with_boss(self, dt, boss):
-        if not self.alive:
-            return
-            
-        # Update boss reference
-        self.boss = boss
-        
-        if self.boss and hasattr(self.boss, 'pos') and self.boss.alive:
-            # Calculate direction to boss
-            direction = pg.Vector2(self.boss.pos) - self.pos
-            if direction.length() > 0:
-                direction = direction.normalize()
-                
-                # Gradually adjust velocity towards boss
-                self.velocity = self.velocity.lerp(direction * self.speed, self.homing_strength)
-        else:
-            # If no boss, continue in current direction
-            if self.velocity.length() == 0:
-                self.velocity = pg.Vector2(1, 0) * self.speed  # Default direction
-
-        # Move projectile
-        self.pos += self.velocity * dt
-        self.rect.center = self.pos
-
-        # Kill projectile if off-screen
-        if not pg.Rect(0, 0, 800, 800).collidepoint(self.pos):
-            self.alive = False
-
-    def update(self, dt):
-        # Fallback update if no boss is provided
-        if self.velocity.length() == 0:
-            self.velocity = pg.Vector2(1, 0) * self.speed
-            
-        self.pos += self.velocity * dt
-        self.rect.center = self.pos
-
-        if not pg.Rect(0, 0, 800, 800).collidepoint(self.pos):
-            self.alive = False
-
-    def draw(self, canvas):
-        canvas.blit(self.image, self.rect)
\ No newline at end of file
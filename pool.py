@@ -0,0 +1,62 @@
+# Every pool made, by name, for stats()
+_pools = {}
+
+
+class Pool:
+    """Recycles instances of one class instead of allocating new ones.
+
+    acquire(*args) takes an object off the free list (or makes a new one
+    the first time) and calls its reset(*args) to set it up again;
+    release() puts it back. The class does the work of resetting in
+    place, reusing whatever Vector2s and Rects it already holds, so a
+    long fight settles into reusing the same few objects.
+    """
+
+    def __init__(self, cls, name=None):
+        self.cls = cls
+        self.name = name or cls.__name__
+        self._free = []
+        self.live = 0
+        self.high_water = 0  # most live at once
+        self.created = 0
+        self.reused = 0
+        _pools[self.name] = self
+
+    def acquire(self, *args):
+        if self._free:
+            obj = self._free.pop()
+            self.reused += 1
+        else:
+            obj = self.cls.__new__(self.cls)
+            self.created += 1
+        obj.reset(*args)
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return obj
+
+    def release(self, obj):
+        self.live -= 1
+        self._free.append(obj)
+
+    def adopt(self, objects):
+        """Count objects made outside the pool (e.g. unpickled) as live,
+        so the numbers stay right once they're released to it."""
+        self.live += len(objects)
+        if self.live > self.high_water:
+            self.high_water = self.live
+
+    def release_all(self, objects):
+        """Release every object in a list and empty it."""
+        for obj in objects:
+            self.release(obj)
+        objects.clear()
+
+    def stats(self):
+        return {"live": self.live, "free": len(self._free), "high_water": self.high_water,
+                "created": self.created, "reused": self.reused}
+
+
+def stats():
+    """Stats of every pool, by name."""
+    return {name: pool.stats() for name, pool in _pools.items()}
@@ -1,88 +1,418 @@
+import numpy as np
 import pygame as pg
-import random
-
-
-class Particle:
-    def __init__(self, pos, color, lifetime=0.3):
-        self.pos = pg.Vector2(pos)
-        self.color = color
-        self.lifetime = lifetime
-        self.age = 0
-        self.radius = random.randint(2, 4)
-        self.velocity = pg.Vector2(random.uniform(-1, 1), random.uniform(-1, 1))
-
-    def update(self, dt):
-        self.age += dt
-        self.pos += self.velocity
-        # fade out alpha over time
-        fade = max(0, 255 * (1 - self.age / self.lifetime))
-        return fade > 0  # still alive?
-
-    def draw(self, canvas, fade):
-        alpha_surface = pg.Surface((self.radius * 2, self.radius * 2), pg.SRCALPHA)
-        pg.draw.circle(
-            alpha_surface,
-            (*self.color, int(fade)),
-            (self.radius, self.radius),
-            self.radius
-        )
-        canvas.blit(alpha_surface, (self.pos.x - self.radius, self.pos.y - self.radius))
-
-
-class Projectile:
-    def __init__(self, pos, direction, image, speed=12):
-        self.pos = pg.Vector2(pos)
-        self.image = pg.transform.scale(image, (32, 32))
-        self.rect = self.image.get_rect(center=pos)
-        self.alive = True
-        self.particles = []
-        self.speed = speed
-
-        # ✅ Support for four directions (player) and Vector2 (boss)
-        if isinstance(direction, str):  # Player projectile - four directions
-            if direction == "right":
-                self.velocity = pg.Vector2(1, 0)
-            elif direction == "left":
-                self.velocity = pg.Vector2(-1, 0)
-            elif direction == "up":
-                self.velocity = pg.Vector2(0, -1)
-            elif direction == "down":
-                self.velocity = pg.Vector2(0, 1)
-        elif isinstance(direction, bool):
-            # Player projectile — left or right (backward compatibility)
-            self.velocity = pg.Vector2(1 if direction else -1, 0)
-        else:
-            # Boss projectile — arbitrary direction vector
-            self.velocity = pg.Vector2(direction).normalize()
-
-    def update(self, dt):
-        # --- Movement ---
-        self.pos += self.velocity * self.speed
-        self.rect.center = self.pos
-
-        # --- Trail particles ---
-        for _ in range(2):
-            self.particles.append(
-                Particle(self.pos, (100, 149, 237))  # bluish particle
-            )
-
-        # --- Update particles ---
-        alive_particles = []
-        for p in self.particles:
-            fade = 255 * (1 - p.age / p.lifetime)
-            if p.update(dt):
-                alive_particles.append(p)
-        self.particles = alive_particles
-
-        # --- Kill projectile if off-screen ---
-        if not pg.Rect(0, 0, 800, 800).collidepoint(self.pos):
-            self.alive = False
-
-    def draw(self, canvas):
-        # --- Draw projectile sprite ---
-        canvas.blit(self.image, self.rect)
-
-        # --- Draw particle trail ---
-        for p in self.particles:
-            fade = 255 * (1 - p.age / p.lifetime)
-            p.draw(canvas, fade)
\ No newline at end of file
+import particles
+import render
+import display
+
+# Projectile kinds
+SHOT = 0    # straight shot with a bluish particle trail (player, Pumpking)
+WISP = 1    # Specter Bride wisp: slow, times out, leaves a fading sprite trail
+HOMING = 2  # specter mask wisp: steers toward the nearest hostile
+
+# Who fired it
+PLAYER = 0
+BOSS = 1
+
+# Trail particles per second behind a SHOT (two a frame at the old fixed 60 fps)
+TRAIL_RATE = 120
+# Share of the turn toward its target a HOMING wisp makes per 1/60 s
+HOMING_TURN = 0.1
+# WISPs live until they time out or get this far off the arena
+WISP_MARGIN = 24
+# Seconds between WISP trail points
+TRAIL_INTERVAL = 0.05
+
+_FIELDS = ("pos", "prev", "vel", "speed", "life", "kind", "owner", "damage",
+           "sprite", "half", "trail_timer", "alive")
+
+
+class ProjectileWorld:
+    """Every projectile of one side in flat NumPy arrays, one row each.
+
+    update() moves all of them at once: straight flight, homing steering,
+    timeouts and culling at the arena edge are array operations, and the
+    only Python loop left is looking up homing targets. Hit tests
+    (overlapping(), first_overlap()) test every row's box against a rect
+    or a list of rects in one go and return rows; callers mark what they
+    hit with kill(). Dead rows are dropped by compact(), which moves rows
+    from the end into the holes, so row order is not spawn order.
+
+    Wisp trails are their own arrays of points that fade out over
+    TRAIL_LIFE. prev holds positions from before the last tick for draw
+    interpolation (snapshot()).
+    """
+
+    def __init__(self, capacity=64, seed=None):
+        self.count = 0
+        self.high_water = 0  # most projectiles alive at once
+        self.rng = np.random.default_rng(seed)
+        self.sprites = []  # sprite index -> surface
+        self._sprite_index = {}  # surface -> sprite index
+        self._allocate(capacity)
+
+        # wisp trail points
+        self.trail_count = 0
+        self.trail_pos = np.zeros((64, 2))
+        self.trail_life = np.zeros(64)
+        self.trail_sprite = np.zeros(64, np.int64)  # where its ladder starts
+        self._ladder_sprites = []  # every trail ladder, one after another
+        self._ladder_sizes = np.zeros((0, 2))
+        self._ladder_start = np.zeros(0, np.int64)  # sprite index -> ladder start, -1 if none
+
+    def _allocate(self, capacity):
+        old = self.count
+        arrays = {
+            "pos": np.zeros((capacity, 2)),
+            "prev": np.zeros((capacity, 2)),
+            "vel": np.zeros((capacity, 2)),        # pixels per second
+            "speed": np.zeros(capacity),           # homing cruise speed
+            "life": np.full(capacity, np.inf),     # seconds left
+            "kind": np.zeros(capacity, np.int8),
+            "owner": np.zeros(capacity, np.int8),
+            "damage": np.zeros(capacity, np.int64),
+            "sprite": np.zeros(capacity, np.int64),
+            "half": np.zeros((capacity, 2)),       # half the sprite size: the hit box
+            "trail_timer": np.zeros(capacity),
+            "alive": np.zeros(capacity, bool),
+        }
+        for name, array in arrays.items():
+            if old:
+                array[:old] = getattr(self, name)[:old]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def seed(self, seed):
+        """Restart the generator trail particles are drawn from."""
+        self.rng = np.random.default_rng(seed)
+
+    def __getstate__(self):
+        # trail ladders are derived from the sprites; __setstate__ rebuilds them
+        state = self.__dict__.copy()
+        del state["_sprite_index"], state["_ladder_sprites"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._sprite_index = {image: i for i, image in enumerate(self.sprites)}
+        self._ladder_sprites = []
+        for index in np.argsort(self._ladder_start).tolist():  # in ladder order
+            if self._ladder_start[index] >= 0:
+                self._ladder_sprites.extend(img for img, _, _ in trail_ladder(self.sprites[index]))
+
+    def sprite_index(self, image):
+        index = self._sprite_index.get(image)
+        if index is None:
+            index = self._sprite_index[image] = len(self.sprites)
+            self.sprites.append(image)
+            self._ladder_start = np.append(self._ladder_start, -1)
+        return index
+
+    def _ensure_ladder(self, index):
+        """Add the trail ladder of sprite index to the flat ladder list."""
+        if self._ladder_start[index] < 0:
+            ladder = trail_ladder(self.sprites[index])
+            self._ladder_start[index] = len(self._ladder_sprites)
+            self._ladder_sprites.extend(img for img, _, _ in ladder)
+            self._ladder_sizes = np.concatenate(
+                [self._ladder_sizes, [img.get_size() for img, _, _ in ladder]])
+
+    # -------------------------------------------------------------------
+    # === Spawning ===
+    # -------------------------------------------------------------------
+
+    def add(self, kind, pos, vel, image, owner=PLAYER, damage=1, life=np.inf, speed=0):
+        """Add one projectile centered on pos; returns its row."""
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        i = self.count
+        self.count += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        self.pos[i] = self.prev[i] = (pos[0], pos[1])
+        self.vel[i] = (vel[0], vel[1])
+        self.speed[i] = speed
+        self.life[i] = life
+        self.kind[i] = kind
+        self.owner[i] = owner
+        self.damage[i] = damage
+        self.sprite[i] = self.sprite_index(image)
+        self.half[i] = (image.get_width() / 2, image.get_height() / 2)
+        self.trail_timer[i] = 0
+        self.alive[i] = True
+        return i
+
+    def shot(self, pos, direction, image, speed=720, owner=PLAYER, damage=1):
+        """A straight SHOT. direction is "left"/"right"/"up"/"down", a bool
+        (True = right) or any vector."""
+        return self.add(SHOT, pos, direction_vector(direction) * speed, image, owner, damage)
+
+    def wisp(self, pos, direction, image, speed=150, life=3.0, owner=BOSS, damage=20):
+        """A WISP flying along direction (a unit vector) until life runs out."""
+        i = self.add(WISP, pos, pg.Vector2(direction) * speed, image, owner, damage, life)
+        self._ensure_ladder(self.sprite[i])
+        return i
+
+    def homing(self, pos, image, speed=120, owner=PLAYER, damage=1):
+        """A HOMING wisp; it starts still and speeds up toward its target."""
+        return self.add(HOMING, pos, (0, 0), image, owner, damage, speed=speed)
+
+    # -------------------------------------------------------------------
+    # === Simulation ===
+    # -------------------------------------------------------------------
+
+    def snapshot(self):
+        n = self.count
+        self.prev[:n] = self.pos[:n]
+
+    def update(self, dt, targets=None):
+        """Move everything by dt.
+
+        targets is what HOMING wisps chase: a spatial.SpatialGrid of
+        hostiles (they pick the nearest) or a single object with a pos.
+        """
+        self.compact()
+        n = self.count
+        if n:
+            pos, vel, kind = self.pos[:n], self.vel[:n], self.kind[:n]
+            homing = np.flatnonzero(kind == HOMING)
+            if len(homing):
+                self._steer(homing, dt, targets)
+
+            pos += vel * dt
+            self.life[:n] -= dt
+
+            # off the arena: SHOT/HOMING once their center leaves it, WISPs
+            # a little further out
+            margin = np.where(kind == WISP, WISP_MARGIN, 0)
+            x, y = pos[:, 0], pos[:, 1]
+            inside = ((x >= -margin) & (y >= -margin)
+                      & (x < display.WIDTH + margin) & (y < display.HEIGHT + margin))
+            self.alive[:n] &= inside & (self.life[:n] > 0)
+
+            self._emit_trails(dt)
+        self._update_trail_points(dt)
+        self.compact()
+
+    def _steer(self, rows, dt, targets):
+        pos = self.pos[rows]
+        aim = np.full((len(rows), 2), np.nan)
+        if targets is not None:
+            nearest = getattr(targets, "nearest", None)
+            for j, (x, y) in enumerate(pos.tolist()):
+                target = nearest((x, y), _is_alive) if nearest else targets
+                if target is not None and hasattr(target, "pos") and getattr(target, "alive", True):
+                    aim[j] = target.pos[0], target.pos[1]
+
+        vel = self.vel[rows]
+        speed = self.speed[rows]
+        has_aim = ~np.isnan(aim[:, 0])
+        if has_aim.any():
+            to = aim[has_aim] - pos[has_aim]
+            length = np.hypot(to[:, 0], to[:, 1])
+            moving = length > 0
+            want = np.zeros_like(to)
+            want[moving] = to[moving] / length[moving, None] * speed[has_aim][moving, None]
+            # same rate at any dt
+            turn = 1 - (1 - HOMING_TURN) ** (dt * 60)
+            steered = vel[has_aim]
+            steered[moving] += (want[moving] - steered[moving]) * turn
+            vel[has_aim] = steered
+        # no target: keep going, or set off to the right if still
+        still = ~has_aim & (vel[:, 0] == 0) & (vel[:, 1] == 0)
+        vel[still, 0] = speed[still]
+        self.vel[rows] = vel
+
+    def _emit_trails(self, dt):
+        n = self.count
+        # SHOTs: bluish particles at a steady rate
+        shots = np.flatnonzero((self.kind[:n] == SHOT) & self.alive[:n])
+        if len(shots):
+            timer = self.trail_timer[shots] + dt * TRAIL_RATE
+            counts = timer.astype(np.int64)
+            self.trail_timer[shots] = timer - counts
+            total = int(counts.sum())
+            if total:
+                particles.effects.emit_many(
+                    np.repeat(self.pos[shots], counts, axis=0),
+                    vel=self.rng.uniform(-60, 60, (total, 2)),
+                    lifetime=0.3,
+                    radius=self.rng.integers(2, 5, total),
+                    color=(100, 149, 237),
+                )
+
+        # WISPs: a trail point every TRAIL_INTERVAL
+        wisps = np.flatnonzero((self.kind[:n] == WISP) & self.alive[:n])
+        if len(wisps):
+            timer = self.trail_timer[wisps] + dt
+            due = timer >= TRAIL_INTERVAL
+            timer[due] = 0.0
+            self.trail_timer[wisps] = timer
+            rows = wisps[due]
+            if len(rows):
+                self._add_trail_points(self.pos[rows], self._ladder_start[self.sprite[rows]])
+
+    def _add_trail_points(self, pos, sprite):
+        start, k = self.trail_count, len(pos)
+        if start + k > len(self.trail_life):
+            size = max(len(self.trail_life) * 2, start + k)
+            for name in ("trail_pos", "trail_life", "trail_sprite"):
+                old = getattr(self, name)
+                grown = np.zeros((size,) + old.shape[1:], old.dtype)
+                grown[:start] = old[:start]
+                setattr(self, name, grown)
+        self.trail_pos[start:start + k] = pos
+        self.trail_life[start:start + k] = TRAIL_LIFE
+        self.trail_sprite[start:start + k] = sprite
+        self.trail_count = start + k
+
+    def _update_trail_points(self, dt):
+        m = self.trail_count
+        if not m:
+            return
+        self.trail_life[:m] -= dt
+        keep = self.trail_life[:m] > 0
+        if not keep.all():
+            k = int(keep.sum())
+            for name in ("trail_pos", "trail_life", "trail_sprite"):
+                array = getattr(self, name)
+                array[:k] = array[:m][keep]
+            self.trail_count = k
+
+    # -------------------------------------------------------------------
+    # === Hits ===
+    # -------------------------------------------------------------------
+
+    def _boxes(self):
+        n = self.count
+        pos, half = self.pos[:n], self.half[:n]
+        return pos - half, pos + half
+
+    def overlapping(self, rect, live_only=True):
+        """Rows whose hit box overlaps rect."""
+        n = self.count
+        if not n:
+            return np.zeros(0, np.int64)
+        x, y, w, h = rect
+        low, high = self._boxes()
+        hit = (low[:, 0] < x + w) & (high[:, 0] > x) & (low[:, 1] < y + h) & (high[:, 1] > y)
+        if live_only:
+            hit &= self.alive[:n]
+        return np.flatnonzero(hit)
+
+    def first_overlap(self, rects, live_only=True):
+        """For every row, the index of the first rect its box overlaps, or -1."""
+        n = self.count
+        if not n or not rects:
+            return np.full(n, -1)
+        r = np.array([tuple(rect) for rect in rects], float)
+        low, high = self._boxes()
+        hit = ((low[:, None, 0] < r[None, :, 0] + r[None, :, 2]) & (high[:, None, 0] > r[None, :, 0])
+               & (low[:, None, 1] < r[None, :, 1] + r[None, :, 3]) & (high[:, None, 1] > r[None, :, 1]))
+        if live_only:
+            hit &= self.alive[:n, None]
+        first = hit.argmax(axis=1)
+        first[~hit.any(axis=1)] = -1
+        return first
+
+    def within(self, point, distance):
+        """Whether any live projectile's center is within distance of point."""
+        n = self.count
+        if not n:
+            return False
+        d = self.pos[:n] - (point[0], point[1])
+        close = (d[:, 0] ** 2 + d[:, 1] ** 2 < distance * distance) & self.alive[:n]
+        return bool(close.any())
+
+    def kill(self, rows):
+        self.alive[rows] = False
+
+    def compact(self):
+        """Drop dead rows, filling the holes with live rows from the end."""
+        n = self.count
+        dead = np.flatnonzero(~self.alive[:n])
+        if not len(dead):
+            return
+        keep = n - len(dead)
+        holes = dead[dead < keep]
+        if len(holes):
+            movers = np.flatnonzero(self.alive[keep:n]) + keep
+            for name in _FIELDS:
+                array = getattr(self, name)
+                array[holes] = array[movers]
+        self.alive[keep:n] = False
+        self.count = keep
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
+        self.trail_count = 0
+
+    # -------------------------------------------------------------------
+    # === Drawing ===
+    # -------------------------------------------------------------------
+
+    def draw(self, queue, layer=render.PROJECTILES):
+        """Queue every trail point, then every projectile on top."""
+        m = self.trail_count
+        if m:
+            steps = TRAIL_STEPS
+            step = np.minimum(steps, np.rint(self.trail_life[:m] / TRAIL_LIFE * steps)).astype(np.int64)
+            index = self.trail_sprite[:m] + step
+            size = self._ladder_sizes[index]
+            topleft = self.trail_pos[:m].astype(np.int64) - size.astype(np.int64) // 2
+            queue.push_many(self._ladder_sprites, index, topleft, size, layer)
+
+        n = self.count
+        if n:
+            live = self.alive[:n]
+            pos = self.pos[:n][live]
+            back = 1 - queue.interp
+            if back > 0:
+                pos = pos + (self.prev[:n][live] - pos) * back
+            half = self.half[:n][live]
+            queue.push_many(self.sprites, self.sprite[:n][live], pos - half, half * 2, layer)
+
+    def stats(self):
+        return {"live": self.count, "free": self.capacity - self.count, "high_water": self.high_water,
+                "trail_points": self.trail_count}
+
+
+def direction_vector(direction):
+    """Unit vector for "left"/"right"/"up"/"down", a bool (True = right) or
+    any vector."""
+    if isinstance(direction, str):  # player - four directions
+        return pg.Vector2({"right": (1, 0), "left": (-1, 0), "up": (0, -1), "down": (0, 1)}[direction])
+    if isinstance(direction, bool):  # left or right
+        return pg.Vector2(1 if direction else -1, 0)
+    return pg.Vector2(direction).normalize()  # boss - any direction
+
+
+def _is_alive(obj):
+    return getattr(obj, "alive", True)
+
+
+# === Trail sprites ===
+# Trail points shrink to 60% and fade from alpha 180 over TRAIL_LIFE. Rather
+# than smoothscaling every point every frame, each wisp image gets a ladder
+# of pre-scaled, pre-faded copies indexed by how much life a point has left.
+TRAIL_LIFE = 0.6
+TRAIL_STEPS = 24
+_trail_ladders = {}  # source image -> [(image, half width, half height)]
+
+
+def trail_ladder(image):
+    ladder = _trail_ladders.get(image)
+    if ladder is None:
+        w, h = image.get_size()
+        ladder = []
+        for i in range(TRAIL_STEPS + 1):
+            life = i / TRAIL_STEPS
+            scale = 0.6 + 0.4 * life
+            img = pg.transform.smoothscale(image, (int(w * scale), int(h * scale)))
+            img.set_alpha(int(180 * life))
+            ladder.append((img, img.get_width() // 2, img.get_height() // 2))
+        _trail_ladders[image] = ladder
+    return ladder
@@ -1,24 +1,31 @@
 import pygame as pg
 import random
-from projectile import Projectile
+from projectile import ProjectileWorld, BOSS
+import assets
+import render
+import display
 import math
 
 class Pumpking:
-    def __init__(self, pos):
+    hud_label = "Pump-King"  # name over the boss health bar (hud.BossBar)
+
+    def __init__(self, pos, rng=None):
         # --- Setup ---
-        self.image = pg.transform.scale(pg.image.load("Art/boss1.png"), (256, 256))
+        self.rng = rng or random.Random()  # reseeded by Fight.restart()
+        self.image = assets.image("Art/boss1.png", (256, 256))
         self.rect = self.image.get_rect(center=pos)
+        self.spawn_pos = pg.Vector2(pos)  # where every attempt starts
         self.pos = pg.Vector2(pos)
         self.max_health = 800
         self.health = self.max_health
         self.speed = 80  # movement speed
-        self.direction = pg.Vector2(random.choice([-1, 1]), random.choice([-1, 1]))
+        self.direction = pg.Vector2(self.rng.choice([-1, 1]), self.rng.choice([-1, 1]))
         self.attack_cooldown = 2.0
         self.attack_timer = .5  # starts soon after appearing
-        self.projectiles = []
+        self.projectiles = ProjectileWorld()
         self.just_attacked = False
-        # Movement bounds for 800x800 window
-        self.bounds = pg.Rect(0, 0, 800, 800)
+        # Movement bounds: the whole arena
+        self.bounds = pg.Rect(0, 0, display.WIDTH, display.HEIGHT)
 
         # Alive status
         self.alive = True
@@ -28,8 +35,8 @@ class Pumpking:
         spawned from the boss' actual center to avoid offset."""
         num_projectiles = 8
         angle_step = 2 * math.pi / num_projectiles
-        attack_image = pg.image.load('Art/boss_attack.png').convert_alpha()
-        projectile_speed = 12  # keep same slow speed as ghost shots
+        attack_image = assets.image('Art/boss_attack.png', (32, 32))
+        projectile_speed = 720  # pixels per second, same as the ghost shots
 
         proj_pos = self.rect.center  # spawn exactly at boss center
 
@@ -38,8 +45,7 @@ class Pumpking:
             direction = pg.Vector2(math.cos(angle), math.sin(angle))
             if direction.length() != 0:
                 direction = direction.normalize()
-            proj = Projectile(proj_pos, direction, attack_image, speed=projectile_speed)
-            self.projectiles.append(proj)
+            self.projectiles.shot(proj_pos, direction, attack_image, speed=projectile_speed, owner=BOSS, damage=20)
 
 
     def update(self, dt, player):
@@ -50,7 +56,7 @@ class Pumpking:
         self.pos += self.direction * self.speed * dt
         self.rect.center = self.pos
 
-        # --- Bounce inside 800x800 window ---
+        # --- Bounce inside the arena ---
         if self.rect.left < self.bounds.left or self.rect.right > self.bounds.right:
             self.direction.x *= -1
             self.pos.x = max(self.bounds.left + self.rect.width / 2,
@@ -67,7 +73,7 @@ class Pumpking:
             self.attack_timer = self.attack_cooldown
 
             # Alternate between ghost attack and radial attack 💥
-            if random.random() < 0.5:
+            if self.rng.random() < 0.5:
                 self.shoot_ghosts(player.pos)
             else:
                 self.radial_attack()
@@ -78,16 +84,16 @@ class Pumpking:
 
 
         # --- Update projectiles ---
-        for proj in list(self.projectiles):
-            proj.update(dt)
+        self.projectiles.update(dt)
 
-            # Damage check
-            if hasattr(player, "rect") and proj.rect.colliderect(player.rect):
+        # Damage check: every shot touching the player is used up
+        if hasattr(player, "rect"):
+            hits = self.projectiles.overlapping(player.rect)
+            if len(hits):
                 if hasattr(player, "take_damage") and not player.dead:
                     player.take_damage(20)
-                self.projectiles.remove(proj)
-            elif not proj.alive:
-                self.projectiles.remove(proj)
+                self.projectiles.kill(hits)
+                self.projectiles.compact()
 
         # --- Death check ---
         if self.health <= 0:
@@ -97,49 +103,39 @@ class Pumpking:
     def shoot_ghosts(self, player_pos):
         self.just_attacked = True
         """Fires 3 ghost projectiles toward the player."""
-        ghost_img = pg.image.load("Art/boss_attack.png").convert_alpha()
+        ghost_img = assets.image("Art/boss_attack.png", (32, 32))
         for i in range(3):
             direction = pg.Vector2(player_pos) - self.pos
             if direction.length() > 0:
                 direction = direction.normalize()
             # Add random spread
-            spread = pg.Vector2(random.uniform(-0.3, 0.3), random.uniform(-0.3, 0.3))
+            spread = pg.Vector2(self.rng.uniform(-0.3, 0.3), self.rng.uniform(-0.3, 0.3))
             velocity = (direction + spread).normalize() * 8
-            proj = Projectile(self.pos, velocity.x > 0, ghost_img, speed=12)
-            self.projectiles.append(proj)
+            self.projectiles.shot(self.pos, velocity.x > 0, ghost_img, speed=720, owner=BOSS, damage=20)
 
-    def draw(self, canvas):
+    def draw(self, queue):
         if not self.alive:
             return
 
         # --- Boss sprite ---
-        canvas.blit(self.image, self.rect)
+        queue.push(self.image, queue.lerp(self, self.rect), render.ENTITIES)
 
         # --- Projectiles ---
-        for proj in self.projectiles:
-            proj.draw(canvas)
-
-        # --- Health bar ---
-        bar_width = 600
-        bar_height = 20
-        x, y = 100, 750
-
-        # Background (empty bar)
-        pg.draw.rect(canvas, (50, 0, 0), (x, y, bar_width, bar_height))
-        # Health amount (filled part)
-        pg.draw.rect(canvas, (255, 80, 80),
-                    (x, y, bar_width * (self.health / self.max_health), bar_height))
-        # Outline
-        pg.draw.rect(canvas, (0, 0, 0), (x, y, bar_width, bar_height), 2)
-
-        # --- Boss name text ---
-        font = pg.font.Font(None, 48)
-        text = font.render("Pump-King", True, (255, 200, 0))  # orange-yellow color
-        text_rect = text.get_rect(center=(x + bar_width // 2, y - 25))
-        canvas.blit(text, text_rect)
+        self.projectiles.draw(queue)
 
     def take_damage(self, amount):
         if self.alive:
             self.health -= amount
             if self.health <= 0:
                 self.alive = False
+
+    def reset(self):
+        """Reset between fights."""
+        self.health = self.max_health
+        self.alive = True
+        self.projectiles.clear()
+        self.pos.update(self.spawn_pos)
+        self.rect.center = self.pos
+        self.direction = pg.Vector2(self.rng.choice([-1, 1]), self.rng.choice([-1, 1]))
+        self.attack_timer = .5
+        self.just_attacked = False
@@ -0,0 +1,196 @@
+import random
+import numpy as np
+import pygame as pg
+import assets
+import display
+
+# Draw layers, lowest first
+BACKGROUND = 0
+GROUND = 10       # footsteps, dash trails
+ENTITIES = 20     # player, bosses, minions
+PROJECTILES = 30
+EFFECTS = 40      # projectile trails, hit sparks, flashes
+HUD = 50
+
+# Layers drawn in screen space: the camera doesn't move them
+SCREEN_LAYERS = frozenset({HUD})
+
+
+class Camera:
+    """Maps world coordinates to the canvas: a view rect, shake and the
+    render scale (display.render_scale, picked up every update)."""
+
+    def __init__(self, size=(display.WIDTH, display.HEIGHT)):
+        self.size = size
+        self.scale = display.render_scale
+        self.offset = (0, 0)
+        self.world_view = pg.Rect((0, 0), size)  # the part of the world on screen
+        self.shake_timer = 0
+        self.shake_intensity = 0
+
+    def shake(self, duration, intensity):
+        self.shake_timer = duration
+        self.shake_intensity = intensity
+
+    def update(self, dt):
+        self.scale = display.render_scale
+        if self.shake_timer > 0:
+            self.shake_timer -= dt
+            i = self.shake_intensity
+            self.offset = (int(random.uniform(-i, i)), int(random.uniform(-i, i)))
+        else:
+            self.offset = (0, 0)
+        self.world_view = pg.Rect((-self.offset[0], -self.offset[1]), self.size)
+
+    def reset(self):
+        self.shake_timer = 0
+        self.update(0)
+
+
+class RenderQueue:
+    """Collects a frame's blits and submits them in layer order.
+
+    Entities push (surface, position) entries with a layer and an optional
+    blend flag instead of blitting themselves. flush() hands each layer to a
+    single Surface.blits call, so a frame costs one draw call per layer no
+    matter how many sprites are on screen. Entries in the same layer keep
+    the order they were pushed in.
+
+    Positions are in world coordinates. push() drops anything outside the
+    camera's view straight away and moves the rest by the camera offset,
+    except on SCREEN_LAYERS (the HUD), which stay put when the camera shakes.
+    At a render scale other than 1 everything is then scaled to the canvas,
+    sprites via the variant cache.
+
+    alpha fades an entry. The surface backend draws a faded variant; the
+    texture backend (display.backend == "texture") passes it through as a
+    fifth field for texture alpha modulation.
+
+    interp is how far this frame sits between the last two simulation ticks
+    (fight.Fight sets it); lerp() turns a position into the one to draw.
+    """
+
+    def __init__(self, camera=None):
+        self.camera = camera or Camera()
+        self.alpha_mod = display.backend == "texture"
+        self.interp = 1.0
+        self._layers = {}  # layer -> [blit tuples]
+        self._culled = 0
+        # last flush
+        self.draw_calls = 0
+        self.sprites = 0
+        self.culled = 0
+        self.layer_sizes = {}
+
+    def visible(self, rect):
+        """Whether a world-space rect is in view; skip draw work if not."""
+        return self.camera.world_view.colliderect(rect)
+
+    def lerp(self, obj, pos):
+        """pos (anything tied to obj.pos) moved back toward where obj was at
+        the previous tick. Objects without a prev_pos are drawn where they are."""
+        prev = getattr(obj, "prev_pos", None)
+        back = 1 - self.interp
+        if prev is None or back <= 0:
+            return pos
+        cur = obj.pos
+        return (pos[0] + (prev[0] - cur[0]) * back, pos[1] + (prev[1] - cur[1]) * back)
+
+    def push(self, surface, pos, layer=ENTITIES, blend=0, area=None, alpha=255):
+        entries = self._layers.get(layer)
+        if entries is None:
+            entries = self._layers[layer] = []
+
+        if layer not in SCREEN_LAYERS:
+            x, y = pos[0], pos[1]
+            w, h = surface.get_size() if area is None else pg.Rect(area).size
+            view = self.camera.world_view
+            if x >= view.right or y >= view.bottom or x + w <= view.left or y + h <= view.top:
+                self._culled += 1
+                return
+            ox, oy = self.camera.offset
+            pos = (x + ox, y + oy)
+
+        if alpha < 255:
+            if self.alpha_mod:
+                entries.append((surface, pos, area, blend, int(alpha)))
+                return
+            surface = assets.variant(surface, alpha=alpha)
+
+        scale = self.camera.scale
+        if scale != 1:
+            surface = assets.variant(surface, scale=scale)
+            pos = (int(pos[0] * scale), int(pos[1] * scale))
+            if area is not None:
+                x, y, w, h = pg.Rect(area)
+                area = pg.Rect(int(x * scale), int(y * scale), round(w * scale), round(h * scale))
+
+        if blend or area is not None:
+            entries.append((surface, pos, area, blend))
+        else:
+            entries.append((surface, pos))
+
+    def push_many(self, sprites, index, topleft, size, layer=ENTITIES):
+        """Push sprites[index[i]] at topleft[i] for every row at once.
+
+        topleft and size are (n, 2) arrays in world coordinates; culling,
+        the camera offset and the render scale are done with NumPy.
+        """
+        view = self.camera.world_view
+        x, y = topleft[:, 0], topleft[:, 1]
+        visible = ((x < view.right) & (y < view.bottom)
+                   & (x + size[:, 0] > view.left) & (y + size[:, 1] > view.top))
+        shown = int(visible.sum())
+        self._culled += len(visible) - shown
+        if not shown:
+            return
+        scale = self.camera.scale
+        pos = ((topleft[visible] + self.camera.offset) * scale).astype(np.int64).tolist()
+        surfaces = [sprites[i] for i in index[visible].tolist()]
+        if scale != 1:
+            surfaces = [assets.variant(surface, scale=scale) for surface in surfaces]
+        entries = self._layers.get(layer)
+        if entries is None:
+            entries = self._layers[layer] = []
+        entries.extend(zip(surfaces, pos))
+
+    def extend(self, blits, layer=ENTITIES, placed=False):
+        """Push many Surface.blits tuples at once.
+
+        placed=True means they are already culled, scaled and in canvas
+        coordinates (the particle systems do all that with NumPy).
+        """
+        if placed:
+            entries = self._layers.get(layer)
+            if entries is None:
+                entries = self._layers[layer] = []
+            entries.extend(blits)
+            return
+        for blit in blits:
+            area = blit[2] if len(blit) > 2 else None
+            blend = blit[3] if len(blit) > 3 else 0
+            self.push(blit[0], blit[1], layer, blend, area)
+
+    def flush(self, target):
+        """Draw everything queued onto target and empty the queue."""
+        self.draw_calls = 0
+        self.sprites = 0
+        self.culled = self._culled
+        self.layer_sizes = {}
+        for layer in sorted(self._layers):
+            entries = self._layers[layer]
+            if not entries:
+                continue
+            target.blits(entries, doreturn=False)
+            self.draw_calls += 1
+            self.sprites += len(entries)
+            self.layer_sizes[layer] = len(entries)
+        self.clear()
+
+    def clear(self):
+        self._layers.clear()
+        self._culled = 0
+
+    def stats(self):
+        return {"draw_calls": self.draw_calls, "sprites": self.sprites, "culled": self.culled,
+                "layers": dict(self.layer_sizes)}
@@ -0,0 +1,377 @@
+"""Fight recordings: where a fight started, its seed and every tick's input.
+
+A Fight is deterministic (see fight.Fight), so that is all it takes to play
+one back exactly: the same collisions, the same projectiles, the same frame
+the boss dies on. Input is two bytes a tick, a bit per movement key held
+and per action key hit. Every KEYFRAME_SECONDS the whole fight state is
+pickled as well, so playback can seek to any point by starting from the
+nearest keyframe instead of the beginning. The keyframes also carry a
+digest of the state, which checks a playback hasn't drifted.
+
+Since they replay bit for bit, recordings double as regression scenarios:
+the fight a tester reports a frame-time spike in can be run again after a
+change and timed (or watched) to see it's gone.
+
+Record from the game with `python main.py --record` (files go to replays/),
+then from the repo root:
+
+    python replay.py replays/Pumpking-20261018-201500-12345.replay
+    python replay.py FILE --watch --seek=30
+
+The first re-simulates it headless, checks it against the recording and
+prints the outcome and tick timings. --watch plays it in a window: LEFT /
+RIGHT seek 5 s, UP / DOWN change speed, SPACE pauses, ESC quits.
+
+Replay files are pickles: only open ones you trust.
+"""
+import contextlib
+import hashlib
+import io
+import os
+import pickle
+import sys
+import time
+import zlib
+from array import array
+
+import pygame as pg
+
+import assets
+import particles
+import headless
+from fight import ACTION_KEYS, TICK, TICK_RATE
+
+VERSION = 2
+KEYFRAME_SECONDS = 5
+KEYFRAME_TICKS = KEYFRAME_SECONDS * TICK_RATE
+SEEK_SECONDS = 5
+
+# Input bits: held movement keys, then action keys hit that tick
+MOVE_KEYS = (pg.K_a, pg.K_d, pg.K_w, pg.K_s)
+_MOVE_BITS = [(key, 1 << i) for i, key in enumerate(MOVE_KEYS)]
+_ACTION_BITS = [(key, 1 << (len(MOVE_KEYS) + i)) for i, key in enumerate(ACTION_KEYS)]
+
+# Arena backgrounds for watch()
+ARENAS = {
+    "Pumpking": "Art/background.png",
+    "Specter Bride": "Art/background2.png",
+    "Scarecrow Lord": "Art/background3.png",
+}
+
+
+# -------------------------------------------------------------------
+# === Input ===
+# -------------------------------------------------------------------
+
+def encode(keys, pressed):
+    """One tick's input as an int: keys is what Fight.tick() got, pressed
+    the ACTION_KEYS hit before it."""
+    bits = 0
+    for key, bit in _MOVE_BITS:
+        if keys[key]:
+            bits |= bit
+    for key, bit in _ACTION_BITS:
+        if key in pressed:
+            bits |= bit
+    return bits
+
+
+def decode(bits):
+    """(held, pressed) keys back from encode()."""
+    held = [key for key, bit in _MOVE_BITS if bits & bit]
+    pressed = [key for key, bit in _ACTION_BITS if bits & bit]
+    return held, pressed
+
+
+# -------------------------------------------------------------------
+# === Keyframes ===
+# -------------------------------------------------------------------
+
+class _Pickler(pickle.Pickler):
+    """Pickles surfaces by name: cached sprites by their asset key, anything
+    else (e.g. a boss's pre-drawn glow) as raw pixels."""
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.names = assets.surface_keys()
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, pg.Surface):
+            return None
+        key = self.names.get(obj)
+        if key is not None:
+            return ("asset", key)
+        return ("pixels", obj.get_size(), pg.image.tobytes(obj, "RGBA"), obj.get_alpha())
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file):
+        super().__init__(file)
+        self.surfaces = {}  # one surface per name, as when pickled
+
+    def persistent_load(self, pid):
+        surface = self.surfaces.get(pid)
+        if surface is None:
+            if pid[0] == "asset":
+                surface = assets.from_key(pid[1])
+            else:
+                _, size, pixels, alpha = pid
+                surface = pg.image.frombytes(pixels, size, "RGBA").convert_alpha()
+                if alpha is not None:
+                    surface.set_alpha(alpha)
+            self.surfaces[pid] = surface
+        return surface
+
+
+def keyframe(fight):
+    """The whole state of fight (and the shared particle systems) as bytes."""
+    buffer = io.BytesIO()
+    _Pickler(buffer).dump({"fight": fight, "ground": particles.ground, "effects": particles.effects})
+    return buffer.getvalue()
+
+
+def restore(data):
+    """The Fight a keyframe was taken of. Replaces the shared particle systems."""
+    state = _Unpickler(io.BytesIO(data)).load()
+    particles.ground = state["ground"]
+    particles.effects = state["effects"]
+    return state["fight"]
+
+
+def digest(fight):
+    """Short hash of everything the simulation acts on, to compare runs."""
+    player, boss = fight.player, fight.boss
+    values = [fight.ticks, player.current_health, player.current_flasks, player.dead,
+              player.dashing, player.masked, player.current_mask, fight.can_use_mask,
+              sorted(fight.unlocked_masks), getattr(boss, "health", None), getattr(boss, "alive", None)]
+    for obj in fight.movers():
+        values += [obj.pos[0], obj.pos[1]]
+    if hasattr(boss, "rng"):
+        values.append(boss.rng.getstate())
+    h = hashlib.blake2b(repr(values).encode(), digest_size=8)
+    for world in (player.projectiles, getattr(boss, "projectiles", None)):
+        if world is not None:
+            h.update(world.pos[:world.count].tobytes())
+            h.update(world.alive[:world.count].tobytes())
+    return h.hexdigest()
+
+
+def _discard(fight):
+    # minions go back to their pool when a fight is dropped for another
+    if fight is not None and hasattr(fight.boss, "minions"):
+        fight.boss.reset()
+
+
+# -------------------------------------------------------------------
+# === Recording ===
+# -------------------------------------------------------------------
+
+class Recorder:
+    """Records a fight from its current tick on; set it as fight.recorder
+    (start() does both) and the fight calls record() after every tick."""
+
+    def __init__(self, fight, boss_name, keyframe_ticks=KEYFRAME_TICKS):
+        self.boss = boss_name
+        self.seed = fight.seed
+        self.start = fight.ticks
+        self.keyframe_ticks = keyframe_ticks
+        self.inputs = array("H")
+        self.keyframes = [(fight.ticks, keyframe(fight), digest(fight))]
+
+    def record(self, fight, keys, pressed):
+        self.inputs.append(encode(keys, pressed))
+        if fight.ticks % self.keyframe_ticks == 0:
+            self.keyframes.append((fight.ticks, keyframe(fight), digest(fight)))
+
+    def finish(self, fight):
+        """The Replay of everything recorded so far."""
+        return Replay(self.boss, self.seed, self.start, self.inputs.tobytes(),
+                      self.keyframes, digest(fight))
+
+
+def start(fight, boss_name):
+    """Start recording fight; returns the Recorder."""
+    fight.recorder = Recorder(fight, boss_name)
+    return fight.recorder
+
+
+def stop(fight, directory="replays"):
+    """Stop recording fight and save it into directory; returns the path,
+    or None if it wasn't being recorded."""
+    recorder = fight.recorder if fight is not None else None
+    if recorder is None:
+        return None
+    fight.recorder = None
+    replay = recorder.finish(fight)
+    name = "{}-{}-{}.replay".format(replay.boss.replace(" ", ""), time.strftime("%Y%m%d-%H%M%S"), replay.seed)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    replay.save(path)
+    return path
+
+
+# -------------------------------------------------------------------
+# === Playback ===
+# -------------------------------------------------------------------
+
+class Replay:
+    """A recorded fight: keyframes (tick, state, digest) and the input of
+    every tick from start on. final is the digest after the last tick."""
+
+    def __init__(self, boss, seed, start, inputs, keyframes, final):
+        self.boss = boss
+        self.seed = seed
+        self.start = start
+        self.inputs = array("H")
+        self.inputs.frombytes(inputs)
+        self.keyframes = keyframes
+        self.final = final
+
+    @property
+    def end(self):
+        """Tick the recording stops at."""
+        return self.start + len(self.inputs)
+
+    @property
+    def seconds(self):
+        return len(self.inputs) * TICK
+
+    def save(self, path):
+        data = {"version": VERSION, "tick_rate": TICK_RATE, "boss": self.boss, "seed": self.seed,
+                "start": self.start, "inputs": self.inputs.tobytes(), "keyframes": self.keyframes,
+                "final": self.final}
+        with open(path, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL), 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = pickle.loads(zlib.decompress(f.read()))
+        if data["version"] != VERSION or data["tick_rate"] != TICK_RATE:
+            raise ValueError(f"{path}: recorded by a different version of the game")
+        return cls(data["boss"], data["seed"], data["start"], data["inputs"], data["keyframes"], data["final"])
+
+    def step(self, fight):
+        """Run fight's next tick with the recorded input; False at the end."""
+        i = fight.ticks - self.start
+        if i >= len(self.inputs):
+            return False
+        held, pressed = decode(self.inputs[i])
+        for key in pressed:
+            fight.handle_event(pg.event.Event(pg.KEYDOWN, key=key))
+        fight.tick(headless.Keys(held))
+        return True
+
+    def fight_at(self, tick, old=None):
+        """A Fight at tick: restored from the last keyframe before it and run
+        forward from there. old is a fight being replaced, if any."""
+        tick = max(self.start, min(tick, self.end))
+        _discard(old)
+        frame_tick, data, _ = max((k for k in self.keyframes if k[0] <= tick), key=lambda k: k[0])
+        fight = restore(data)
+        while fight.ticks < tick and self.step(fight):
+            pass
+        return fight
+
+    def verify(self, timings=None):
+        """Play the whole recording from its first keyframe, comparing it
+        with the recorded digests on the way. Returns (fight, tick): where
+        it ended up and the first tick that differed, None if none did.
+        timings, if given, gets the time each tick took."""
+        headless.setup()
+        expected = {tick: check for tick, _, check in self.keyframes}
+        expected[self.end] = self.final
+        fight = self.fight_at(self.start)
+        clock = time.perf_counter
+        while True:
+            check = expected.get(fight.ticks)
+            if check is not None and digest(fight) != check:
+                return fight, fight.ticks
+            t0 = clock()
+            if not self.step(fight):
+                return fight, None
+            if timings is not None:
+                timings.append(clock() - t0)
+
+
+def watch(replay, seek=0.0):
+    """Play replay in a window from seek seconds in."""
+    import display
+    import render
+    from hud import HUD
+
+    pg.display.init()
+    pg.font.init()
+    display.open_window(1.0)
+    background = assets.image(ARENAS.get(replay.boss, "Art/background.png"),
+                              (display.WIDTH, display.HEIGHT), alpha=False)
+    camera = render.Camera((display.WIDTH, display.HEIGHT))
+    queue = render.RenderQueue(camera)
+    hud = HUD()
+    clock = pg.time.Clock()
+    fight = replay.fight_at(replay.start + int(seek * TICK_RATE))
+    speed, paused, carry = 1.0, False, 0.0
+
+    running = True
+    while running:
+        dt = clock.tick(60) / 1000
+        for event in pg.event.get():
+            if event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
+                running = False
+            elif event.type == pg.KEYDOWN:
+                if event.key == pg.K_SPACE:
+                    paused = not paused
+                elif event.key in (pg.K_LEFT, pg.K_RIGHT):
+                    jump = SEEK_SECONDS * TICK_RATE * (1 if event.key == pg.K_RIGHT else -1)
+                    fight = replay.fight_at(fight.ticks + jump, old=fight)
+                    carry = 0.0
+                elif event.key == pg.K_UP:
+                    speed = min(16.0, speed * 2)
+                elif event.key == pg.K_DOWN:
+                    speed = max(0.25, speed / 2)
+
+        if not paused:
+            carry += dt * speed
+            while carry >= TICK and replay.step(fight):
+                carry -= TICK
+            carry = min(carry, TICK)
+        fight.interp = min(1.0, carry / TICK)
+
+        camera.update(dt)
+        display.begin("playing")
+        queue.push(background, (0, 0), render.BACKGROUND)
+        fight.draw(queue)
+        hud.draw(queue, fight.player, fight.boss)
+        display.draw_queue(queue)
+        display.present()
+        pg.display.set_caption(f"{replay.boss}  {(fight.ticks - replay.start) * TICK:6.1f} / "
+                               f"{replay.seconds:.1f} s  x{speed:g}{'  paused' if paused else ''}")
+
+
+if __name__ == "__main__":
+    paths = [a for a in sys.argv[1:] if not a.startswith("--")]
+    seek = 0.0
+    for arg in sys.argv[1:]:
+        if arg.startswith("--seek="):
+            seek = float(arg.split("=", 1)[1])
+    if not paths:
+        raise SystemExit("usage: python replay.py FILE [--watch] [--seek=SECONDS]")
+
+    for path in paths:
+        replay = Replay.load(path)
+        if "--watch" in sys.argv:
+            watch(replay, seek)
+            continue
+        timings = []
+        with contextlib.redirect_stdout(io.StringIO()):  # the game's hit messages
+            fight, diverged = replay.verify(timings)
+        print(f"{path}: {replay.boss}, seed {replay.seed}, {replay.seconds:.1f} s, "
+              f"{len(replay.keyframes)} keyframes")
+        if diverged is not None:
+            print(f"  DIVERGED at tick {diverged} ({(diverged - replay.start) * TICK:.2f} s in)")
+            continue
+        outcome = "won" if fight.won else "lost" if fight.player.dead else "ongoing"
+        timings = sorted(timings) or [0.0]
+        print(f"  matches bit for bit, {outcome}; {sum(timings) / len(timings) * 1e6:.1f} us/tick, "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.1f} us, max {timings[-1] * 1e3:.2f} ms")
+    pg.quit()
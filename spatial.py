@@ -0,0 +1,153 @@
+import pygame as pg
+
+# Cell size in pixels: about one small sprite, so most things sit in 1-4 cells
+CELL = 64
+# Up to this many objects a plain list scan beats filing them into cells
+LINEAR_LIMIT = 24
+
+
+class SpatialGrid:
+    """Uniform grid over world space for overlap and nearest queries.
+
+    Rebuilt every tick from whatever it should hold: build() files each
+    object under every cell its rect touches, so query() only looks at the
+    objects near a rect instead of all of them, and nearest() searches
+    outward ring by ring from a point and stops once nothing closer can be
+    left. Cells are kept in a dict, so things off the arena are fine.
+
+    With LINEAR_LIMIT objects or fewer (a lone boss, a handful of minions)
+    the cells are skipped and both queries just scan the list.
+    """
+
+    def __init__(self, cell=CELL):
+        self.cell = cell
+        self._cells = {}  # (cx, cy) -> [(insertion index, obj, rect)]
+        self._bounds = None  # (min cx, min cy, max cx, max cy) of used cells
+        self._entries = []  # [(insertion index, obj, rect)]
+        self._gridded = False
+        self.count = 0
+
+    def clear(self):
+        self._cells.clear()
+        self._bounds = None
+        self._entries = []
+        self._gridded = False
+        self.count = 0
+
+    def build(self, objects):
+        """Replace the contents with objects (anything with a rect)."""
+        self.clear()
+        for obj in objects:
+            self.insert(obj, obj.rect)
+
+    def insert(self, obj, rect):
+        entry = (self.count, obj, rect)
+        self._entries.append(entry)
+        self.count += 1
+        if self._gridded:
+            self._file(entry)
+        elif self.count > LINEAR_LIMIT:
+            self._gridded = True
+            for entry in self._entries:
+                self._file(entry)
+
+    def _file(self, entry):
+        rect = entry[2]
+        cell = self.cell
+        x0, y0 = rect[0] // cell, rect[1] // cell
+        x1, y1 = (rect[0] + max(rect[2], 1) - 1) // cell, (rect[1] + max(rect[3], 1) - 1) // cell
+        cells = self._cells
+        for cx in range(int(x0), int(x1) + 1):
+            for cy in range(int(y0), int(y1) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [entry]
+                else:
+                    bucket.append(entry)
+        if self._bounds is None:
+            self._bounds = (x0, y0, x1, y1)
+        else:
+            bx0, by0, bx1, by1 = self._bounds
+            self._bounds = (min(bx0, x0), min(by0, y0), max(bx1, x1), max(by1, y1))
+
+    def query(self, rect):
+        """Objects whose rects overlap rect, in the order they were added."""
+        if not self._gridded:
+            colliderect = pg.Rect(rect).colliderect
+            return [obj for _, obj, obj_rect in self._entries if colliderect(obj_rect)]
+        cell = self.cell
+        rect = pg.Rect(rect)
+        x0, y0 = rect.left // cell, rect.top // cell
+        x1, y1 = (rect.left + max(rect.width, 1) - 1) // cell, (rect.top + max(rect.height, 1) - 1) // cell
+        cells = self._cells
+        found = {}  # insertion index -> obj
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for index, obj, obj_rect in bucket:
+                    if index not in found and rect.colliderect(obj_rect):
+                        found[index] = obj
+        if len(found) > 1:
+            return [found[index] for index in sorted(found)]
+        return list(found.values())
+
+    def nearest(self, point, where=None):
+        """The object whose rect center is closest to point, or None.
+
+        where(obj) can rule objects out (dead ones, say).
+        """
+        px, py = point[0], point[1]
+        if not self._gridded:
+            best, best_dist = None, None
+            for _, obj, rect in self._entries:
+                if where is not None and not where(obj):
+                    continue
+                dx = rect[0] + rect[2] / 2 - px
+                dy = rect[1] + rect[3] / 2 - py
+                dist = dx * dx + dy * dy
+                if best is None or dist < best_dist:
+                    best, best_dist = obj, dist
+            return best
+        cell = self.cell
+        pcx, pcy = int(px // cell), int(py // cell)
+        bx0, by0, bx1, by1 = self._bounds
+        # rings needed to cover every used cell from here
+        last_ring = max(pcx - bx0, bx1 - pcx, pcy - by0, by1 - pcy, 0)
+        cells = self._cells
+        best, best_dist = None, None
+        checked = set()
+        for ring in range(int(last_ring) + 1):
+            # anything not found yet lies at least (ring - 1) cells away
+            if best is not None and best_dist <= ((ring - 1) * cell) ** 2:
+                break
+            for cx, cy in _ring(pcx, pcy, ring):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for index, obj, rect in bucket:
+                    if index in checked:
+                        continue
+                    checked.add(index)
+                    if where is not None and not where(obj):
+                        continue
+                    dx = rect[0] + rect[2] / 2 - px
+                    dy = rect[1] + rect[3] / 2 - py
+                    dist = dx * dx + dy * dy
+                    if best is None or dist < best_dist:
+                        best, best_dist = obj, dist
+        return best
+
+
+def _ring(cx, cy, r):
+    """Cells at Chebyshev distance r from (cx, cy)."""
+    if r == 0:
+        yield cx, cy
+        return
+    for x in range(cx - r, cx + r + 1):
+        yield x, cy - r
+        yield x, cy + r
+    for y in range(cy - r + 1, cy + r):
+        yield cx - r, y
+        yield cx + r, y
@@ -0,0 +1,37 @@
+import time
+
+
+class StartupTrace:
+    """Times each step from launch to the first frame (--startup-trace)."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self._last = self.start
+        self.steps = []
+        self.finished = False
+
+    def mark(self, label):
+        """Record the time since the previous mark under label."""
+        now = time.perf_counter()
+        self.steps.append((label, now - self._last))
+        self._last = now
+
+    def first_frame(self, load_report=None):
+        """Mark the first presented frame and print the breakdown once."""
+        if self.finished:
+            return
+        self.finished = True
+        self.mark("first frame")
+        if not self.enabled:
+            return
+
+        print("startup trace:")
+        elapsed = 0.0
+        for label, seconds in self.steps:
+            elapsed += seconds
+            print(f"  {label:<24} {seconds * 1000:7.1f} ms   (at {elapsed * 1000:7.1f} ms)")
+        if load_report is not None:
+            print("asset loading:")
+            load_report.print()
+        print(f"time to first frame: {elapsed * 1000:.1f} ms")
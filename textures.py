@@ -0,0 +1,108 @@
+import pygame as pg
+from collections import OrderedDict
+from pygame._sdl2.video import Window, Renderer, Texture
+
+# GPU textures to keep before the least recently drawn are released
+MAX_TEXTURES = 2048
+
+# SDL_BlendMode values
+_BLEND = 1
+_ADD = 2
+_MOD = 4
+_ADD_FLAGS = {pg.BLEND_ADD, pg.BLEND_RGBA_ADD}
+_MULT_FLAGS = {pg.BLEND_MULT, pg.BLEND_RGBA_MULT}
+
+
+class TextureRenderer:
+    """Draws through SDL's Renderer instead of blitting onto a window surface.
+
+    Every sprite surface is uploaded once as a Texture (cached by the
+    surface itself, which assets/variants/fonts already share), so a frame
+    is just textured quads. Alpha is applied as texture alpha modulation
+    instead of faded copies. The renderer's logical size keeps the game in
+    800x800 units whatever the window size.
+
+    blits() takes the same entries as Surface.blits, plus an optional fifth
+    alpha field, so a RenderQueue can flush straight into it.
+    """
+
+    def __init__(self, size, caption="Maskquerade", fullscreen=False, software=False):
+        self.window = Window(caption, size, resizable=not fullscreen, fullscreen_desktop=fullscreen)
+        # accelerated=0 forces SDL's software renderer (works without a GPU)
+        self.renderer = Renderer(self.window, accelerated=0 if software else -1)
+        self.renderer.logical_size = size
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.renderer.clear()
+        self.size = size
+        self._textures = OrderedDict()  # surface -> (texture, surface alpha)
+        self._canvas_texture = None
+        self.uploads = 0
+        self.quads = 0
+
+    def texture(self, surface):
+        """The texture for a surface, uploading it the first time."""
+        cached = self._textures.get(surface)
+        if cached is not None:
+            self._textures.move_to_end(surface)
+            return cached
+        texture = Texture.from_surface(self.renderer, surface)
+        surface_alpha = surface.get_alpha()  # set_alpha() on the surface, if any
+        cached = self._textures[surface] = (texture, 255 if surface_alpha is None else surface_alpha)
+        self.uploads += 1
+        if len(self._textures) > MAX_TEXTURES:
+            self._textures.popitem(last=False)
+        return cached
+
+    def blits(self, entries, doreturn=False):
+        """Draw (surface, pos[, area[, flags[, alpha]]]) entries in order."""
+        for entry in entries:
+            surface, pos = entry[0], entry[1]
+            area = entry[2] if len(entry) > 2 else None
+            flags = entry[3] if len(entry) > 3 else 0
+            alpha = entry[4] if len(entry) > 4 else 255
+
+            texture, surface_alpha = self.texture(surface)
+            if area is not None:
+                area = pg.Rect(area)
+                w, h = area.size
+            else:
+                w, h = surface.get_size()
+
+            alpha = alpha * surface_alpha // 255
+            if texture.alpha != alpha:
+                texture.alpha = alpha
+            mode = _ADD if flags in _ADD_FLAGS else _MOD if flags in _MULT_FLAGS else _BLEND
+            if texture.blend_mode != mode:
+                texture.blend_mode = mode
+            texture.draw(srcrect=area, dstrect=(int(pos[0]), int(pos[1]), w, h))
+            self.quads += 1
+
+    def draw_canvas(self, canvas, rects=None):
+        """Draw a CPU-drawn surface (menus, overlays) over the frame.
+
+        rects lists the regions that changed since the last upload; None
+        uploads the whole surface.
+        """
+        if self._canvas_texture is None or self._canvas_texture.get_rect().size != canvas.get_size():
+            self._canvas_texture = Texture(self.renderer, canvas.get_size(), streaming=True)
+            self._canvas_texture.blend_mode = _BLEND
+            rects = None
+        if rects is None:
+            self._canvas_texture.update(canvas)
+        else:
+            for rect in rects:
+                rect = rect.clip(canvas.get_rect())
+                if rect.width and rect.height:
+                    self._canvas_texture.update(canvas.subsurface(rect), rect)
+        self._canvas_texture.draw(dstrect=(0, 0, *self.size))
+
+    def present(self):
+        self.renderer.present()
+        self.renderer.clear()
+
+    def to_surface(self):
+        """What's on screen, as a Surface (screenshots, tests)."""
+        return self.renderer.to_surface()
+
+    def stats(self):
+        return {"textures": len(self._textures), "uploads": self.uploads, "quads": self.quads}
@@ -1,39 +1,175 @@
 import pygame as pg
 import random
 import math
+import time
+import fonts
+import assets
+import display
+
+W, H = display.WIDTH, display.HEIGHT  # layout is in logical units
 
 _mask_size = (80, 80)
 _mask_spacing = 24
 
+_start_time = time.perf_counter()
+
+
+def ticks():
+    """Milliseconds since ui was imported.
+
+    Stands in for pg.time.get_ticks(), which reads 0 until something
+    starts SDL's timer. main.py's pg.time.Clock() does, but the bench and
+    replay tools draw these screens without one.
+    """
+    return int((time.perf_counter() - _start_time) * 1000)
+
+
 class FogParticle:
     def __init__(self):
-        self.x = random.randint(0, 800)
-        self.y = random.randint(0, 800)
+        self.x = random.randint(0, W)
+        self.y = random.randint(0, H)
         self.radius = random.randint(80, 160)
         self.speed = random.uniform(5, 20)
         self.alpha = random.randint(30, 80)
         self.surface = pg.Surface((self.radius * 2, self.radius * 2), pg.SRCALPHA)
         pg.draw.circle(self.surface, (200, 200, 200, self.alpha), (self.radius, self.radius), self.radius)
+        self.last_rect = None
 
     def update(self, dt):
-        self.x += math.sin(pg.time.get_ticks() * 0.0002) * self.speed * dt
-        self.y += math.cos(pg.time.get_ticks() * 0.0002) * self.speed * dt
-        if self.x < -self.radius: self.x = 800 + self.radius
-        if self.x > 800 + self.radius: self.x = -self.radius
-        if self.y < -self.radius: self.y = 800 + self.radius
-        if self.y > 800 + self.radius: self.y = -self.radius
+        self.x += math.sin(ticks() * 0.0002) * self.speed * dt
+        self.y += math.cos(ticks() * 0.0002) * self.speed * dt
+        if self.x < -self.radius: self.x = W + self.radius
+        if self.x > W + self.radius: self.x = -self.radius
+        if self.y < -self.radius: self.y = H + self.radius
+        if self.y > H + self.radius: self.y = -self.radius
 
     def draw(self, surface):
-        surface.blit(self.surface, (self.x - self.radius, self.y - self.radius))
+        rect = surface.blit(display.scaled(self.surface), display.to_screen((self.x - self.radius, self.y - self.radius)))
+        # fog drifts well under a pixel per frame, so most frames it hasn't moved
+        if rect != self.last_rect:
+            display.mark(rect.union(self.last_rect) if self.last_rect else rect)
+            self.last_rect = rect
 
 fog_particles = [FogParticle() for _ in range(15)]
 
 
+# -------------------------------------------------------------------
+# === Baked fog ===
+# -------------------------------------------------------------------
+# Every fog puff drifts along the same path, only at its own speed:
+# FogParticle.update integrates (sin wt, cos wt) * speed, which comes to an
+# offset of speed * ((1 - cos wt) / w, sin wt / w). So instead of blitting
+# 15 big circles a frame, the puffs are baked into a few parallax bands, one
+# per speed range, each on a texture big enough to cover the whole drift.
+# The menu background and darken pass are baked in too, so a menu frame is
+# one blit per band.
+FOG_DRIFT = 0.2          # rad/s, the 0.0002 per ms in FogParticle.update
+FOG_SPEEDS = (5, 20)     # px/s, same range as FogParticle
+FOG_PUFFS = 15           # puffs on screen at once, summed over the bands
+# The bands fill the screen, so any fog move repaints all of it. In
+# dirty-rect mode the fog steps every FOG_DIRTY_STEP seconds (a pixel or
+# two at a time, all bands together) and the frames between only push
+# what else changed.
+FOG_DIRTY_STEP = 0.1
+
+# Number of baked bands (1 = all fog moves as one sheet, more = more
+# parallax, one extra blit each). 0 goes back to the live FogParticles.
+fog_quality = 2
+
+_fog_fields = {}  # (background, darken, quality, render scale) -> FogField
+_fog_seed = random.random()  # same puffs on every screen, so fog carries over
+
+
+class FogField:
+    """Fog over a flat background with a darken pass, baked into bands.
+
+    Textures are baked in logical units, then scaled once to scale.
+    """
+
+    def __init__(self, background, darken, bands, seed=None, scale=1):
+        rng = random.Random(seed)
+        self.scale = scale
+        keep = 1 - darken / 255
+        low, high = FOG_SPEEDS
+        self.bands = []  # (texture, speed, reach)
+        self.last_areas = None
+
+        for b in range(bands):
+            speed = low + (high - low) * (b + 0.5) / bands
+            reach = math.ceil(speed / FOG_DRIFT)  # furthest the band drifts from center
+            size = (W + 2 * reach, H + 2 * reach)
+
+            if b == 0:
+                texture = pg.Surface(size)
+                texture.fill([round(c * keep) for c in background])
+            else:
+                texture = pg.Surface(size, pg.SRCALPHA)
+                texture.fill((0, 0, 0, 0))
+
+            # keep the puff density of the live version
+            count = max(1, round(FOG_PUFFS / bands * size[0] * size[1] / (W * H)))
+            for _ in range(count):
+                radius = rng.randint(80, 160)
+                alpha = rng.randint(30, 80)
+                puff = pg.Surface((radius * 2, radius * 2), pg.SRCALPHA)
+                pg.draw.circle(puff, (*[round(200 * keep)] * 3, alpha), (radius, radius), radius)
+                texture.blit(puff, (rng.randint(0, size[0]) - radius, rng.randint(0, size[1]) - radius))
+
+            if scale != 1:
+                texture = pg.transform.smoothscale(texture, (round(size[0] * scale), round(size[1] * scale)))
+            if pg.display.get_surface() is not None:
+                texture = texture.convert_alpha() if b else texture.convert()
+            self.bands.append((texture, speed, reach))
+
+    def draw(self, canvas, t):
+        """Blit the field as it looks t seconds in."""
+        drift_x = (1 - math.cos(FOG_DRIFT * t)) / FOG_DRIFT
+        drift_y = math.sin(FOG_DRIFT * t) / FOG_DRIFT
+        areas = []
+        s = self.scale
+        for texture, speed, reach in self.bands:
+            # puffs move +x/+y, so the window onto the texture moves back
+            area = (round((2 * reach - speed * drift_x) * s), round((reach - speed * drift_y) * s),
+                    round(W * s), round(H * s))
+            canvas.blit(texture, (0, 0), area)
+            areas.append(area)
+        # the drift is a few px per second, so most frames nothing moved;
+        # when something did, every band pixel may have (see FOG_DIRTY_STEP)
+        if areas != self.last_areas:
+            display.mark_all()
+            self.last_areas = areas
+
+
+def set_fog_quality(quality):
+    global fog_quality
+    fog_quality = quality
+    _fog_fields.clear()
+
+
+def _draw_fog(canvas, dt, background, darken):
+    """Menu backdrop: background, fog and the darken pass."""
+    if fog_quality <= 0:
+        canvas.fill(background)
+        for fog in fog_particles:
+            fog.update(dt)
+            fog.draw(canvas)
+        keep = round(255 * (1 - darken / 255))
+        canvas.fill((keep, keep, keep), special_flags=pg.BLEND_RGB_MULT)
+        return
+
+    key = (background, darken, fog_quality, display.render_scale)
+    field = _fog_fields.get(key)
+    if field is None:
+        field = _fog_fields[key] = FogField(background, darken, fog_quality, _fog_seed, display.render_scale)
+    t = ticks() / 1000
+    if display.dirty_mode:
+        t -= t % FOG_DIRTY_STEP
+    field.draw(canvas, t)
+
+
 def you_died_screen(canvas, alpha):
     """Draws a fading 'YOU DIED' message centered on screen."""
-    font = pg.font.Font(None, 150)  # You can replace with custom .ttf for a cooler look
-    text = font.render("YOU DIED", True, (180, 0, 0))
-    text.set_alpha(alpha)
+    text = display.scaled(fonts.render("YOU DIED", 150, (180, 0, 0)))  # You can replace with custom .ttf for a cooler look
     text_rect = text.get_rect(center=(canvas.get_width() // 2, canvas.get_height() // 2))
 
     # Draw a black overlay behind it
@@ -41,30 +177,78 @@ def you_died_screen(canvas, alpha):
     overlay.fill((0, 0, 0))
     overlay.set_alpha(min(200, alpha))  # darken background
     canvas.blit(overlay, (0, 0))
+    display.mark_all()
+
+    # the text surface is shared through the caches, so restore its alpha
+    text.set_alpha(alpha)
     canvas.blit(text, text_rect)
+    text.set_alpha(255)
+
 
 # -------------------------------------------------------------------
-# === UI: Screens ===
+# === Static layers ===
 # -------------------------------------------------------------------
-# === INTRO SCREEN ===
-def draw_intro_screen(canvas, dt):
-    canvas.fill((10, 10, 10))
-    for fog in fog_particles:
-        fog.update(dt)
-        fog.draw(canvas)
+# Everything on a menu that doesn't move (titles, body text, mask row) is
+# drawn once into a transparent full-screen layer. Each frame then only
+# draws the fog, one blit of the layer's used area and the flickering prompt.
+# Layers are kept premultiplied so stacking text on the darken pass and the
+# layer on the fog gives the same pixels as drawing everything directly.
+_static_layers = {}  # screen name -> (inputs, (layer, bounds))
+
+
+def _put(layer, surface, pos):
+    if not surface.get_flags() & pg.SRCALPHA:
+        layer.blit(surface, pos)  # opaque (e.g. an empty line), nothing to premultiply
+        return
+    # font surfaces need converting first or premul_alpha() comes back blank
+    if pg.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    layer.blit(surface.premul_alpha(), pos, special_flags=pg.BLEND_PREMULTIPLIED)
+
+
+def _blit_layer(canvas, layer):
+    layer, bounds = layer
+    if display.render_scale != 1:
+        # premultiplied pixels scale fine; the scaled copy is cached
+        canvas.blit(display.scaled(layer), (0, 0), special_flags=pg.BLEND_PREMULTIPLIED)
+        return
+    canvas.blit(layer, bounds, bounds, special_flags=pg.BLEND_PREMULTIPLIED)
+
+
+def _blit_prompt(canvas, text, center):
+    """Blit text centred on a logical position and mark it for presenting."""
+    rect = text.get_rect(center=center)
+    display.mark(canvas.blit(display.scaled(text), display.to_screen(rect.topleft)))
+
+
+def _static_layer(name, inputs, build):
+    """Cached layer for a screen, rebuilt by build(layer) when inputs change.
+
+    Returns (layer, bounds), bounds being the part that has anything on it.
+    """
+    cached = _static_layers.get(name)
+    if cached is not None and cached[0] == inputs:
+        return cached[1]
+
+    layer = pg.Surface((W, H), pg.SRCALPHA)
+    if pg.display.get_surface() is not None:
+        layer = layer.convert_alpha()
+    layer.fill((0, 0, 0, 0))
+    build(layer)
+    cached = (layer, layer.get_bounding_rect())
+    _static_layers[name] = (inputs, cached)
+    display.mark_all()
+    return cached
 
-    overlay = pg.Surface((800, 800), pg.SRCALPHA)
-    overlay.fill((0, 0, 0, 160))
-    canvas.blit(overlay, (0, 0))
-
-    font_title = pg.font.Font(None, 80)
-    font_story = pg.font.Font(None, 36)
-    font_controls = pg.font.Font(None, 34)
-    font_continue = pg.font.Font(None, 40)
 
+# -------------------------------------------------------------------
+# === UI: Screens ===
+# -------------------------------------------------------------------
+# === INTRO SCREEN ===
+def _build_intro_layer(layer):
     # Title
-    title = font_title.render("The Mask System", True, (240, 220, 180))
-    canvas.blit(title, title.get_rect(center=(800 // 2, 120)))
+    title = fonts.render("The Mask System", 80, (240, 220, 180))
+    _put(layer, title, title.get_rect(center=(W // 2, 120)))
 
     # Story text
     story_lines = [
@@ -76,13 +260,13 @@ def draw_intro_screen(canvas, dt):
     ]
     y = 200
     for line in story_lines:
-        text = font_story.render(line, True, (210, 200, 190))
-        canvas.blit(text, text.get_rect(center=(800 // 2, y)))
+        text = fonts.render(line, 36, (210, 200, 190))
+        _put(layer, text, text.get_rect(center=(W // 2, y)))
         y += 40
 
     # Controls section
-    control_title = font_title.render("Controls", True, (240, 220, 180))
-    canvas.blit(control_title, control_title.get_rect(center=(800 // 2, 460)))
+    control_title = fonts.render("Controls", 80, (240, 220, 180))
+    _put(layer, control_title, control_title.get_rect(center=(W // 2, 460)))
 
     controls = [
         "W / A / S / D — Move",
@@ -93,69 +277,57 @@ def draw_intro_screen(canvas, dt):
     ]
     y = 520
     for line in controls:
-        text = font_controls.render(line, True, (200, 200, 200))
-        canvas.blit(text, text.get_rect(center=(800 // 2, y)))
+        text = fonts.render(line, 34, (200, 200, 200))
+        _put(layer, text, text.get_rect(center=(W // 2, y)))
         y += 35
 
+
+def draw_intro_screen(canvas, dt):
+    display.begin("intro")
+    _draw_fog(canvas, dt, (10, 10, 10), 160)
+    _blit_layer(canvas, _static_layer("intro", (), _build_intro_layer))
+
     # Continue prompt (flickering)
-    flicker = (pg.time.get_ticks() // 400) % 2
+    flicker = (ticks() // 400) % 2
     if flicker:
-        continue_text = font_continue.render("Press ENTER to Continue", True, (240, 220, 140))
+        continue_text = fonts.render("Press ENTER to Continue", 40, (240, 220, 140))
     else:
-        continue_text = font_continue.render("Press ENTER to Continue", True, (180, 180, 120))
-    canvas.blit(continue_text, continue_text.get_rect(center=(800 // 2, 740)))
+        continue_text = fonts.render("Press ENTER to Continue", 40, (180, 180, 120))
+    _blit_prompt(canvas, continue_text, (W // 2, 740))
+
+    display.present()
+
 
-    pg.display.flip()
+# === START SCREEN ===
+def _build_start_layer(layer):
+    title_text = fonts.render("MASKQUERADE", 120, (230, 210, 150))
+    subtitle_text = fonts.render("— The Boss Rush —", 60, (160, 140, 90))
+    _put(layer, title_text, title_text.get_rect(center=(W // 2, 200)))
+    _put(layer, subtitle_text, subtitle_text.get_rect(center=(W // 2, 270)))
+
+    quit_text = fonts.render("Press ESC to Quit", 40, (120, 120, 120))
+    _put(layer, quit_text, quit_text.get_rect(center=(W // 2, 480)))
 
 
 def draw_start_screen(canvas, dt):
-    canvas.fill((5, 5, 5))
-    for fog in fog_particles:
-        fog.update(dt)
-        fog.draw(canvas)
-
-    darken = pg.Surface((800, 800), pg.SRCALPHA)
-    darken.fill((0, 0, 0, 150))
-    canvas.blit(darken, (0, 0))
-
-    font_title = pg.font.Font(None, 120)
-    font_subtitle = pg.font.Font(None, 60)
-    font_info = pg.font.Font(None, 40)
-    font_controls = pg.font.Font(None, 36)
-
-    title_text = font_title.render("MASKQUERADE", True, (230, 210, 150))
-    subtitle_text = font_subtitle.render("— The Boss Rush —", True, (160, 140, 90))
-    canvas.blit(title_text, title_text.get_rect(center=(800 // 2, 200)))
-    canvas.blit(subtitle_text, subtitle_text.get_rect(center=(800 // 2, 270)))
-
-    flicker = (pg.time.get_ticks() // 300) % 2
+    display.begin("start")
+    _draw_fog(canvas, dt, (5, 5, 5), 150)
+    _blit_layer(canvas, _static_layer("start", (), _build_start_layer))
+
+    flicker = (ticks() // 300) % 2
     if flicker:
-        start_text = font_info.render("Press ENTER to Begin", True, (240, 220, 150))
+        start_text = fonts.render("Press ENTER to Begin", 40, (240, 220, 150))
     else:
-        start_text = font_info.render("Press ENTER to Begin", True, (200, 200, 200))
-    canvas.blit(start_text, start_text.get_rect(center=(800 // 2, 430)))
+        start_text = fonts.render("Press ENTER to Begin", 40, (200, 200, 200))
+    _blit_prompt(canvas, start_text, (W // 2, 430))
 
-    quit_text = font_info.render("Press ESC to Quit", True, (120, 120, 120))
-    canvas.blit(quit_text, quit_text.get_rect(center=(800 // 2, 480)))
+    display.present()
 
-    pg.display.flip()
 
-def draw_boss_select_screen(canvas, dt, selected_index, boss_names, defeated_bosses, mask_images):
-    canvas.fill((10, 10, 10))
-    for fog in fog_particles:
-        fog.update(dt)
-        fog.draw(canvas)
-    darken = pg.Surface((800, 800), pg.SRCALPHA)
-    darken.fill((0, 0, 0, 160))
-    canvas.blit(darken, (0, 0))
-
-    font_title = pg.font.Font(None, 100)
-    font_option = pg.font.Font(None, 60)
-    font_info = pg.font.Font(None, 40)
-    font_masks = pg.font.Font(None, 50)
-
-    title_text = font_title.render("Choose Your Foe", True, (230, 210, 150))
-    canvas.blit(title_text, title_text.get_rect(center=(800 // 2, 120)))
+# === BOSS SELECT ===
+def _build_boss_select_layer(layer, selected_index, boss_names, defeated_bosses, mask_images):
+    title_text = fonts.render("Choose Your Foe", 100, (230, 210, 150))
+    _put(layer, title_text, title_text.get_rect(center=(W // 2, 120)))
 
     y = 260
     for i, name in enumerate(boss_names):
@@ -166,81 +338,86 @@ def draw_boss_select_screen(canvas, dt, selected_index, boss_names, defeated_bos
         else:
             color = (180, 180, 180)
 
-        text = font_option.render(name, True, color)
-        rect = text.get_rect(center=(800 // 2, y))
-        canvas.blit(text, rect)
+        text = fonts.render(name, 60, color)
+        rect = text.get_rect(center=(W // 2, y))
+        _put(layer, text, rect)
 
         if name in defeated_bosses:
-            pg.draw.line(canvas, (200, 50, 50),
+            pg.draw.line(layer, (200, 50, 50),
                          (rect.left - 10, rect.centery),
                          (rect.right + 10, rect.centery), 5)
         y += 80
 
     # Mask section
-    mask_title = font_masks.render("Your Masks", True, (220, 210, 160))
-    canvas.blit(mask_title, mask_title.get_rect(center=(800 // 2, 520)))
+    mask_title = fonts.render("Your Masks", 50, (220, 210, 160))
+    _put(layer, mask_title, mask_title.get_rect(center=(W // 2, 520)))
 
     mask_w, mask_h = _mask_size
     total_width = len(boss_names) * mask_w + (len(boss_names) - 1) * _mask_spacing
-    start_x = (800 - total_width) // 2
+    start_x = (W - total_width) // 2
     y_mask = 580
 
     for name in boss_names:
         mask = mask_images[name]
         pos = (start_x, y_mask)
         if name in defeated_bosses:
-            canvas.blit(mask, pos)
+            _put(layer, mask, pos)
         else:
-            faded = mask.copy()
-            faded.fill((80, 80, 80, 180), None, pg.BLEND_RGBA_MULT)
-            canvas.blit(faded, pos)
-            lock_font = pg.font.Font(None, 22)
-            lock = lock_font.render("🔒", True, (200, 80, 80))
-            canvas.blit(lock, (start_x + mask_w//2 - lock.get_width()//2, y_mask + mask_h//2 - lock.get_height()//2))
+            _put(layer, assets.variant(mask, tint=(80, 80, 80, 180)), pos)
+            lock = fonts.render("🔒", 22, (200, 80, 80))
+            _put(layer, lock, (start_x + mask_w//2 - lock.get_width()//2, y_mask + mask_h//2 - lock.get_height()//2))
         start_x += mask_w + _mask_spacing
 
-    info_text = font_info.render("w / s to Select  |  ENTER to Begin  |  ESC to Back", True, (200, 200, 200))
-    canvas.blit(info_text, info_text.get_rect(center=(800 // 2, 740)))
+    info_text = fonts.render("w / s to Select  |  ENTER to Begin  |  ESC to Back", 40, (200, 200, 200))
+    _put(layer, info_text, info_text.get_rect(center=(W // 2, 740)))
 
-    pg.display.flip()
 
-def draw_boss_cleared_screen(canvas, boss_name, dt):
-    canvas.fill((5, 5, 5))
-    for fog in fog_particles:
-        fog.update(dt)
-        fog.draw(canvas)
+def draw_boss_select_screen(canvas, dt, selected_index, boss_names, defeated_bosses, mask_images):
+    display.begin("boss_select")
+    _draw_fog(canvas, dt, (10, 10, 10), 160)
 
-    darken = pg.Surface((800, 800), pg.SRCALPHA)
-    darken.fill((0, 0, 0, 180))
-    canvas.blit(darken, (0, 0))
+    inputs = (selected_index, tuple(boss_names), frozenset(defeated_bosses), id(mask_images))
+    layer = _static_layer("boss_select", inputs,
+                          lambda layer: _build_boss_select_layer(layer, selected_index, boss_names,
+                                                                 defeated_bosses, mask_images))
+    _blit_layer(canvas, layer)
 
-    font_title = pg.font.Font(None, 120)
-    font_boss = pg.font.Font(None, 80)
-    font_info = pg.font.Font(None, 40)
+    display.present()
 
-    # Flickering "BOSS CLEARED" text
-    flicker = (pg.time.get_ticks() // 200) % 2
-    if flicker:
-        title_text = font_title.render("BOSS CLEARED", True, (255, 215, 0))
-    else:
-        title_text = font_title.render("BOSS CLEARED", True, (200, 170, 50))
-    
-    canvas.blit(title_text, title_text.get_rect(center=(800 // 2, 250)))
 
+# === BOSS CLEARED ===
+def _build_boss_cleared_layer(layer, boss_name):
     # Boss name
-    boss_text = font_boss.render(boss_name, True, (220, 180, 80))
-    canvas.blit(boss_text, boss_text.get_rect(center=(800 // 2, 350)))
+    boss_text = fonts.render(boss_name, 80, (220, 180, 80))
+    _put(layer, boss_text, boss_text.get_rect(center=(W // 2, 350)))
 
     # Victory message
-    victory_text = font_info.render("Victory Achieved", True, (180, 180, 180))
-    canvas.blit(victory_text, victory_text.get_rect(center=(800 // 2, 420)))
+    victory_text = fonts.render("Victory Achieved", 40, (180, 180, 180))
+    _put(layer, victory_text, victory_text.get_rect(center=(W // 2, 420)))
+
+
+def draw_boss_cleared_screen(canvas, boss_name, dt):
+    display.begin("boss_cleared")
+    _draw_fog(canvas, dt, (5, 5, 5), 180)
+    layer = _static_layer("boss_cleared", (boss_name,),
+                          lambda layer: _build_boss_cleared_layer(layer, boss_name))
+    _blit_layer(canvas, layer)
+
+    # Flickering "BOSS CLEARED" text
+    flicker = (ticks() // 200) % 2
+    if flicker:
+        title_text = fonts.render("BOSS CLEARED", 120, (255, 215, 0))
+    else:
+        title_text = fonts.render("BOSS CLEARED", 120, (200, 170, 50))
+
+    _blit_prompt(canvas, title_text, (W // 2, 250))
 
     # Continue prompt
-    continue_flicker = (pg.time.get_ticks() // 500) % 2
+    continue_flicker = (ticks() // 500) % 2
     if continue_flicker:
-        continue_text = font_info.render("", True, (200, 200, 100))
+        continue_text = fonts.render("", 40, (200, 200, 100))
     else:
-        continue_text = font_info.render("", True, (150, 150, 100))
-    canvas.blit(continue_text, continue_text.get_rect(center=(800 // 2, 500)))
+        continue_text = fonts.render("", 40, (150, 150, 100))
+    _blit_prompt(canvas, continue_text, (W // 2, 500))
 
-    pg.display.flip()
\ No newline at end of file
+    display.present()